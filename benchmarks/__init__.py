@@ -0,0 +1,13 @@
+"""
+Performance benchmarks for refract.
+
+Run individual benchmarks as modules, e.g.::
+
+    python -m benchmarks.bench_detection
+
+The suite covering the element lifecycle across document sizes and shapes
+runs as the package itself, and compares saved results::
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare baseline.json results.json
+"""
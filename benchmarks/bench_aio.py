@@ -0,0 +1,99 @@
+"""
+Measure how long decoding and encoding a large document holds up the asyncio
+event loop, calling the blocking functions and the asyncio ones.
+
+A ticker task sleeps for a millisecond at a time meanwhile; the gaps between
+its ticks are how long other tasks would have waited. The longest gap may
+include a full garbage collection, which no amount of pausing avoids.
+"""
+from __future__ import print_function
+
+import asyncio
+import json
+import time
+
+from refract import Namespace
+from refract import aio
+
+
+def document(count):
+    return [{'id': i, 'name': 'item{}'.format(i), 'tags': ['a', 'b'],
+             'owner': {'name': 'someone', 'active': i % 2 == 0}}
+            for i in range(count)]
+
+
+class Writer(object):
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        await asyncio.sleep(0)
+
+
+async def ticker(gaps, done):
+    last = time.time()
+    while not done.is_set():
+        await asyncio.sleep(0.001)
+        now = time.time()
+        gaps.append(now - last)
+        last = now
+
+
+async def measure(operation):
+    gaps = []
+    done = asyncio.Event()
+    task = asyncio.ensure_future(ticker(gaps, done))
+    await asyncio.sleep(0.01)
+    start = time.time()
+    await operation()
+    elapsed = time.time() - start
+    done.set()
+    await task
+    gaps.sort()
+    return elapsed, gaps[len(gaps) // 2], gaps[-1]
+
+
+def reader_of(text):
+    reader = asyncio.StreamReader()
+    reader.feed_data(text.encode('utf-8'))
+    reader.feed_eof()
+    return reader
+
+
+async def run(count):
+    namespace = Namespace()
+    element = namespace.element(document(count))
+    doc = element.refracted
+    text = json.dumps(doc)
+
+    async def blocking_decode():
+        namespace.from_refract(json.loads(text))
+
+    async def blocking_encode():
+        element.clone().dump(Writer())
+
+    cases = (
+        ('from_refract', blocking_decode),
+        ('aio.load', lambda: aio.load(reader_of(text), namespace)),
+        ('aio.from_refract', lambda: aio.from_refract(namespace, doc)),
+        ('dump', blocking_encode),
+        ('aio.dump', lambda: aio.dump(element.clone(), Writer())),
+    )
+    print('{:<20} {:>12} {:>14} {:>14}'.format(
+        'operation', 'time', 'median stall', 'longest stall'))
+    for name, operation in cases:
+        elapsed, median, longest = await measure(operation)
+        print('{:<20} {:9.1f} ms {:11.1f} ms {:11.1f} ms'.format(
+            name, elapsed * 1000, median * 1000, longest * 1000))
+
+
+def main(count=5000):
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run(count))
+    finally:
+        loop.close()
+
+
+if __name__ == '__main__':
+    main()
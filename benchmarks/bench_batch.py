@@ -0,0 +1,45 @@
+"""
+Measure the throughput of wrapping and decoding many small payloads, one
+call at a time and through the batch APIs, serially and in worker
+processes.
+"""
+from __future__ import print_function
+
+import multiprocessing
+
+from refract import Namespace
+
+from .suite import timed
+
+
+def payloads(count):
+    return [{'id': i, 'name': 'user{}'.format(i), 'active': i % 2 == 0,
+             'roles': ['read', 'write'][:i % 3]} for i in range(count)]
+
+
+def main(count=50000, processes=None):
+    processes = processes or max(multiprocessing.cpu_count(), 2)
+    namespace = Namespace()
+    values = payloads(count)
+    docs = [namespace.element(v).to_refract(compact=True) for v in values]
+    cases = [
+        ('element', lambda: [namespace.element(v) for v in values]),
+        ('elements', lambda: namespace.elements(values)),
+        ('elements x{}'.format(processes),
+         lambda: namespace.elements(values, processes=processes,
+                                    chunk_size=5000)),
+        ('from_refract', lambda: [namespace.from_refract(d) for d in docs]),
+        ('from_refract_many', lambda: namespace.from_refract_many(docs)),
+        ('from_refract_many x{}'.format(processes),
+         lambda: namespace.from_refract_many(docs, processes=processes,
+                                             chunk_size=5000)),
+    ]
+    print('{} payloads, {} CPUs'.format(count, multiprocessing.cpu_count()))
+    for name, func in cases:
+        seconds, _ = timed(func)
+        print('{:<24} {:9.0f} ms {:9.0f} /s'.format(
+            name, seconds * 1000, count / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare copy-on-write cloning against eagerly copying every element, in
+time and memory, for the clone itself and for a few edits afterwards.
+"""
+from __future__ import print_function
+
+import copy
+import gc
+import time
+import tracemalloc
+
+from refract import Namespace
+
+
+def template(size):
+    return [{'id': i, 'name': 'item', 'tags': ['a', 'b'], 'values': [1, 2]}
+            for i in range(size)]
+
+
+def eager_clone(element):
+    return copy.deepcopy(element)  # As clone() did originally.
+
+
+def edit(clone):
+    for index in (0, 10, 100):
+        clone[index]['name'].value = 'edited'
+
+
+def measure(func, *args):
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    result = func(*args)
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main(size=10000):
+    element = Namespace().element(template(size))
+    print('{:<14} {:>11} {:>11} {:>11} {:>11}'.format(
+        'clone', 'clone time', 'clone mem', 'edit time', 'edit mem'))
+    for name, func in (('eager', eager_clone),
+                       ('copy-on-write', lambda e: e.clone())):
+        clone_time, clone_peak, clone = measure(func, element)
+        edit_time, edit_peak, _ = measure(edit, clone)
+        print('{:<14} {:8.2f} ms {:8.1f} KB {:8.2f} ms {:8.1f} KB'.format(
+            name, clone_time * 1000, clone_peak / 1024.0,
+            edit_time * 1000, edit_peak / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare the size and speed of full and compact refract output.
+"""
+from __future__ import print_function
+
+import json
+import random
+
+from refract import Namespace
+
+from .suite import timed
+
+
+def corpus(size, seed=0):
+    rng = random.Random(seed)
+    return [
+        ('numbers', [rng.randint(0, 1000) for _ in range(size)]),
+        ('strings', ['s{}'.format(rng.randint(0, 1000))
+                     for _ in range(size)]),
+        ('objects', [{'id': i, 'name': 'item', 'active': i % 2 == 0}
+                     for i in range(size // 4)]),
+        ('nested', [[rng.random(), [None, 'x']] for _ in range(size // 4)]),
+    ]
+
+
+def main(size=50000):
+    namespace = Namespace()
+    print('{:<8} {:>11} {:>11} {:>6} {:>8} {:>8}'.format(
+        'corpus', 'full bytes', 'compact', 'size', 'encode', 'decode'))
+    for name, value in corpus(size):
+        element = namespace.element(value)
+        results = {}
+        for compact in (False, True):
+            encode, text = timed(
+                lambda: json.dumps(element.to_refract(compact)))
+            decode, _ = timed(
+                lambda: namespace.from_refract(json.loads(text)))
+            results[compact] = (len(text), encode, decode)
+        full, compact = results[False], results[True]
+        print('{:<8} {:>11} {:>11} {:>5.2f}x {:>7.2f}x {:>7.2f}x'.format(
+            name, full[0], compact[0], full[0] / float(compact[0]),
+            full[1] / compact[1], full[2] / compact[2]))
+    print('Ratios are full / compact; higher favors compact.')
+
+
+if __name__ == '__main__':
+    main()
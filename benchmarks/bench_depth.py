@@ -0,0 +1,116 @@
+"""
+Compare the traversal engine against recursive traversal on deep, narrow
+trees.
+
+The recursive reference functions mirror the per-class properties used
+before the engine existed. They run in a thread with a large stack and a
+raised recursion limit so they can be measured at every depth.
+"""
+from __future__ import print_function
+
+import sys
+import threading
+from collections import OrderedDict
+
+from refract import ArrayElement, MemberElement, Namespace, ObjectElement
+
+from .suite import timed
+
+
+def recursive_refracted(element):
+    def keyvals(mapping):
+        return {k: recursive_refracted(v) if element._should_refract(v)
+                else recursive_native(v) for k, v in (mapping or {}).items()}
+    refracted = {
+        'element': element.element,
+        'meta': keyvals(element._meta),
+        'attributes': keyvals(element._attributes),
+        'content': element.content
+    }
+    if isinstance(element, (ArrayElement, ObjectElement)):
+        refracted['content'] = [recursive_refracted(child)
+                                for child in element._content]
+    elif isinstance(element, MemberElement):
+        refracted['content'] = {'key': recursive_refracted(element.key),
+                                'value': recursive_refracted(element.value)}
+    return refracted
+
+
+def recursive_native(element):
+    if isinstance(element, ArrayElement):
+        return [recursive_native(child) for child in element._content]
+    if isinstance(element, ObjectElement):
+        return {recursive_native(m.key): recursive_native(m.value)
+                for m in element._content}
+    return element.content
+
+
+def recursive_decode(namespace, doc):
+    cls = namespace.element_classes[doc['element']]
+    if issubclass(cls, ArrayElement):
+        content = [recursive_decode(namespace, item)
+                   for item in doc['content']]
+    elif issubclass(cls, ObjectElement):
+        content = OrderedDict(
+            [(recursive_decode(namespace, m['content']['key']),
+              recursive_decode(namespace, m['content']['value']))
+             for m in doc['content']])
+    else:
+        content = doc['content']
+    return cls(content, doc['meta'], doc['attributes'], namespace)
+
+
+def deep(depth):
+    value = []
+    cursor = value
+    for level in range(depth):
+        child = []
+        cursor.append({'level': level, 'next': child} if level % 2 else child)
+        cursor = child
+    return value
+
+
+def in_deep_thread(func, *args):
+    result = []
+
+    def run():
+        try:
+            result.append(timed(lambda: func(*args), repeat=1)[0])
+        except RuntimeError:  # RecursionError
+            result.append(None)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def fmt(seconds):
+    return '{:9.1f} ms'.format(seconds * 1000) if seconds else '    failed'
+
+
+def main(depths=(1000, 10000, 100000)):
+    namespace = Namespace()
+    sys.setrecursionlimit(10 ** 7)
+    threading.stack_size(1 << 30)
+    print('{:<8} {:<14} {:>12} {:>12}'.format(
+        'depth', 'operation', 'recursive', 'engine'))
+    for depth in depths:
+        element = namespace.element(deep(depth))
+        doc = element.refracted
+        cases = [
+            ('refracted', recursive_refracted, lambda e: e.refracted,
+             element),
+            ('native_value', recursive_native, lambda e: e.native_value,
+             element),
+            ('from_refract', lambda d: recursive_decode(namespace, d),
+             namespace.from_refract, doc),
+        ]
+        for name, recursive, engine, arg in cases:
+            print('{:<8} {:<14} {} {}'.format(
+                depth, name, fmt(in_deep_thread(recursive, arg)),
+                fmt(timed(lambda: engine(arg), repeat=1)[0])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare per-type cached element detection against a linear detector scan.
+"""
+from __future__ import print_function
+
+import timeit
+
+from refract import Namespace
+from refract.namespace import ElementClassNotFound
+
+
+class ScanningNamespace(Namespace):
+    """
+    Namespace detecting element classes by scanning every detector in order.
+    """
+    def detected_element_class(self, value):
+        for detector in self.element_detection:
+            if detector.test(value):
+                return detector.type
+        raise ElementClassNotFound
+
+
+def wide(size):
+    scalars = [None, True, 1, 1.5, 'a']
+    return [scalars[i % len(scalars)] for i in range(size)] + [[], {}]
+
+
+def deep(depth):
+    value = {'leaf': 'value'}
+    for _ in range(depth):
+        value = [value, 'x', 1]
+    return value
+
+
+def compare(name, func, value, number):
+    cached = Namespace()
+    scanning = ScanningNamespace()
+    t_scan = min(timeit.repeat(lambda: func(scanning, value),
+                               number=number, repeat=3)) / number
+    t_cached = min(timeit.repeat(lambda: func(cached, value),
+                                 number=number, repeat=3)) / number
+    print('{:<14} scan {:8.2f} ms  cached {:8.2f} ms  speedup {:.2f}x'.format(
+        name, t_scan * 1000, t_cached * 1000, t_scan / t_cached))
+
+
+def detect_all(namespace, values):
+    detect = namespace.detected_element_class
+    for value in values:
+        detect(value)
+
+
+def build(namespace, value):
+    namespace.element(value)
+
+
+def main():
+    print('Detection only')
+    compare('wide 100k', detect_all, wide(100000), number=5)
+    print('Namespace.element')
+    compare('wide 100k', build, wide(100000), number=5)
+    compare('deep 150', build, deep(150), number=500)
+
+
+if __name__ == '__main__':
+    main()
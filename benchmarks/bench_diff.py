@@ -0,0 +1,61 @@
+"""
+Compare syncing a large document after a few changes by sending a diff,
+against sending the whole document, and time diffing and patching.
+"""
+from __future__ import print_function
+
+import json
+import time
+
+from refract import Namespace
+from refract.diff import diff, patch, to_refract
+
+
+def document(count):
+    return {'resources': [
+        {'href': '/items/{}'.format(i),
+         'description': 'Resource number {}'.format(i),
+         'actions': [{'method': method, 'status': [200, 404]}
+                     for method in ('GET', 'PUT', 'DELETE')]}
+        for i in range(count)]}
+
+
+def change(element, count):
+    resources = element['resources'].value
+    resources[count // 2]['description'] = 'Changed'
+    resources.insert(count // 3, {'href': '/new', 'actions': []})
+    del resources[count - 10]
+    resources[1]['actions'].value[0].meta['title'] = 'Read'
+    return element
+
+
+def main(count=10000):
+    namespace = Namespace()
+    old = namespace.element(document(count))
+    new = change(old.clone(), count)
+    full = json.dumps(new.to_refract(compact=True))
+
+    start = time.time()
+    operations = diff(old, new)
+    cold = time.time() - start
+    start = time.time()
+    diff(old, new)
+    warm = time.time() - start
+    sent = json.dumps(to_refract(operations, compact=True))
+    start = time.time()
+    patched = patch(old.clone(), operations)
+    applied = time.time() - start
+    assert patched == new
+
+    print('{} resources, {} operations'.format(count, len(operations)))
+    print('{:<32} {:>12}'.format('whole document', '{:,} bytes'.format(
+        len(full))))
+    print('{:<32} {:>12}'.format('diff', '{:,} bytes'.format(len(sent))))
+    print('{:<32} {:9.1f} ms'.format('diff, hashing both trees',
+                                     cold * 1000))
+    print('{:<32} {:9.1f} ms'.format('diff, hashes cached', warm * 1000))
+    print('{:<32} {:9.1f} ms'.format('patch', applied * 1000))
+
+
+if __name__ == '__main__':
+    main()
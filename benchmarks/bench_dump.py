@@ -0,0 +1,48 @@
+"""
+Compare streaming refract JSON output against json.dumps of refracted.
+"""
+from __future__ import print_function
+
+import json
+import time
+import tracemalloc
+
+from refract import Namespace
+
+
+class NullWriter(object):
+    def write(self, text):
+        pass
+
+
+def document(size):
+    return [{'id': i, 'name': 'item-{}'.format(i), 'tags': ['a', 'b'],
+             'score': i * 0.5} for i in range(size)]
+
+
+def measure(func):
+    start = time.time()
+    func()
+    elapsed = time.time() - start
+    tracemalloc.start()  # Traced separately; tracing slows everything down.
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(size=20000):
+    element = Namespace().element(document(size))
+    out = NullWriter()
+    cases = [
+        ('json.dumps', lambda: out.write(json.dumps(element.refracted))),
+        ('Element.dump', lambda: element.dump(out)),
+    ]
+    for name, func in cases:
+        elapsed, peak = measure(func)
+        print('{:<14} {:8.1f} ms  peak {:8.1f} MiB'.format(
+            name, elapsed * 1000, peak / 1048576.0))
+
+
+if __name__ == '__main__':
+    main()
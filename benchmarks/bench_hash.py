@@ -0,0 +1,41 @@
+"""
+Compare element equality and deduplication against native value
+comparison.
+"""
+from __future__ import print_function
+
+import json
+
+from refract import Namespace
+
+from .suite import timed
+
+
+def document(group, size):
+    return [{'id': i % 50, 'group': group, 'tags': ['a', 'b'],
+             'values': [1, 2, 3]} for i in range(size)]
+
+
+def main(count=50, size=200):
+    namespace = Namespace()
+    documents = [namespace.element(document(i % 5, size))
+                 for i in range(count)]
+    first, second = documents[0], documents[1]
+    cases = [
+        ('unequal', lambda: first.native_value == second.native_value,
+         lambda: first == second),
+        ('equal', lambda: first.native_value == documents[5].native_value,
+         lambda: first == documents[5]),
+        ('dedupe', lambda: len(set(json.dumps(d.native_value, sort_keys=True)
+                                   for d in documents)),
+         lambda: len(set(documents))),
+    ]
+    set(documents)  # Hashes are cached from here on.
+    print('{:<10} {:>12} {:>12}'.format('case', 'native', 'elements'))
+    for name, native, elements in cases:
+        print('{:<10} {:9.2f} ms {:9.2f} ms'.format(
+            name, timed(native)[0] * 1000, timed(elements)[0] * 1000))
+
+
+if __name__ == '__main__':
+    main()
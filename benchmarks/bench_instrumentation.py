@@ -0,0 +1,53 @@
+"""
+Measure the cost of instrumentation: wrapping, serializing and decoding
+in a namespace never instrumented, in one instrumented, and in one no
+longer instrumented while another namespace is.
+"""
+from __future__ import print_function
+
+import time
+
+from refract import Namespace
+
+
+def document(count):
+    return [{'id': i, 'name': 'item{}'.format(i), 'tags': ['a', 'b'],
+             'owner': {'name': 'someone', 'active': i % 2 == 0}}
+            for i in range(count)]
+
+
+def best(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def timings(namespace, value):
+    doc = namespace.element(value).refracted
+    return [best(lambda: namespace.element(value)),
+            best(lambda: namespace.element(value).refracted),
+            best(lambda: namespace.from_refract(doc))]
+
+
+def main(count=5000):
+    value = document(count)
+    plain = timings(Namespace(), value)
+    namespace = Namespace()
+    instrumentation = namespace.instrument()
+    instrumented = timings(namespace, value)
+    other = Namespace()
+    elsewhere = timings(other, value)  # Only checks the module flag
+    print('{:<14} {:>12} {:>14} {:>14}'.format(
+        'operation', 'plain', 'instrumented', 'other'))
+    for index, name in enumerate(('element', 'refracted', 'from_refract')):
+        print('{:<14} {:9.1f} ms {:11.1f} ms {:11.1f} ms'.format(
+            name, plain[index] * 1000, instrumented[index] * 1000,
+            elsewhere[index] * 1000))
+    print(instrumentation.snapshot()['detection'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Measure the memory held by elements decoded from documents with repetitive
+keys and strings, with and without string interning.
+"""
+from __future__ import print_function
+
+import gc
+import json
+import time
+import tracemalloc
+
+from refract import Namespace
+
+
+def document(count):
+    return [{'identifier': i, 'username': 'user{}'.format(i % 100),
+             'status': 'active', 'roles': ['reader', 'writer'],
+             'address': {'country': 'nowhere', 'city': 'somewhere'}}
+            for i in range(count)]
+
+
+def retained(func):
+    """
+    Memory still allocated once func returns, and the time it took.
+    """
+    start = time.time()
+    func()
+    elapsed = time.time() - start
+    gc.collect()
+    tracemalloc.start()  # Traced separately; tracing slows everything down.
+    result = func()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def main(count=20000):
+    values = document(count)
+    base = Namespace()
+    text = json.dumps(base.element(values).to_refract(compact=True))
+    # One JSON text per item, so keys are not shared by the JSON decoder.
+    texts = [json.dumps(base.element(value).to_refract(compact=True))
+             for value in values]
+    print('{} items'.format(count))
+    print('{:<24} {:>14} {:>14}'.format('operation', 'not interned',
+                                        'interned'))
+    cases = [
+        ('from_refract', lambda ns: ns.from_refract(json.loads(text))),
+        ('from_refract_many', lambda ns: ns.from_refract_many(
+            json.loads(t) for t in texts)),
+        ('elements', lambda ns: ns.elements(
+            json.loads(json.dumps(value)) for value in values)),
+    ]
+    for name, func in cases:
+        results = []
+        for interned in (False, True):
+            namespace = Namespace(intern_strings=interned)
+            results.append(retained(lambda: func(namespace)))
+        print('{:<24} {:>11.1f} MB {:>11.1f} MB'.format(
+            name, results[0][0] / 1048576.0, results[1][0] / 1048576.0))
+        print('{:<24} {:>11.0f} ms {:>11.0f} ms'.format(
+            '', results[0][1] * 1000, results[1][1] * 1000))
+
+
+if __name__ == '__main__':
+    main()
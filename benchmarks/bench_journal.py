@@ -0,0 +1,60 @@
+"""
+Measure the cost of journaling changes: changing values within a large
+document without a journal, with a journal on its root and with one on its
+namespace, and keeping a replica up to date by replaying the journal against
+copying the whole document again.
+"""
+from __future__ import print_function
+
+import time
+
+from refract import Namespace
+from refract.diff import patch
+from refract.journal import Journal
+
+
+def document(count):
+    return {'resources': [{'href': '/r{}'.format(i), 'methods': ['GET'],
+                           'meta': {'owner': 'someone', 'version': i}}
+                          for i in range(count)]}
+
+
+def change(root, changes):
+    resources = root['resources'].value
+    step = max(len(resources) // changes, 1)
+    start = time.time()
+    for index in range(0, len(resources), step):
+        resource = resources[index]
+        resource['methods'].value.append('PUT')
+        resource['meta'].value['version'] = -index
+    return time.time() - start
+
+
+def main(count=10000, changes=100):
+    value = document(count)
+    namespace = Namespace()
+    plain = change(namespace.element(value), changes)
+    root = namespace.element(value)
+    replica = root.clone()
+    journal = Journal(root)
+    rooted = change(root, changes)
+    start = time.time()
+    replica = patch(replica, journal.operations())
+    replayed = time.time() - start
+    journal.close()
+    start = time.time()
+    root.clone().native_value
+    copied = time.time() - start
+    assert replica == root
+    with Journal(namespace):
+        journaled = change(namespace.element(value), changes)
+    print('{} resources, {} changed twice'.format(count, changes))
+    print('{:<22} {:9.1f} ms'.format('no journal', plain * 1000))
+    print('{:<22} {:9.1f} ms'.format('root journal', rooted * 1000))
+    print('{:<22} {:9.1f} ms'.format('namespace journal', journaled * 1000))
+    print('{:<22} {:9.1f} ms'.format('replay to replica', replayed * 1000))
+    print('{:<22} {:9.1f} ms'.format('copy whole document', copied * 1000))
+
+
+if __name__ == '__main__':
+    main()
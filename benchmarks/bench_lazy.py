@@ -0,0 +1,84 @@
+"""
+Compare reading a few members of a large document from a memory-mapped
+refract binary file, lazily, against loading the whole document from
+refract binary data and from refract JSON.
+"""
+from __future__ import print_function
+
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from refract import Namespace
+from refract import lazy
+
+
+def document(count):
+    return {'resources': {
+        '/items/{}'.format(i): {
+            'description': 'Resource number {}'.format(i),
+            'actions': [{'method': method, 'status': [200, 404]}
+                        for method in ('GET', 'PUT', 'DELETE')]}
+        for i in range(count)}}
+
+
+def lookup(root, count):
+    resources = root['resources'].value
+    return [resources['/items/{}'.format(i)].value['actions'].value[0]
+            .native_value for i in (0, count // 2, count - 1)]
+
+
+def measure(func):
+    start = time.time()
+    func()
+    elapsed = time.time() - start
+    gc.collect()
+    tracemalloc.start()  # Traced separately; tracing slows everything down.
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main(count=20000):
+    namespace = Namespace()
+    element = namespace.element(document(count))
+    directory = tempfile.mkdtemp()
+    binary_path = os.path.join(directory, 'document.rfb')
+    json_path = os.path.join(directory, 'document.json')
+    with open(binary_path, 'wb') as fp:
+        fp.write(element.to_binary())
+    with open(json_path, 'w') as fp:
+        element.dump(fp, compact=True)
+
+    def mapped():
+        with open(binary_path, 'rb') as fp:
+            return lookup(lazy.load(fp, namespace), count)
+
+    def binary():
+        with open(binary_path, 'rb') as fp:
+            return lookup(namespace.from_binary(fp.read()), count)
+
+    def refract_json():
+        with open(json_path) as fp:
+            return lookup(namespace.from_refract(json.load(fp)), count)
+
+    print('{} resources, {} bytes binary, {} bytes JSON'.format(
+        count, os.path.getsize(binary_path), os.path.getsize(json_path)))
+    print('{:<14} {:>12} {:>12}'.format('load', 'time', 'peak memory'))
+    for name, func in (('lazy mmap', mapped), ('binary', binary),
+                       ('json', refract_json)):
+        elapsed, peak = measure(func)
+        print('{:<14} {:9.1f} ms {:9.1f} MB'.format(
+            name, elapsed * 1000, peak / 1048576.0))
+    for path in (binary_path, json_path):
+        os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Measure re-serializing an element tree after small edits, with the cached
+refract data of unchanged containers reused.
+"""
+from __future__ import print_function
+
+from refract import Namespace
+
+from .suite import timed
+
+
+def document(groups, size):
+    return [{'id': group, 'tags': ['t{}'.format(i) for i in range(size)],
+             'values': list(range(size))} for group in range(groups)]
+
+
+def main(groups=200, size=100):
+    namespace = Namespace()
+    element = namespace.element(document(groups, size))
+    fresh = [namespace.element(document(groups, size)) for _ in range(5)]
+    counter = [0]
+
+    def edit():
+        counter[0] += 1
+        element[counter[0] % groups]['id'] = counter[0]
+        element.refracted
+
+    element.refracted
+    results = [
+        ('cold', timed(lambda: fresh.pop().refracted, repeat=5)[0]),
+        ('after edit', timed(edit, repeat=5)[0]),
+        ('unchanged', timed(lambda: element.refracted, repeat=5)[0]),
+    ]
+    print('{} groups of {} values'.format(groups, size))
+    for name, seconds in results:
+        print('{:<12} {:9.2f} ms'.format(name, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
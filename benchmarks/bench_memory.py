@@ -0,0 +1,39 @@
+"""
+Measure memory used per leaf element.
+"""
+from __future__ import print_function
+
+import gc
+import tracemalloc
+
+from refract import Namespace, NumberElement, StringElement
+
+
+def bytes_per_node(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nodes
+    # Exclude the list holding the nodes.
+    return (after - before - 8 * count) / float(count)
+
+
+def main(count=100000):
+    namespace = Namespace()
+    values = ['value-{}'.format(i) for i in range(count)]
+    cases = [
+        ('NumberElement', lambda i: NumberElement(i, namespace=namespace)),
+        ('StringElement', lambda i: StringElement(values[i],
+                                                  namespace=namespace)),
+        ('Namespace.element', lambda i: namespace.element(i)),
+    ]
+    for name, factory in cases:
+        print('{:<18} {:8.1f} bytes/node'.format(
+            name, bytes_per_node(factory, count)))
+
+
+if __name__ == '__main__':
+    main()
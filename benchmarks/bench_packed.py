@@ -0,0 +1,59 @@
+"""
+Measure packed numeric arrays against ordinary ones: wrapping lists of
+numbers, serializing them to refract data and JSON, decoding them, and
+reading their native values.
+"""
+from __future__ import print_function
+
+import json
+import random
+import time
+
+from refract import Namespace
+
+
+def document(arrays, size):
+    rng = random.Random(0)
+    return {'series{}'.format(index): ([rng.randint(0, 1000)
+                                        for _ in range(size)]
+                                       if index % 2 else
+                                       [rng.random() for _ in range(size)])
+            for index in range(arrays)}
+
+
+def best(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def timings(namespace, value):
+    doc = namespace.element(value).refracted
+    text = json.dumps(doc)
+    return [best(lambda: namespace.element(value)),
+            best(lambda: namespace.element(value).refracted),
+            best(lambda: json.dumps(namespace.element(value).refracted)),
+            best(lambda: namespace.from_refract(json.loads(text))),
+            best(lambda: namespace.from_refract(doc, trusted=True)),
+            best(lambda: namespace.element(value).native_value)]
+
+
+def main(arrays=20, size=20000):
+    value = document(arrays, size)
+    plain = timings(Namespace(), value)
+    packed = timings(Namespace(packed_size=64), value)
+    print('{} arrays of {} numbers'.format(arrays, size))
+    print('{:<16} {:>12} {:>12} {:>8}'.format('operation', 'plain',
+                                              'packed', 'speedup'))
+    for index, name in enumerate(('element', 'refracted', 'json', 'decode',
+                                  'decode trusted', 'native_value')):
+        print('{:<16} {:9.1f} ms {:9.1f} ms {:7.1f}x'.format(
+            name, plain[index] * 1000, packed[index] * 1000,
+            plain[index] / packed[index]))
+
+
+if __name__ == '__main__':
+    main()
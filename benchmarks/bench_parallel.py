@@ -0,0 +1,49 @@
+"""
+Compare serial and pooled serialization and decoding of one large
+top-level array.
+"""
+from __future__ import print_function
+
+import multiprocessing
+
+from refract import Namespace
+
+from .suite import timed
+
+
+class NullWriter(object):
+    def write(self, text):
+        pass
+
+
+def items(count):
+    return [{'id': i, 'name': 'item{}'.format(i), 'values': [i, i * 2.5],
+             'tags': ['a', 'b']} for i in range(count)]
+
+
+def main(count=50000, processes=None, chunk_size=2000):
+    processes = processes or max(multiprocessing.cpu_count(), 2)
+    namespace = Namespace()
+    values = items(count)
+    doc = namespace.element(values).to_refract(compact=True)
+    print('{} items, {} CPUs, {} processes, chunks of {}'.format(
+        count, multiprocessing.cpu_count(), processes, chunk_size))
+    print('{:<14} {:>12} {:>12}'.format('operation', 'serial', 'pool'))
+    cases = [
+        ('to_refract', lambda e, p: e.to_refract(
+            True, processes=p, chunk_size=chunk_size)),
+        ('dump', lambda e, p: e.dump(
+            NullWriter(), True, processes=p, chunk_size=chunk_size)),
+        ('from_refract', lambda e, p: namespace.from_refract(
+            doc, processes=p, chunk_size=chunk_size)),
+    ]
+    for name, func in cases:
+        # Fresh elements, so no refract data is cached from earlier runs.
+        serial, pooled = namespace.element(values), namespace.element(values)
+        print('{:<14} {:9.0f} ms {:9.0f} ms'.format(
+            name, timed(lambda: func(serial, None), repeat=1)[0] * 1000,
+            timed(lambda: func(pooled, processes), repeat=1)[0] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Compare pickling elements against JSON of their refract data, in size and
+in time to serialize and restore.
+"""
+from __future__ import print_function
+
+import json
+import pickle
+
+from refract import Namespace
+
+from .suite import timed
+
+
+def document(count):
+    return [{'id': i, 'name': 'item{}'.format(i), 'price': i * 0.5,
+             'tags': ['a', 'b'], 'active': i % 2 == 0} for i in range(count)]
+
+
+def main(count=20000):
+    namespace = Namespace()
+    value = document(count)
+    fresh = [namespace.element(value) for _ in range(7)]
+
+    def formats():
+        yield 'pickle', (
+            lambda: pickle.dumps(fresh.pop(), pickle.HIGHEST_PROTOCOL),
+            pickle.loads)
+        for compact in (False, True):
+            yield 'json compact' if compact else 'json', (
+                lambda: json.dumps(fresh.pop().to_refract(compact)),
+                lambda text: namespace.from_refract(json.loads(text)))
+
+    print('{} items'.format(count))
+    print('{:<14} {:>10} {:>12} {:>12}'.format(
+        'format', 'bytes', 'serialize', 'restore'))
+    for name, (dumps, loads) in formats():
+        dump_time, data = timed(dumps, repeat=2)
+        load_time, _ = timed(lambda: loads(data))
+        print('{:<14} {:>10} {:9.0f} ms {:9.0f} ms'.format(
+            name, len(data), dump_time * 1000, load_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
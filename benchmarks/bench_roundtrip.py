@@ -0,0 +1,77 @@
+"""
+Measure round-trip decoding throughput, ``from_refract(element.refracted)``,
+for documents with and without meta and attributes.
+"""
+from __future__ import print_function
+
+import time
+
+from refract import Namespace
+
+
+def document(count):
+    return [{'id': i, 'name': 'item{}'.format(i), 'tags': ['a', 'b'],
+             'owner': {'name': 'someone', 'active': i % 2 == 0}}
+            for i in range(count)]
+
+
+def annotate(element):
+    """
+    Give every object a title, and every member a description and
+    attributes holding refract data.
+    """
+    for item in element:
+        item.meta['title'] = 'Item'
+        for member in item.content:
+            member.meta['description'] = 'Member'
+            member.attributes['typeAttributes'] = ['required']
+            member.attributes['ref'] = member.namespace.element('x')
+            member.attributes['ref'].meta['id'] = 'ref'
+    return element
+
+
+def count_elements(doc):
+    count = 0
+    stack = [doc]
+    while stack:
+        doc = stack.pop()
+        count += 1
+        content = doc['content']
+        if doc['element'] == 'member':
+            stack.extend((content['key'], content['value']))
+        elif isinstance(content, list):
+            stack.extend(content)
+    return count
+
+
+def best(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main(count=5000):
+    namespace = Namespace()
+    plain = namespace.element(document(count))
+    annotated = annotate(namespace.element(document(count)))
+    print('{:<34} {:>10} {:>12} {:>14}'.format(
+        'document', 'elements', 'time', 'elements/s'))
+    for name, element in (('plain', plain), ('annotated', annotated)):
+        for compact in (False, True):
+            doc = element.to_refract(compact=compact)
+            assert namespace.from_refract(doc) == element
+            elements = count_elements(doc)
+            for trusted in (False, True):
+                elapsed = best(lambda: namespace.from_refract(
+                    doc, trusted=trusted))
+                label = '{}{}{}'.format(name, ' compact' if compact else '',
+                                        ' trusted' if trusted else '')
+                print('{:<34} {:>10} {:9.1f} ms {:>14,.0f}'.format(
+                    label, elements, elapsed * 1000, elements / elapsed))
+
+
+if __name__ == '__main__':
+    main()
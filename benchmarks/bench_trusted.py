@@ -0,0 +1,72 @@
+"""
+Compare decoding round-tripped refract data, and constructing elements
+directly, with and without trusting the values given.
+"""
+from __future__ import print_function
+
+import time
+
+from refract import (Namespace, ArrayElement, MemberElement, ObjectElement,
+                     StringElement, NumberElement)
+
+
+def document(count):
+    return [{'id': i, 'name': 'item{}'.format(i), 'tags': ['a', 'b'],
+             'owner': {'name': 'someone', 'active': i % 2 == 0}}
+            for i in range(count)]
+
+
+def best(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def construct(create, namespace, count):
+    items = []
+    for i in range(count):
+        members = [create(MemberElement, (create(StringElement, key),
+                                          create(NumberElement, i)))
+                   for key in ('id', 'count', 'size')]
+        items.append(create(ObjectElement, members))
+    return create(ArrayElement, items)
+
+
+def main(count=5000):
+    namespace = Namespace()
+    element = namespace.element(document(count))
+    element.meta['title'] = 'Items'
+    doc = element.refracted
+    compact = element.to_refract(compact=True)
+    assert namespace.from_refract(doc, trusted=True) == element
+
+    def direct(cls, content):
+        return cls(content, namespace=namespace)
+
+    def trusted(cls, content):
+        return cls.trusted(content, namespace=namespace)
+
+    print('{:<26} {:>12} {:>12} {:>8}'.format('operation', 'checked',
+                                              'trusted', 'speedup'))
+    cases = (
+        ('from_refract', lambda trust: namespace.from_refract(
+            doc, trusted=trust)),
+        ('from_refract compact', lambda trust: namespace.from_refract(
+            compact, trusted=trust)),
+        ('from_refract_many', lambda trust: namespace.from_refract_many(
+            doc['content'], trusted=trust)),
+        ('constructors', lambda trust: construct(
+            trusted if trust else direct, namespace, count)),
+    )
+    for name, func in cases:
+        checked = best(lambda: func(False))
+        fast = best(lambda: func(True))
+        print('{:<26} {:9.1f} ms {:9.1f} ms {:7.2f}x'.format(
+            name, checked * 1000, fast * 1000, checked / fast))
+
+
+if __name__ == '__main__':
+    main()
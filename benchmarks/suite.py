@@ -0,0 +1,411 @@
+"""
+Benchmark suite covering the element lifecycle.
+
+Each operation is timed on seeded synthetic documents of several sizes and
+shapes, and the results can be saved as JSON and compared::
+
+    python -m benchmarks run --output before.json
+    python -m benchmarks run --output after.json
+    python -m benchmarks compare before.json after.json
+
+Shapes are ``wide`` (a flat array of scalars and short arrays), ``deep``
+(arrays and objects nested one within the other) and ``objects`` (an array
+of records with nested objects). Sizes count the elements of a document,
+including members and their keys.
+"""
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+from timeit import default_timer
+
+from refract import ArrayElement, Namespace, ObjectElement
+
+SHAPES = ('wide', 'deep', 'objects')
+SIZES = (10, 1000, 100000, 1000000)
+
+#: Keys of generated objects
+_KEYS = ('id', 'name', 'title', 'description', 'type', 'status', 'href',
+         'method', 'value', 'count', 'enabled', 'tags', 'created', 'owner')
+
+#: Shortest time a sample of an operation should take
+_MIN_SAMPLE = 0.05
+
+
+def _scalar(rng):
+    kind = rng.randint(0, 5)
+    if kind == 0:
+        return rng.randint(0, 1000000)
+    if kind == 1:
+        return round(rng.random() * 1000, 3)
+    if kind == 2:
+        return rng.choice(_KEYS)
+    if kind == 3:
+        return 'word{}'.format(rng.randint(0, 10000))
+    if kind == 4:
+        return rng.random() < 0.5
+    return None
+
+
+def _wide(nodes, rng):
+    items = []
+    budget = nodes - 1
+    while budget > 0:
+        if budget >= 4 and rng.random() < 0.1:
+            items.append([_scalar(rng) for _ in range(3)])
+            budget -= 4
+        else:
+            items.append(_scalar(rng))
+            budget -= 1
+    return items
+
+
+def _deep(nodes, rng):
+    value = _scalar(rng)
+    used = 1
+    level = 0
+    while used + 7 <= nodes:
+        if level % 2:
+            value = {'value': _scalar(rng), 'next': value}
+            used += 6
+        else:
+            value = [_scalar(rng), value]
+            used += 2
+        level += 1
+    return [value]
+
+
+def _record(rng, depth):
+    record = {}
+    for key in rng.sample(_KEYS, rng.randint(3, 8)):
+        choice = rng.random()
+        if depth < 2 and choice < 0.2:
+            record[key] = _record(rng, depth + 1)
+        elif choice < 0.3:
+            record[key] = [_scalar(rng) for _ in range(rng.randint(0, 3))]
+        else:
+            record[key] = _scalar(rng)
+    return record
+
+
+def _objects(nodes, rng):
+    records = []
+    used = 1
+    while used < nodes:
+        record = _record(rng, 0)
+        records.append(record)
+        used += count_nodes(record)
+    return records
+
+
+def generate(shape, nodes, seed=0):
+    """
+    Generate a native document of roughly the given number of elements.
+
+    The same shape, size and seed always give the same document.
+
+    :param shape: ``wide``, ``deep`` or ``objects``
+    :type shape: str
+
+    :param nodes: Number of elements the document should wrap into
+    :type nodes: int
+
+    :param seed: Seed of the random choices made
+    :type seed: int
+
+    :rtype: list
+    """
+    rng = random.Random('{}-{}-{}'.format(shape, nodes, seed))
+    return {'wide': _wide, 'deep': _deep, 'objects': _objects}[shape](
+        nodes, rng)
+
+
+def count_nodes(value):
+    """
+    Count the elements a native value wraps into.
+    """
+    count = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        count += 1
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            count += 2 * len(value)  # Members and their keys
+            stack.extend(value.values())
+    return count
+
+
+def _objects_in(element):
+    objects = []
+    stack = [element]
+    while stack:
+        element = stack.pop()
+        if isinstance(element, ObjectElement):
+            objects.append(element)
+            stack.extend(member.value for member in element.content)
+        elif isinstance(element, ArrayElement):
+            stack.extend(element.content)
+    return objects
+
+
+def _object_targets(namespace, value):
+    element = namespace.element(value)
+    return element, [(obj, list(obj.keys())) for obj in _objects_in(element)]
+
+
+def _get(state):
+    for obj, keys in state[1]:
+        for key in keys:
+            obj[key]
+
+
+def _set(state):
+    for obj, keys in state[1]:
+        for key in keys:
+            obj[key] = 0
+
+
+def _delete(state):
+    for obj, keys in state[1]:
+        for key in keys:
+            del obj[key]
+
+
+#: Operations, as (name, setup, run, setup per run). Setup is given the
+#: namespace and the native document, and its result is passed to run.
+#: Setup runs once per run for operations that change or cache state.
+OPERATIONS = (
+    ('element', lambda ns, value: value, lambda ns, value: ns.element(value),
+     False),
+    ('refracted', lambda ns, value: ns.element(value),
+     lambda ns, element: element.refracted, True),
+    ('native_value', lambda ns, value: ns.element(value),
+     lambda ns, element: element.native_value, False),
+    ('from_refract', lambda ns, value: ns.element(value).to_refract(),
+     lambda ns, doc: ns.from_refract(doc), False),
+    ('clone', lambda ns, value: ns.element(value),
+     lambda ns, element: element.clone(), False),
+    ('object_get', _object_targets, lambda ns, state: _get(state), False),
+    ('object_set', _object_targets, lambda ns, state: _set(state), True),
+    ('object_delete', _object_targets, lambda ns, state: _delete(state),
+     True),
+)
+
+
+def timed(func, repeat=3):
+    """
+    Time the best of `repeat` calls of `func`.
+
+    :return: The best time of one call, and the result of the last call
+    :rtype: tuple
+    """
+    best = result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = default_timer()
+        result = func()
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def measure(setup, run, per_run, repeat):
+    """
+    Time an operation, running it enough times per sample to measure it.
+
+    :return: The best and mean time of one run, and the number of runs per
+        sample
+    :rtype: tuple
+    """
+    number = 1
+    samples = []
+    while len(samples) < repeat:
+        states = [setup() for _ in range(number)] if per_run else None
+        state = None if per_run else setup()
+        gc.collect()
+        start = default_timer()
+        for index in range(number):
+            run(states[index] if per_run else state)
+        elapsed = default_timer() - start
+        del states, state
+        if number == 1 and elapsed < _MIN_SAMPLE:
+            # Too quick to measure one run at a time
+            number = min(int(_MIN_SAMPLE / max(elapsed, 1e-7)) + 1, 10 ** 6)
+            continue
+        samples.append(elapsed / number)
+    return min(samples), sum(samples) / len(samples), number
+
+
+def run_suite(sizes=SIZES, shapes=SHAPES, operations=None, seed=0,
+              repeat=3, log=None):
+    """
+    Run the benchmark suite.
+
+    :param sizes: Numbers of elements of the documents
+    :param shapes: Shapes of the documents
+    :param operations: Names of the operations to run, or None for all
+    :param seed: Seed of the generated documents
+    :param repeat: Number of samples of each operation
+    :param log: Callable given a line of text as each result is measured
+
+    :return: Results, keyed by ``operation/shape/size``
+    :rtype: dict
+    """
+    namespace = Namespace()
+    results = {}
+    for shape in shapes:
+        for size in sizes:
+            value = generate(shape, size, seed)
+            nodes = count_nodes(value)
+            objects = any(isinstance(v, dict) for v in _walk(value))
+            for name, setup, run, per_run in OPERATIONS:
+                if operations and name not in operations:
+                    continue
+                if name.startswith('object_') and not objects:
+                    continue
+                best, mean, number = measure(
+                    lambda: setup(namespace, value),
+                    lambda state: run(namespace, state), per_run, repeat)
+                key = '{}/{}/{}'.format(name, shape, size)
+                results[key] = {'best': best, 'mean': mean,
+                                'number': number, 'repeat': repeat,
+                                'nodes': nodes}
+                if log:
+                    log('{:<34} {:>9} nodes {:>12}'.format(
+                        key, nodes, _duration(best)))
+    return results
+
+
+def _walk(value):
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        yield value
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+
+
+def _duration(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds >= 1 / scale:
+            return '{:.2f} {}'.format(seconds * scale, unit)
+    return '{:.0f} ns'.format(seconds * 1e9)
+
+
+def compare(old, new, threshold=0.1):
+    """
+    Compare two sets of results.
+
+    :param old: Results of the baseline
+    :type old: dict
+
+    :param new: Results to compare against the baseline
+    :type new: dict
+
+    :param threshold: Relative change in best time considered significant
+    :type threshold: float
+
+    :return: Rows of (key, old best, new best, relative change, verdict) for
+        results in both, and the keys of regressions
+    :rtype: tuple[list[tuple], list[str]]
+    """
+    rows = []
+    regressions = []
+    for key in sorted(set(old) & set(new), key=_sort_key):
+        before, after = old[key]['best'], new[key]['best']
+        change = after / before - 1 if before else 0.0
+        verdict = ''
+        if change > threshold:
+            verdict = 'slower'
+            regressions.append(key)
+        elif change < -threshold:
+            verdict = 'faster'
+        rows.append((key, before, after, change, verdict))
+    return rows, regressions
+
+
+def _sort_key(key):
+    name, shape, size = key.split('/')
+    return name, shape, int(size)
+
+
+def _run_command(args):
+    results = run_suite(
+        sizes=[int(size) for size in args.sizes.split(',')],
+        shapes=args.shapes.split(','),
+        operations=args.operations.split(',') if args.operations else None,
+        seed=args.seed, repeat=args.repeat, log=print)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump({'python': platform.python_version(),
+                       'implementation': platform.python_implementation(),
+                       'platform': platform.platform(),
+                       'seed': args.seed,
+                       'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'results': results}, fp, indent=2, sort_keys=True)
+    return 0
+
+
+def _compare_command(args):
+    files = []
+    for path in (args.old, args.new):
+        with open(path) as fp:
+            files.append(json.load(fp)['results'])
+    rows, regressions = compare(files[0], files[1], args.threshold)
+    print('{:<34} {:>12} {:>12} {:>8}'.format('benchmark', 'old', 'new',
+                                              'change'))
+    for key, before, after, change, verdict in rows:
+        print('{:<34} {:>12} {:>12} {:>+7.1%} {}'.format(
+            key, _duration(before), _duration(after), change, verdict))
+    if regressions:
+        print('{} of {} benchmarks slower by more than {:.0%}'.format(
+            len(regressions), len(rows), args.threshold))
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    run = commands.add_parser('run', help='run the suite')
+    run.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                     help='comma-separated numbers of elements')
+    run.add_argument('--shapes', default=','.join(SHAPES),
+                     help='comma-separated document shapes')
+    run.add_argument('--operations',
+                     help='comma-separated operations (default: all of {})'
+                     .format(', '.join(op[0] for op in OPERATIONS)))
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--repeat', type=int, default=3,
+                     help='samples of each operation')
+    run.add_argument('--output', help='file to save results to, as JSON')
+    run.set_defaults(func=_run_command)
+
+    compare_parser = commands.add_parser(
+        'compare', help='compare two result files; exits with 1 when any '
+        'benchmark got slower than the threshold')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='relative change considered '
+                                'significant (default: 0.1)')
+    compare_parser.set_defaults(func=_compare_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Decoding and encoding element trees with asyncio, without blocking the
+event loop.
+
+Decoding reads refract JSON from an ``asyncio.StreamReader`` and encoding
+writes it to an ``asyncio.StreamWriter``, a piece at a time. Both hand
+control back to the event loop every so many elements, and encoding waits
+for the writer to drain whenever a buffer's worth has been written, so a
+large document does not hold up everything else the loop is running.
+
+Requires Python 3.5 or later.
+"""
+import asyncio
+import codecs
+
+from .decoding import RefractParser
+from .encoding import iterencode
+from .traversal import (decode, decoding, dispatch_table, _decode_frame,
+                        ARRAY, OBJECT)
+
+__all__ = ['from_refract', 'load', 'dump']
+
+
+async def _decoded(namespace, doc, every, budget, trusted):
+    cls, kind = dispatch_table(namespace)[doc['element']]
+    if kind not in (ARRAY, OBJECT):
+        budget[0] -= 1
+        element = decode(namespace, doc, trusted=trusted)
+    else:
+        frame = _decode_frame(cls, kind, doc)
+        for element in decoding(namespace, frame, trusted, every, budget):
+            if element is None:
+                await asyncio.sleep(0)
+    if budget[0] <= 0:
+        budget[0] = every
+        await asyncio.sleep(0)
+    return element
+
+
+async def from_refract(namespace, doc, every=1000, trusted=False):
+    """
+    Decode refract data into an Element, letting other tasks run every so
+    many elements.
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :param doc: Refract data
+    :type doc: dict
+
+    :param every: Number of elements decoded between pauses
+    :type every: int
+
+    :param trusted: Whether the data was serialized by this library, as for
+        ``Namespace.from_refract``
+    :type trusted: bool
+
+    :rtype: Element
+    """
+    return await _decoded(namespace, doc, every, [every], trusted)
+
+
+async def load(reader, namespace, every=1000, chunk_size=65536,
+               trusted=False):
+    """
+    Decode a refract JSON document read from a stream.
+
+    The items of a top-level array are decoded as soon as their text has
+    been read, as by ``refract.decoding.load``.
+
+    :param reader: Stream of UTF-8 encoded refract JSON, read until its end
+    :type reader: asyncio.StreamReader
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :param every: Number of elements decoded between pauses
+    :type every: int
+
+    :param chunk_size: Number of bytes read at a time
+    :type chunk_size: int
+
+    :param trusted: Whether the data was serialized by this library, as for
+        ``Namespace.from_refract``
+    :type trusted: bool
+
+    :rtype: Element
+
+    :raises ValueError: When the document is incomplete or malformed
+    """
+    parser = RefractParser(namespace, keep_items=False, decode_items=False)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    budget = [every]
+    items = []
+    while True:
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            break
+        for doc in parser.feed(decoder.decode(chunk)):
+            items.append(await _decoded(namespace, doc, every, budget,
+                                        trusted))
+    parser.feed(decoder.decode(b'', final=True))
+    doc = parser.close()
+    if not parser.streaming:
+        return await _decoded(namespace, doc, every, budget, trusted)
+    for item in doc['content']:  # Items completed by the end of the text
+        items.append(await _decoded(namespace, item, every, budget, trusted))
+    doc['content'] = []
+    root = decode(namespace, doc, trusted=trusted)
+    root.set_content(items)
+    return root
+
+
+async def dump(element, writer, compact=False, every=1000,
+               buffer_size=65536):
+    """
+    Serialize an element as refract JSON to a stream.
+
+    The text written is identical to that of ``Element.dump``, encoded as
+    UTF-8. The writer is drained after each write, so the document is
+    produced no faster than it is sent.
+
+    :param element: The element to serialize
+    :type element: Element
+
+    :param writer: Stream to write to; it is left open
+    :type writer: asyncio.StreamWriter
+
+    :param compact: Leave out empty meta and attributes
+    :type compact: bool
+
+    :param every: Number of chunks of text, about one per element, encoded
+        between pauses
+    :type every: int
+
+    :param buffer_size: Approximate number of characters per write
+    :type buffer_size: int
+    """
+    buffered = []
+    size = 0
+    count = 0
+    for chunk in iterencode(element, compact):
+        buffered.append(chunk)
+        size += len(chunk)
+        count += 1
+        if size >= buffer_size:
+            writer.write(''.join(buffered).encode('utf-8'))
+            buffered = []
+            size = 0
+            await writer.drain()
+        if count >= every:
+            count = 0
+            await asyncio.sleep(0)
+    if buffered:
+        writer.write(''.join(buffered).encode('utf-8'))
+        await writer.drain()
@@ -0,0 +1,496 @@
+"""
+Compact binary serialization of element trees.
+
+A document starts with a string table holding each element name, meta and
+attribute key, and short string value once, followed by its root node.
+Nodes refer to strings by their position in the table::
+
+    document   := MAGIC varint(string count) string* node
+    string     := varint(byte length) UTF-8 bytes
+    node       := varint(name index << 3 | flags) body
+    scalar     := [keyvals] value
+    container  := varint(byte length of the rest) [keyvals]
+                  varint(child count) node*
+    custom     := value                      (refract data of the element)
+    keyvals    := varint(meta count) varint(attribute count)
+                  (varint(key index) node)*
+
+The low two bits of a node's flags give its layout (scalar, container or
+custom), and the third bit whether it has meta or attributes. Containers
+state their length so readers can skip over them. Values are native values
+tagged by type, with integers as zigzag varints.
+
+Elements whose class serializes or loads refract data in its own way are
+stored as their refract data, and loaded through ``from_refract``.
+"""
+import codecs
+import struct
+from itertools import chain
+
+import six
+
+from .elements import Element
+from .traversal import (structure, _children, SCALAR, MEMBER, CUSTOM)
+
+__all__ = ['dumps', 'loads', 'dump', 'load']
+
+_MAGIC = b'RFB\x01'
+
+#: Node layouts, and the flag marking nodes with meta or attributes
+_SCALAR_NODE, _CONTAINER_NODE, _CUSTOM_NODE = range(3)
+_HAS_KEYVALS = 4
+
+#: Value tags
+(_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STRING, _STRING_REF, _LIST,
+ _DICT) = range(9)
+
+#: Longest string value kept in the string table rather than inline
+_MAX_SHARED_LENGTH = 64
+
+_double = struct.Struct('<d')
+_utf_8_decode = codecs.utf_8_decode
+
+_layouts = {}
+
+
+def _layout(cls):
+    """
+    Determine how nodes of an element class are laid out.
+    """
+    try:
+        return _layouts[cls]
+    except KeyError:
+        pass
+    if CUSTOM in (structure(cls, 'refracted'),
+                  structure(cls, 'from_refract')):
+        layout = _CUSTOM_NODE
+    elif structure(cls) == SCALAR:
+        layout = _SCALAR_NODE
+    else:
+        layout = _CONTAINER_NODE
+    _layouts[cls] = layout
+    return layout
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _varint(value):
+    out = bytearray()
+    _write_varint(out, value)
+    return out
+
+
+def _read_varint(view, pos):
+    byte = view[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value = byte & 0x7f
+    shift = 7
+    while True:
+        pos += 1
+        byte = view[pos]
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos + 1
+        shift += 7
+
+
+def _string_index(strings, string):
+    index = strings.get(string)
+    if index is None:
+        index = strings[string] = len(strings)
+    return index
+
+
+def _write_value(out, value, strings):
+    """
+    Write a native value, and the values nested within it, without
+    recursion.
+    """
+    values = iter((value,))
+    stack = []
+    while True:
+        for value in values:
+            if isinstance(value, six.string_types):
+                if len(value) <= _MAX_SHARED_LENGTH:
+                    out.append(_STRING_REF)
+                    _write_varint(out, _string_index(strings, value))
+                else:
+                    data = value.encode('utf-8')
+                    out.append(_STRING)
+                    _write_varint(out, len(data))
+                    out += data
+            elif value is None:
+                out.append(_NONE)
+            elif value is True:
+                out.append(_TRUE)
+            elif value is False:
+                out.append(_FALSE)
+            elif isinstance(value, six.integer_types):
+                out.append(_INT)
+                _write_varint(out, value << 1 if value >= 0
+                              else (~value << 1) | 1)
+            elif isinstance(value, float):
+                out.append(_FLOAT)
+                out += _double.pack(value)
+            elif isinstance(value, (list, tuple)):
+                out.append(_LIST)
+                _write_varint(out, len(value))
+                stack.append(values)
+                values = iter(value)
+                break
+            elif isinstance(value, dict):
+                out.append(_DICT)
+                _write_varint(out, len(value))
+                stack.append(values)
+                values = chain.from_iterable(six.iteritems(value))
+                break
+            else:
+                raise TypeError('{} is not serializable as refract '
+                                'binary'.format(type(value).__name__))
+        else:
+            if not stack:
+                return
+            values = stack.pop()
+
+
+def _keyval_items(out, meta, attributes, strings):
+    """
+    Write the counts of meta and attributes, and list the key indexes and
+    elements to write after them.
+    """
+    _write_varint(out, len(meta) if meta else 0)
+    _write_varint(out, len(attributes) if attributes else 0)
+    items = []
+    for keyvals in (meta, attributes):
+        for key, value in six.iteritems(keyvals or {}):
+            items.append(_varint(_string_index(strings, key)))
+            items.append(value)
+    return items
+
+
+def _write_tree(element, strings):
+    """
+    Write the nodes of an element tree without recursion.
+
+    Bytes are gathered in parts, leaving a gap for the length of each
+    container until its nodes are written.
+
+    :return: The parts, joined in order
+    :rtype: list[bytearray]
+    """
+    layouts = _layouts
+    parts = []
+    out = bytearray()
+    flushed = 0  # Number of bytes in parts
+    stack = []
+    items, index, gap, start = (element,), 0, None, None
+    while True:
+        while index < len(items):
+            item = items[index]
+            index += 1
+            if not isinstance(item, Element):  # Bytes written ahead
+                out += item
+                continue
+            cls = type(item)
+            layout = layouts.get(cls)
+            if layout is None:
+                layout = _layout(cls)
+            header = _string_index(strings, item.element) << 3 | layout
+            meta, attributes = item._meta, item._attributes
+            if layout == _CUSTOM_NODE:
+                _write_varint(out, header)
+                _write_value(out, item.refracted, strings)
+                continue
+            if layout == _SCALAR_NODE and not meta and not attributes:
+                _write_varint(out, header)
+                _write_value(out, item._content, strings)
+                continue
+            if meta or attributes:
+                header |= _HAS_KEYVALS
+            _write_varint(out, header)
+            stack.append((items, index, gap, start))
+            index = 0
+            if layout == _SCALAR_NODE:
+                gap = None
+                items = _keyval_items(out, meta, attributes, strings)
+                value = bytearray()
+                _write_value(value, item._content, strings)
+                items.append(value)
+                continue
+            parts.append(out)
+            flushed += len(out)
+            gap = len(parts)
+            parts.append(None)
+            out = bytearray()
+            start = flushed
+            children = _children(item, structure(cls))
+            if meta or attributes:
+                items = _keyval_items(out, meta, attributes, strings)
+                items.append(_varint(len(children)))
+                items.extend(children)
+            else:
+                _write_varint(out, len(children))
+                items = children
+        if gap is not None:
+            length = _varint(flushed + len(out) - start)
+            parts[gap] = length
+            flushed += len(length)
+        if not stack:
+            parts.append(out)
+            return parts
+        items, index, gap, start = stack.pop()
+
+
+def dumps(element):
+    """
+    Serialize an element tree to refract binary data.
+
+    :param element: The root element
+    :type element: Element
+
+    :rtype: bytes
+    """
+    strings = {}
+    parts = _write_tree(element, strings)
+    table = [None] * len(strings)
+    for string, index in six.iteritems(strings):
+        table[index] = string
+    head = bytearray(_MAGIC)
+    _write_varint(head, len(table))
+    for string in table:
+        data = string.encode('utf-8')
+        _write_varint(head, len(data))
+        head += data
+    parts.insert(0, head)
+    return b''.join(parts)
+
+
+def dump(element, fp):
+    """
+    Write an element tree as refract binary data to a file-like object.
+
+    :param element: The root element
+    :type element: Element
+
+    :param fp: Binary file-like object with a ``write`` method
+    :type fp: file
+    """
+    fp.write(dumps(element))
+
+
+def _view(data):
+    """
+    View binary data as unsigned bytes, without copying it.
+    """
+    if six.PY2:  # Python 2 views index as strings; copy into a bytearray.
+        return bytearray(data)
+    view = memoryview(data)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    return view
+
+
+def _read_string(view, pos):
+    length, pos = _read_varint(view, pos)
+    end = pos + length
+    if end > len(view):
+        raise IndexError(end)
+    return _utf_8_decode(view[pos:end])[0], end
+
+
+def _read_strings(view, pos):
+    count, pos = _read_varint(view, pos)
+    strings = []
+    for _ in range(count):
+        string, pos = _read_string(view, pos)
+        strings.append(string)
+    return strings, pos
+
+
+_NO_KEY = object()
+
+
+def _read_value(view, pos, strings):
+    """
+    Read a native value, and the values nested within it, without recursion.
+
+    :return: The value and the position after it
+    :rtype: tuple
+    """
+    stack = []  # Frames of [list or dict, values left, pending dict key]
+    while True:
+        tag = view[pos]
+        pos += 1
+        if tag == _STRING_REF:
+            index, pos = _read_varint(view, pos)
+            value = strings[index]
+        elif tag == _INT:
+            value, pos = _read_varint(view, pos)
+            value = (value >> 1) ^ -(value & 1)
+        elif tag == _FLOAT:
+            value = _double.unpack_from(view, pos)[0]
+            pos += 8
+        elif tag == _NONE:
+            value = None
+        elif tag == _TRUE:
+            value = True
+        elif tag == _FALSE:
+            value = False
+        elif tag == _STRING:
+            value, pos = _read_string(view, pos)
+        elif tag == _LIST or tag == _DICT:
+            count, pos = _read_varint(view, pos)
+            value = [] if tag == _LIST else {}
+            if count:
+                stack.append([value, count, _NO_KEY])
+                continue
+        else:
+            raise ValueError('Unknown refract binary value tag {} at '
+                             '{}'.format(tag, pos - 1))
+        while stack:
+            frame = stack[-1]
+            container = frame[0]
+            if type(container) is list:
+                container.append(value)
+            elif frame[2] is _NO_KEY:
+                frame[2] = value
+                break
+            else:
+                container[frame[2]] = value
+                frame[2] = _NO_KEY
+            frame[1] -= 1
+            if frame[1]:
+                break
+            stack.pop()
+            value = container
+        else:
+            return value, pos
+
+
+def _assembled(namespace, frame):
+    """
+    Create the element read by a frame once all its nodes are read.
+    """
+    cls, layout, keyval_count, meta_count, _, keys, children, value = frame
+    meta = attributes = None
+    if keyval_count:
+        meta = dict(zip(keys[:meta_count], children[:meta_count])) or None
+        attributes = dict(zip(keys[meta_count:],
+                              children[meta_count:keyval_count])) or None
+    if layout == _SCALAR_NODE:
+        content = value
+    elif structure(cls) == MEMBER:
+        content = tuple(children[keyval_count:])
+    else:
+        content = children[keyval_count:]
+    return cls(content, meta, attributes, namespace)
+
+
+def _read_tree(view, pos, strings, namespace):
+    """
+    Read the nodes of an element tree without recursion.
+
+    :return: The root element and the position after it
+    :rtype: tuple
+    """
+    classes = namespace.element_classes
+    # Frames of [class, layout, keyval count, meta count, node count,
+    # keys, elements, scalar value]
+    stack = []
+    while True:
+        header, pos = _read_varint(view, pos)
+        cls = classes[strings[header >> 3]]
+        layout = header & 3
+        element = None
+        if layout == _CUSTOM_NODE:
+            doc, pos = _read_value(view, pos, strings)
+            element = cls.from_refract(doc, namespace)
+        elif layout == _SCALAR_NODE and not header & _HAS_KEYVALS:
+            value, pos = _read_value(view, pos, strings)
+            element = cls(value, namespace=namespace)
+        else:
+            if layout == _CONTAINER_NODE:
+                _, pos = _read_varint(view, pos)  # Length, to skip it
+            meta_count = attribute_count = 0
+            if header & _HAS_KEYVALS:
+                meta_count, pos = _read_varint(view, pos)
+                attribute_count, pos = _read_varint(view, pos)
+            keyval_count = meta_count + attribute_count
+            stack.append([cls, layout, keyval_count, meta_count, None, [],
+                          [], None])
+        while stack:
+            frame = stack[-1]
+            children = frame[6]
+            if element is not None:
+                children.append(element)
+                element = None
+            read = len(children)
+            if read < frame[2]:  # The next meta or attribute value
+                index, pos = _read_varint(view, pos)
+                frame[5].append(strings[index])
+                break
+            if frame[4] is None:
+                if frame[1] == _SCALAR_NODE:
+                    frame[7], pos = _read_value(view, pos, strings)
+                    frame[4] = read
+                else:
+                    count, pos = _read_varint(view, pos)
+                    frame[4] = read + count
+            if read < frame[4]:
+                break
+            element = _assembled(namespace, stack.pop())
+        else:
+            return element, pos
+
+
+def loads(data, namespace):
+    """
+    Load an element tree from refract binary data.
+
+    Data is read in place through a memoryview, so views of larger buffers,
+    such as memory-mapped files, are not copied.
+
+    :param data: Binary data, as ``bytes``, ``bytearray``, ``memoryview`` or
+        any other object supporting the buffer protocol
+    :type data: bytes | memoryview
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :rtype: Element
+
+    :raises ValueError: When the data is not a complete refract binary
+        document
+    """
+    view = _view(data)
+    if bytes(view[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError('Not refract binary data')
+    try:
+        strings, pos = _read_strings(view, len(_MAGIC))
+        element, pos = _read_tree(view, pos, strings, namespace)
+    except (IndexError, struct.error):
+        raise ValueError('Truncated refract binary data')
+    if pos != len(view):
+        raise ValueError('Extra data after refract binary document')
+    return element
+
+
+def load(fp, namespace):
+    """
+    Load an element tree from refract binary data in a file-like object.
+
+    :param fp: Binary file-like object with a ``read`` method
+    :type fp: file
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :rtype: Element
+    """
+    return loads(fp.read(), namespace)
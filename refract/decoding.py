@@ -0,0 +1,278 @@
+"""
+Incremental refract JSON decoding.
+"""
+import codecs
+import json
+import re
+
+from .elements import ArrayElement
+
+__all__ = ['RefractParser', 'iterparse', 'load']
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_MAX_TOKEN = 6  # Longest token that may be cut short: a \uXXXX escape
+_decoder = json.JSONDecoder()
+
+_START, _KEY, _COLON, _VALUE, _ITEMS, _DONE = range(6)
+
+
+class RefractParser(object):
+    """
+    Incremental parser for a refract JSON document.
+
+    Text may be fed in chunks of any size. When the document is an array
+    element whose ``element`` key precedes its ``content`` (the order written
+    by this library), each item is decoded as soon as its text is complete,
+    so no more than one item's worth of intermediate data is held at a time.
+    Other documents, and other keys of the top-level element, are decoded
+    once their text is complete.
+    """
+    def __init__(self, namespace, keep_items=True, decode_items=True):
+        """
+        :param namespace: Namespace used to decode elements
+        :type namespace: refract.Namespace
+
+        :param keep_items: Whether streamed items are kept as the content of
+            the root element returned by close()
+        :type keep_items: bool
+
+        :param decode_items: Whether streamed items are decoded. If not,
+            feed() returns their refract data, and close() returns the
+            refract data of the root, for the caller to decode.
+        :type decode_items: bool
+        """
+        self.namespace = namespace
+        self.keep_items = keep_items
+        self.decode_items = decode_items
+        self.streaming = False
+        self._buffer = ''
+        self._pos = 0
+        self._state = _START
+        self._comma = False
+        self._header = {}
+        self._key = None
+        self._items = []
+        self._retry_length = 0
+
+    def feed(self, text):
+        """
+        Parse another chunk of the document.
+
+        :param text: The next chunk of JSON text
+        :type text: str
+
+        :return: Items of a streamed top-level array completed by this chunk
+        :rtype: list[Element]
+        """
+        self._retry_length -= self._pos
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        items = []
+        self._parse(items, False)
+        return items
+
+    def close(self):
+        """
+        Finish parsing the document.
+
+        :return: The root element, or its refract data unless the parser
+            decodes items. Unless the parser keeps items, the content of a
+            streamed array only holds items not yet returned by feed().
+        :rtype: Element | dict
+
+        :raises ValueError: When the document is incomplete or malformed
+        """
+        items = []
+        self._parse(items, True)
+        if self._state != _DONE:
+            raise ValueError('Incomplete refract document')
+        doc = dict(self._header)
+        if not self.decode_items:
+            if self.streaming:
+                doc['content'] = self._items if self.keep_items else items
+            return doc
+        if self.streaming:
+            doc['content'] = []
+        root = self.namespace.from_refract(doc)
+        if self.streaming:
+            root.set_content(self._items if self.keep_items else items)
+        return root
+
+    def _streams(self):
+        element_class = self.namespace.element_classes.get(
+            self._header.get('element'))
+        return (element_class is not None and
+                issubclass(element_class, ArrayElement))
+
+    def _parse(self, items, final):
+        buf = self._buffer
+        while True:
+            pos = _WHITESPACE.match(buf, self._pos).end()
+            self._pos = pos
+            if pos == len(buf):
+                return
+            char = buf[pos]
+            state = self._state
+            if state == _DONE:
+                raise ValueError('Extra data after refract document')
+            elif state == _START:
+                if char != '{':
+                    raise ValueError('Refract document must be an object')
+                self._pos = pos + 1
+                self._state = _KEY
+            elif state == _COLON:
+                if char != ':':
+                    raise ValueError('Expected ":" at {}'.format(pos))
+                self._pos = pos + 1
+                self._state = _VALUE
+            elif self._comma and char == ',':
+                self._pos = pos + 1
+                self._comma = False
+            elif state == _KEY:
+                if char == '}':
+                    self._pos = pos + 1
+                    self._state = _DONE
+                    continue
+                if self._comma or char != '"':
+                    raise ValueError('Expected a key at {}'.format(pos))
+                decoded = self._decode(pos, final)
+                if decoded is None:
+                    return
+                self._key, self._pos = decoded
+                self._state = _COLON
+            elif state == _VALUE:
+                if (self._key == 'content' and char == '[' and
+                        self._streams()):
+                    self.streaming = True
+                    self._pos = pos + 1
+                    self._state = _ITEMS
+                    continue
+                decoded = self._decode(pos, final)
+                if decoded is None:
+                    return
+                self._header[self._key], self._pos = decoded
+                self._state = _KEY
+                self._comma = True
+            elif state == _ITEMS:
+                if char == ']':
+                    self._pos = pos + 1
+                    self._state = _KEY
+                    self._comma = True
+                    continue
+                if self._comma:
+                    raise ValueError('Expected "," at {}'.format(pos))
+                decoded = self._decode(pos, final)
+                if decoded is None:
+                    return
+                item = decoded[0]
+                if self.decode_items:
+                    item = self.namespace.from_refract(item)
+                items.append(item)
+                if self.keep_items:
+                    self._items.append(item)
+                self._pos = decoded[1]
+                self._comma = True
+
+    def _decode(self, start, final):
+        """
+        Decode the JSON value starting at the given position.
+
+        Decoding of an incomplete value is retried once the buffer has grown
+        enough, so large values are not decoded over and over.
+
+        :return: The value and the position after it, or None if more text
+            is needed
+        :rtype: tuple | None
+        """
+        buf = self._buffer
+        if len(buf) < self._retry_length and not final:
+            return None
+        try:
+            value, end = _decoder.raw_decode(buf, start)
+        except ValueError as exc:
+            if final or not _incomplete(exc, buf):
+                raise
+            self._retry_length = len(buf) + (len(buf) - start)
+            return None
+        if end == len(buf) and not final and buf[end - 1] not in '"]}':
+            return None  # A number or literal may continue in the next chunk.
+        self._retry_length = 0
+        return value, end
+
+
+def _incomplete(exc, text):
+    """
+    Whether a JSON decoding error may be caused by text that is cut short.
+    """
+    pos = getattr(exc, 'pos', None)
+    if pos is None:  # No position information; assume more text may help.
+        return True
+    return (exc.msg.startswith('Unterminated string') or
+            pos >= len(text) - _MAX_TOKEN)
+
+
+def _chunks(fp, chunk_size):
+    decoder = None
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes) and not isinstance(chunk, str):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = decoder.decode(chunk)
+        yield chunk
+    if decoder is not None:
+        yield decoder.decode(b'', final=True)
+
+
+def iterparse(fp, namespace, chunk_size=65536):
+    """
+    Yield the items of a top-level array element read from a file object.
+
+    Items are decoded and yielded as soon as they are read, and are not kept,
+    so memory use is bounded by the size of the largest item.
+
+    :param fp: File-like object containing refract JSON (text or UTF-8)
+    :type fp: file
+
+    :param namespace: Namespace used to decode elements
+    :type namespace: refract.Namespace
+
+    :param chunk_size: Amount of data to read at a time
+    :type chunk_size: int
+
+    :rtype: Iterator[Element]
+
+    :raises ValueError: When the document is not an array element
+    """
+    parser = RefractParser(namespace, keep_items=False)
+    for chunk in _chunks(fp, chunk_size):
+        for item in parser.feed(chunk):
+            yield item
+    root = parser.close()
+    if not isinstance(root, ArrayElement):
+        raise ValueError('Refract document is not an array element')
+    for item in root:  # Items decoded by close(), or not streamed at all.
+        yield item
+
+
+def load(fp, namespace, chunk_size=65536):
+    """
+    Decode a refract JSON document from a file object, one chunk at a time.
+
+    :param fp: File-like object containing refract JSON (text or UTF-8)
+    :type fp: file
+
+    :param namespace: Namespace used to decode elements
+    :type namespace: refract.Namespace
+
+    :param chunk_size: Amount of data to read at a time
+    :type chunk_size: int
+
+    :rtype: Element
+    """
+    parser = RefractParser(namespace)
+    for chunk in _chunks(fp, chunk_size):
+        parser.feed(chunk)
+    return parser.close()
@@ -0,0 +1,372 @@
+"""
+Differences between element trees, as operations which turn one into the
+other.
+
+``diff`` compares two trees and lists the operations changing the first into
+the second, and ``patch`` applies them to a tree equal to the first. Branches
+with unequal structural hashes differ, and are walked; those with equal hashes
+are compared before being skipped, so colliding hashes never hide a change.
+The items of arrays are aligned by their hashes, and the members of objects
+are matched by key.
+
+Each operation addresses an element by its path from the root: the index of
+each array item and the key of each object member whose value is followed.
+Operations are:
+
+``('insert', path, index, element)``
+    Insert an item into the array at path, or a MemberElement into the
+    object at path, at the index given.
+``('delete', path, key, None)``
+    Delete the item at an index of the array at path, or the member with a
+    key from the object at path.
+``('replace', path, None, element)``
+    Replace the element at path; an empty path replaces the root.
+``('meta', path, key, element)``, ``('attribute', path, key, element)``
+    Set a meta or attribute value of the element at path, or delete it when
+    the element is None.
+
+The operations of a container are listed before those within its items, and
+paths refer to the tree as changed by the operations before them.
+"""
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+import six
+
+from .elements import ObjectElement
+from .traversal import (equal, structure, _keyvals_equal, ARRAY, OBJECT,
+                        MEMBER)
+
+__all__ = ['Operation', 'diff', 'patch', 'to_refract', 'from_refract']
+
+Operation = namedtuple('Operation', 'op path key value')
+
+
+def _same(old, new):
+    """
+    Whether two elements serialize the same, which only elements with equal
+    hashes can.
+    """
+    return old is new or hash(old) == hash(new) and equal(old, new, True)
+
+
+def _same_keyvals(old, new):
+    return (old.element == new.element and
+            _keyvals_equal(old._meta, new._meta, True) and
+            _keyvals_equal(old._attributes, new._attributes, True))
+
+
+def _keyval_operations(op, path, old, new):
+    operations = []
+    old = old or {}
+    new = new or {}
+    for key in old:
+        if key not in new:
+            operations.append(Operation(op, path, key, None))
+    for key, value in six.iteritems(new):
+        if key not in old or not _same(old[key], value):
+            operations.append(Operation(op, path, key, value.clone()))
+    return operations
+
+
+def _member_keys(obj):
+    """
+    Keys of the members of an object, or None unless they are all distinct
+    and hashable.
+    """
+    keys = []
+    try:
+        for member in obj._content:
+            keys.append(member._key.native_value)
+        if len(set(keys)) == len(keys):
+            return keys
+    except TypeError:
+        pass
+    return None
+
+
+#: Largest number of items on either side of a changed run of array items
+#: aligned by their similarity, rather than by position
+_MAX_ALIGNED = 64
+
+
+def _similarity(old, new):
+    """
+    Score how alike two elements are: 0 for elements that can not be
+    changed into each other, more the more items they share.
+    """
+    if type(old) is not type(new) or old.element != new.element:
+        return 0
+    if structure(type(old)) in (ARRAY, OBJECT):
+        shared = set(hash(item) for item in old._content)
+        return 1 + sum(1 for item in new._content if hash(item) in shared)
+    return 1
+
+
+def _aligned(old_items, new_items):
+    """
+    Pair the items of changed runs, in order, so that the pairs are as alike
+    as possible.
+
+    :return: Pairs of indexes into the runs
+    :rtype: list[tuple[int, int]]
+    """
+    if max(len(old_items), len(new_items)) > _MAX_ALIGNED:
+        return [(i, i) for i in range(min(len(old_items), len(new_items)))]
+    rows = len(old_items) + 1
+    columns = len(new_items) + 1
+    scores = [[0] * columns for _ in range(rows)]
+    for i in range(1, rows):
+        for j in range(1, columns):
+            similarity = _similarity(old_items[i - 1], new_items[j - 1])
+            paired = (scores[i - 1][j - 1] + similarity if similarity
+                      else 0)
+            scores[i][j] = max(scores[i - 1][j], scores[i][j - 1], paired)
+    pairs = []
+    i, j = rows - 1, columns - 1
+    while i and j:
+        if scores[i][j] == scores[i - 1][j]:
+            i -= 1
+        elif scores[i][j] == scores[i][j - 1]:
+            j -= 1
+        else:
+            pairs.append((i - 1, j - 1))
+            i -= 1
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+
+def _array_operations(old, new, path, pairs):
+    operations = []
+    old_items = old._content
+    new_items = new._content
+    matcher = SequenceMatcher(None, [hash(item) for item in old_items],
+                              [hash(item) for item in new_items],
+                              autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for offset in range(i2 - i1):  # Unless their hashes collide
+                if not _same(old_items[i1 + offset], new_items[j1 + offset]):
+                    pairs.append((old_items[i1 + offset],
+                                  new_items[j1 + offset],
+                                  path + (j1 + offset,)))
+            continue
+        i, j = i1, j1  # Next old and new items; j is also the position
+        for old_index, new_index in (
+                _aligned(old_items[i1:i2], new_items[j1:j2]) +
+                [(i2 - i1, j2 - j1)]):  # Then the rest of both runs
+            removed = i1 + old_index - i
+            added = j1 + new_index - j
+            replaced = min(removed, added)  # Items too unalike to pair
+            for index in range(j, j + replaced):
+                operations.append(Operation('replace', path + (index,),
+                                            None, new_items[index].clone()))
+            for _ in range(removed - replaced):
+                operations.append(Operation('delete', path, j + replaced,
+                                            None))
+            for index in range(j + replaced, j + added):
+                operations.append(Operation('insert', path, index,
+                                            new_items[index].clone()))
+            i, j = i1 + old_index, j1 + new_index
+            if i < i2:
+                pairs.append((old_items[i], new_items[j], path + (j,)))
+                i += 1
+                j += 1
+    return operations
+
+
+def _object_operations(old, new, path, pairs):
+    """
+    List the operations matching the members of two objects by key, or
+    return None when their keys can not be matched.
+    """
+    old_keys = _member_keys(old)
+    new_keys = _member_keys(new)
+    if old_keys is None or new_keys is None:
+        return None
+    new_set = set(new_keys)
+    old_members = dict(zip(old_keys, old._content))
+    common = [key for key in old_keys if key in new_set]
+    if common != [key for key in new_keys if key in old_members]:
+        return None  # Members were reordered.
+    operations = [Operation('delete', path, key, None)
+                  for key in old_keys if key not in new_set]
+    for index, (key, member) in enumerate(zip(new_keys, new._content)):
+        existing = old_members.get(key)
+        if existing is None:
+            operations.append(Operation('insert', path, index,
+                                        member.clone()))
+        elif _same(existing, member):
+            continue
+        elif (not _same(existing._key, member._key) or
+              not _same_keyvals(existing, member)):
+            # The member itself changed, rather than only its value.
+            operations.append(Operation('delete', path, key, None))
+            operations.append(Operation('insert', path, index,
+                                        member.clone()))
+        else:
+            pairs.append((existing._value, member._value, path + (key,)))
+    return operations
+
+
+def diff(old, new):
+    """
+    List the operations changing one element tree into another.
+
+    Subtrees with unequal structural hashes are walked, and those with equal
+    hashes are compared, including the types of scalar content, before
+    being skipped.
+
+    :param old: The tree to change
+    :type old: Element
+
+    :param new: The tree it should become
+    :type new: Element
+
+    :return: Operations, whose elements are clones of those of the new tree
+    :rtype: list[Operation]
+    """
+    operations = []
+    pairs = [(old, new, ())]
+    while pairs:
+        old, new, path = pairs.pop()
+        if _same(old, new):
+            continue
+        kind = structure(type(old))
+        if (type(old) is not type(new) or old.element != new.element or
+                kind == MEMBER or
+                kind not in (ARRAY, OBJECT) and
+                (old._content != new._content or
+                 type(old._content) is not type(new._content))):
+            operations.append(Operation('replace', path, None, new.clone()))
+            continue
+        children = []
+        if kind == ARRAY:
+            nested = _array_operations(old, new, path, children)
+        elif kind == OBJECT:
+            nested = _object_operations(old, new, path, children)
+            if nested is None:
+                operations.append(Operation('replace', path, None,
+                                            new.clone()))
+                continue
+        else:
+            nested = []
+        operations.extend(_keyval_operations('meta', path, old._meta,
+                                             new._meta))
+        operations.extend(_keyval_operations('attribute', path,
+                                             old._attributes,
+                                             new._attributes))
+        operations.extend(nested)
+        pairs.extend(reversed(children))
+    return operations
+
+
+def _resolve(root, path):
+    element = root
+    for step in path:
+        if isinstance(element, ObjectElement):
+            element = element[step].value
+        else:
+            element = element[step]
+    return element
+
+
+def patch(root, operations):
+    """
+    Apply operations listed by ``diff`` to an element tree, in place.
+
+    :param root: Tree equal to the one the operations were listed for
+    :type root: Element
+
+    :param operations: The operations to apply
+    :type operations: Iterable[Operation]
+
+    :return: The changed tree, which is a new element when the root itself
+        is replaced
+    :rtype: Element
+
+    :raises KeyError: When the tree has no element at a path
+    :raises IndexError: When the tree has no element at a path
+    """
+    for op, path, key, value in operations:
+        if value is not None:
+            value = value.clone()  # Operations may be applied to many trees.
+        if op == 'replace':
+            if not path:
+                root = value
+                continue
+            parent = _resolve(root, path[:-1])
+            parent[path[-1]] = value
+            continue
+        element = _resolve(root, path)
+        if op == 'insert':
+            if isinstance(element, ObjectElement):
+                element._insert_member(key, value)
+            else:
+                element.insert(key, value)
+        elif op == 'delete':
+            del element[key]
+        elif op in ('meta', 'attribute'):
+            keyvals = element.meta if op == 'meta' else element.attributes
+            if value is None:
+                del keyvals[key]
+            else:
+                keyvals[key] = value
+        else:
+            raise ValueError('Unknown operation: {}'.format(op))
+    return root
+
+
+def to_refract(operations, compact=False):
+    """
+    Serialize operations to JSON-compatible data, with their elements as
+    refract data.
+
+    :param operations: Operations listed by ``diff``
+    :type operations: Iterable[Operation]
+
+    :param compact: Leave out empty meta and attributes of elements
+    :type compact: bool
+
+    :rtype: list[dict]
+    """
+    return [{'op': op, 'path': list(path), 'key': key,
+             'value': None if value is None else value.to_refract(compact)}
+            for op, path, key, value in operations]
+
+
+def from_refract(data, namespace):
+    """
+    Load operations serialized by ``to_refract``.
+
+    :param data: Serialized operations
+    :type data: list[dict]
+
+    :param namespace: Namespace used to decode elements
+    :type namespace: refract.Namespace
+
+    :rtype: list[Operation]
+    """
+    operations = []
+    for item in data:
+        value = item['value']
+        if value is not None:
+            if item['op'] == 'insert':
+                value = _decoded_item(value, namespace)
+            else:
+                value = namespace.from_refract(value)
+        operations.append(Operation(item['op'], tuple(item['path']),
+                                    item['key'], value))
+    return operations
+
+
+def _decoded_item(doc, namespace):
+    cls = namespace.element_classes[doc['element']]
+    if structure(cls) == MEMBER:  # Only decoded within objects otherwise
+        wrapped = namespace.from_refract({'element': 'object',
+                                          'content': [doc]})
+        member = wrapped.content[0]
+        del wrapped[member.key.native_value]
+        return member
+    return namespace.from_refract(doc)
@@ -1,6 +1,7 @@
 import abc
 import copy
-from collections import MutableSequence, MutableMapping, OrderedDict
+import weakref
+from collections import MutableSequence, MutableMapping
 
 import six
 
@@ -8,9 +9,29 @@ __all__ = ['Element', 'NullElement', 'BooleanElement', 'NumberElement',
            'StringElement', 'ArrayElement', 'ObjectElement', 'MemberElement',
            'LinkElement']
 
+#: Whether container classes can be cloned by sharing their storage
+_shareable = {}
+
+#: Whether element classes can be created by ``Element.trusted``
+_trustable = {}
+
+#: Number of instrumented namespaces. Elements only look up the
+#: instrumentation of their namespace while any are.
+_instrumented = 0
+
+#: Number of namespaces and elements with journals; see refract.journal
+_journaled = 0
+
 
 class ElementMap(MutableMapping, dict):
+    """
+    Mapping whose values are wrapped in Elements as they are set.
+
+    :ivar owner: The Element whose meta or attributes this is, if any. Values
+        are contained by the owner, which is notified when they change.
+    """
     namespace = None
+    owner = None
 
     def __init__(self, namespace, **kwargs):
         super(ElementMap, self).__init__()
@@ -19,15 +40,86 @@ class ElementMap(MutableMapping, dict):
 
     def __setitem__(self, key, value):
         value = self.namespace.element(value)
+        owner = self.owner
+        if owner is not None:
+            owner._will_change()
+            if dict.__contains__(self, key):
+                owner._release(dict.__getitem__(self, key))
+            owner._adopt(value)
         dict.__setitem__(self, key, value)
+        if owner is not None:
+            owner._changed()
+            if _journaled:
+                _record(owner, self._journal_op(), key, value)
+
+    def __delitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if self.owner is not None:
+            self.owner._will_change()
+        dict.__delitem__(self, key)
+        if self.owner is not None:
+            self.owner._release(value)
+            self.owner._changed()
+            if _journaled:
+                _record(self.owner, self._journal_op(), key, None)
+
+    def _journal_op(self):
+        return 'meta' if self.owner._meta is self else 'attribute'
+
+    def __reduce__(self):
+        owner = self.owner
+        if owner is not None:  # Restored along with its owner.
+            name = 'meta' if owner._meta is self else 'attributes'
+            return getattr, (owner, name)
+        return _element_map, (self.namespace, None, dict(self))
 
     __getitem__ = dict.__getitem__
-    __delitem__ = dict.__delitem__
     __iter__ = dict.__iter__
     __len__ = dict.__len__
     __contains__ = dict.__contains__
 
 
+def _element_map(namespace, owner, values):
+    """
+    Restore a pickled ElementMap.
+    """
+    mapping = ElementMap(namespace)
+    mapping.owner = owner
+    dict.update(mapping, values)
+    return mapping
+
+
+def _instrumentation(namespace):
+    return getattr(namespace, '_instrumentation', None)
+
+
+def _count_created(element):
+    instrumentation = _instrumentation(element.namespace)
+    if instrumentation is not None:
+        instrumentation.element_created(element)
+
+
+def _record(element, op, key, value, path=()):
+    from .journal import record
+    record(element, op, key, value, path)
+
+
+def _position(index, count):
+    """
+    The position a possibly negative index refers to among count items, as
+    lists clamp it when inserting.
+    """
+    return min(max(index + count if index < 0 else index, 0), count)
+
+
+def _unpickle(namespace, nodes):
+    """
+    Restore a pickled Element.
+    """
+    from .traversal import unflatten
+    return unflatten(namespace, nodes)
+
+
 class Element(six.with_metaclass(abc.ABCMeta, object)):
     """
     Base element class
@@ -37,7 +129,13 @@ class Element(six.with_metaclass(abc.ABCMeta, object)):
     :cvar default_value: Default value for element if none is given
     :cvar scalar: Whether this element wraps scalar values. Determines if type
         rules are applied to content passed into constructor.
+
+    Elements use slots, and only allocate their meta and attributes maps when
+    they are first accessed.
     """
+    __slots__ = ('_content', 'namespace', '_meta', '_attributes', '_parent',
+                 '__weakref__')
+
     element = 'element'
     native_types = None
     default_value = None
@@ -59,10 +157,48 @@ class Element(six.with_metaclass(abc.ABCMeta, object)):
         :type namespace: refract.Namespace
         """
         self._content = None
+        self._parent = None
         self.namespace = namespace
         self.set_content(self.default_value if content is None else content)
-        self.meta = ElementMap(namespace, **(meta or {}))
-        self.attributes = ElementMap(namespace, **(attributes or {}))
+        self._meta = self._element_map(meta) if meta else None
+        self._attributes = (self._element_map(attributes)
+                            if attributes else None)
+        if _instrumented:
+            _count_created(self)
+
+    def __eq__(self, other):
+        """
+        Elements are equal when their names, content, meta and attributes
+        are. Unequal hashes rule most other elements out without comparing
+        their trees.
+        """
+        if self is other:
+            return True
+        if not isinstance(other, Element):
+            return NotImplemented
+        if hash(self) != hash(other):
+            return False
+        from .traversal import equal
+        return equal(self, other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        """
+        Structural hash, which changes as the element is changed.
+        """
+        from .traversal import structural_hash
+        return structural_hash(self)
+
+    def __reduce__(self):
+        """
+        Pickle the tree below this element as a flat list of nodes, which
+        refer to the namespace rather than each pickling it.
+        """
+        from .traversal import flatten
+        return _unpickle, (self.namespace, flatten(self))
 
     def __repr__(self):
         return '<{}: {}>'.format(self.__class__.__name__,
@@ -72,12 +208,96 @@ class Element(six.with_metaclass(abc.ABCMeta, object)):
     def content(self):
         return self._content
 
+    @property
+    def meta(self):
+        if self._meta is None:
+            self._meta = self._element_map()
+        return self._meta
+
+    @meta.setter
+    def meta(self, value):
+        self._will_change()
+        replaced = self._meta
+        self._discard_map(replaced)
+        self._meta = self._element_map(value) if value else None
+        self._changed()
+        if _journaled:
+            self._record_keyvals('meta', replaced, self._meta)
+
+    @property
+    def attributes(self):
+        if self._attributes is None:
+            self._attributes = self._element_map()
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value):
+        self._will_change()
+        replaced = self._attributes
+        self._discard_map(replaced)
+        self._attributes = self._element_map(value) if value else None
+        self._changed()
+        if _journaled:
+            self._record_keyvals('attribute', replaced, self._attributes)
+
+    def _record_keyvals(self, op, replaced, keyvals):
+        """
+        Record the replacement of all meta or attributes with journals.
+        """
+        keyvals = keyvals or {}
+        for key in replaced or ():
+            if key not in keyvals:
+                _record(self, op, key, None)
+        for key, value in keyvals.items():
+            _record(self, op, key, value)
+
+    def _element_map(self, values=None):
+        """
+        Create an ElementMap owned by this element.
+
+        :param values: Initial keys and values
+        :type values: dict
+
+        :rtype: ElementMap
+        """
+        mapping = ElementMap(self.namespace)
+        if values:
+            mapping.update(values)  # Before it is owned, so not journaled
+            for value in dict.values(mapping):
+                self._adopt(value)
+        mapping.owner = self
+        return mapping
+
+    def _discard_map(self, mapping):
+        """
+        Release the values of an ElementMap no longer owned by this element.
+
+        :type mapping: ElementMap | None
+        """
+        if mapping:
+            for value in mapping.values():
+                self._release(value)
+        if mapping is not None:
+            mapping.owner = None
+
     @property
     def native_value(self):
         """
         The native Python value wrapped by this Element.
         """
-        return self.content
+        from .traversal import native_value
+        return native_value(self)
+
+    @property
+    def native_view(self):
+        """
+        A read-only view of the native value of this Element.
+
+        Arrays and objects are viewed as sequences and mappings that unwrap
+        their items only as they are accessed, rather than being copied.
+        """
+        from .views import view
+        return view(self)
 
     def _require_native_type(self, value):
         if self.native_types is not None:
@@ -91,21 +311,216 @@ class Element(six.with_metaclass(abc.ABCMeta, object)):
         Set the wrapped value.
         """
         self._require_native_type(value)
+        self._will_change()
         self._content = value
+        self._changed()
+        if _journaled and self._parent is not None:  # Not when constructed
+            _record(self, 'replace', None, self)
+
+    def _adopt(self, child):
+        """
+        Record this element as a container of the given child element.
+
+        Children only hold weak references to their containers, so elements
+        placed in containers which are discarded do not keep them alive.
+
+        :param child: The element being placed within this element
+        :type child: Element
+
+        :return: The child element
+        :rtype: Element
+        """
+        parent = child._parent
+        if parent is None:
+            child._parent = weakref.ref(self)
+        elif type(parent) is list:
+            parent.append(weakref.ref(self))
+            count = len(parent)
+            if count >= 8 and count & (count - 1) == 0:
+                _containers(child)  # Forget those since collected.
+        elif parent() is None:
+            child._parent = weakref.ref(self)
+        else:
+            child._parent = [parent, weakref.ref(self)]
+        return child
+
+    def _release(self, child):
+        """
+        Forget this element as a container of the given child element.
+
+        :param child: The element being removed from this element
+        :type child: Element
+        """
+        parent = child._parent
+        if type(parent) is list:
+            for index, ref in enumerate(parent):
+                if ref() is self:
+                    del parent[index]
+                    break
+            _containers(child)
+        elif parent is not None and parent() is self:
+            child._parent = None
+
+    def _will_change(self):
+        """
+        Called before this element changes.
+
+        Clones still sharing the storage of this element, or of any element
+        containing it, are given their own copies first so the change is not
+        seen through them. Only the elements containing this one are
+        checked, so clones of other trees cost nothing here.
+        """
+        node = self
+        while True:  # Most elements have a single container.
+            if getattr(node, '_cow', None) is not None:
+                break
+            parent = node._parent
+            if parent is None or type(parent) is list:
+                if parent is None:
+                    return
+                break
+            node = parent()
+            if node is None:
+                return
+        for node in _ancestry(self):
+            sharing = getattr(node, '_cow', None)
+            if sharing is None:
+                continue
+            if type(sharing) is list:
+                node._unshare_clones()
+            else:
+                node._unshare()
+
+    def _changed(self):
+        """
+        Notify this element and everything containing it that it has
+        changed, without recursion.
+        """
+        self._invalidate()
+        changed = [self]
+        while changed:
+            child = changed.pop()
+            parent = child._parent
+            if parent is None:
+                continue
+            if type(parent) is list:
+                containers = _containers(child)
+            else:  # Most elements have a single container.
+                container = parent()
+                if container is None:
+                    child._parent = None
+                    continue
+                containers = (container,)
+            for container in containers:
+                container._child_changed(child)
+                container._invalidate()
+                changed.append(container)
+
+    def _invalidate(self):
+        """
+        Called when this element, or anything it contains, has changed.
+        """
+
+    def _child_changed(self, child):
+        """
+        Called when an element contained by this element has changed.
+
+        :param child: The changed element
+        :type child: Element
+        """
 
     @property
     def refracted(self):
         """
         The serialized Refract data for this Element
 
+        Data nested within the top level is cached and shared between calls
+        until the element changes, so must not be modified.
+
+        :rtype: dict
+        """
+        from .traversal import refracted
+        if _instrumented:
+            instrumentation = _instrumentation(self.namespace)
+            if instrumentation is not None:
+                return instrumentation.refracted(refracted, self)
+        return refracted(self)
+
+    def to_refract(self, compact=False, processes=None, chunk_size=1000):
+        """
+        Serialize this Element to Refract data.
+
+        :param compact: Leave out empty meta and attributes, throughout
+        :type compact: bool
+
+        :param processes: Serialize the items of a large array in this many
+            worker processes
+        :type processes: int | None
+
+        :param chunk_size: Number of array items serialized by a worker at
+            once
+        :type chunk_size: int
+
         :rtype: dict
         """
-        return {
-            'element': self.element,
-            'meta': self._refracted_keyvals(self.meta),
-            'attributes': self._refracted_keyvals(self.attributes),
-            'content': self.content
-        }
+        if processes:
+            from . import pool
+            if pool.splits(self, processes, chunk_size):
+                return pool.refracted(self, compact, processes, chunk_size)
+        if not compact:
+            return self.refracted
+        from .traversal import refracted, compacted, structure, CUSTOM
+        if structure(type(self), 'refracted') == CUSTOM:
+            return compacted(self.refracted)
+        if _instrumented:
+            instrumentation = _instrumentation(self.namespace)
+            if instrumentation is not None:
+                return instrumentation.refracted(refracted, self, True)
+        return refracted(self, compact=True)
+
+    def iterencode(self, compact=False):
+        """
+        Serialize this Element to refract JSON incrementally.
+
+        :param compact: Leave out empty meta and attributes, throughout
+        :type compact: bool
+
+        :return: Chunks of JSON text of ``self.to_refract(compact)``
+        :rtype: Iterator[str]
+        """
+        from .encoding import iterencode
+        return iterencode(self, compact)
+
+    def dump(self, fp, compact=False, processes=None, chunk_size=1000):
+        """
+        Write the refract JSON for this Element to a file-like object.
+
+        :param fp: Text file-like object with a ``write`` method
+        :type fp: file
+
+        :param compact: Leave out empty meta and attributes, throughout
+        :type compact: bool
+
+        :param processes: Serialize the items of a large array in this many
+            worker processes
+        :type processes: int | None
+
+        :param chunk_size: Number of array items serialized by a worker at
+            once
+        :type chunk_size: int
+        """
+        from .encoding import dump
+        dump(self, fp, compact=compact, processes=processes,
+             chunk_size=chunk_size)
+
+    def to_binary(self):
+        """
+        Serialize this Element to compact refract binary data.
+
+        :rtype: bytes
+        """
+        from .binary import dumps
+        return dumps(self)
 
     @staticmethod
     def _should_refract(element):
@@ -124,34 +539,89 @@ class Element(six.with_metaclass(abc.ABCMeta, object)):
         :rtype: bool
         """
         return (element.element == 'member' or
-                element.meta.keys() or
-                element.attributes.keys())
+                bool(element._meta) or
+                bool(element._attributes))
 
-    def _refracted_keyvals(self, keyvals):
+    def _refracted_keyvals(self, keyvals, compact=False):
         """
         Refracts the contents of all values for given key/val pairs.
 
-        :param keyvals: Pairs to refract
-        :type keyvals: dict[str, Element]
+        :param keyvals: Pairs to refract, if any
+        :type keyvals: dict[str, Element] | None
+
+        :param compact: Whether refracted values are compacted
+        :type compact: bool
 
         :rtype: dict[str, dict]
         """
-        return {k: v.refracted if self._should_refract(v) else v.native_value
-                for k, v in six.iteritems(keyvals)}
+        if not keyvals:
+            return {}
+        return {k: v.to_refract(compact) if self._should_refract(v)
+                else v.native_value for k, v in six.iteritems(keyvals)}
 
     @classmethod
     def from_refract(cls, doc, namespace):
-        return cls(doc['content'], doc['meta'], doc['attributes'], namespace)
+        """
+        Load an Element from Refract data.
+
+        Meta and attributes may be left out, as in compact Refract data.
+        """
+        from .traversal import decode
+        return decode(namespace, doc, cls)
+
+    @classmethod
+    def trusted(cls, content=None, meta=None, attributes=None,
+                namespace=None):
+        """
+        Create an Element from values already of the right types, without
+        checking, detecting or wrapping any of them.
+
+        Content is a native value for scalars, a list of elements for
+        arrays, a list of MemberElements for objects and a pair of elements
+        for members. Meta and attributes map keys to elements. Classes
+        overriding how their content is set are created as usual.
+
+        :rtype: Element
+        """
+        if cls not in _trustable:
+            from .traversal import structure, CUSTOM
+            init = getattr(cls.__init__, '__func__', cls.__init__)
+            _trustable[cls] = (structure(cls, 'set_content') != CUSTOM and
+                               init in _trusted_initializers)
+        if not _trustable[cls]:
+            return cls(content, meta, attributes, namespace)
+        element = cls.__new__(cls)
+        element._parent = None
+        element.namespace = namespace
+        element._set_trusted(cls.default_value if content is None
+                             else content)
+        element._meta = element._trusted_map(meta) if meta else None
+        element._attributes = (element._trusted_map(attributes)
+                               if attributes else None)
+        if _instrumented:
+            _count_created(element)
+        return element
+
+    def _set_trusted(self, content):
+        self._content = content
+
+    def _trusted_map(self, values):
+        mapping = _element_map(self.namespace, self, values)
+        for value in six.itervalues(values):
+            self._adopt(value)
+        return mapping
 
     def equals(self, value):
         """
         Check if the wrapped value is equivalent to the provided value.
 
-        :param value: The value to compare
+        :param value: The value to compare, or an element
 
         :rtype: bool
         """
-        return value == self.native_value
+        if isinstance(value, Element):
+            return self == value
+        return value == self.native_view
 
     def clone(self):
         """
@@ -160,14 +630,23 @@ class Element(six.with_metaclass(abc.ABCMeta, object)):
         :return: New element with identical data
         """
         return self.__class__(
-            copy.deepcopy(self.content),
-            copy.deepcopy(self.meta),
-            copy.deepcopy(self.attributes),
+            self._cloned_content(),
+            self._cloned_keyvals(self._meta),
+            self._cloned_keyvals(self._attributes),
             self.namespace
         )
 
+    def _cloned_content(self):
+        return copy.deepcopy(self.content)
+
+    @staticmethod
+    def _cloned_keyvals(keyvals):
+        if not keyvals:
+            return None
+        return {k: v.clone() for k, v in keyvals.items()}
+
     def _meta_value(self, key, default=None):
-        element = self.meta.get(key)
+        element = self._meta.get(key) if self._meta else None
         return element.native_value if element is not None else default
 
     @property
@@ -220,23 +699,31 @@ class Element(six.with_metaclass(abc.ABCMeta, object)):
 
 
 class NullElement(Element):
+    __slots__ = ()
+
     element = 'null'
     native_types = (type(None),)
 
 
 class BooleanElement(Element):
+    __slots__ = ()
+
     element = 'boolean'
     native_types = (bool,)
     default_value = False
 
 
 class NumberElement(Element):
+    __slots__ = ()
+
     element = 'number'
     native_types = (int, float)
     default_value = 0
 
 
 class StringElement(Element):
+    __slots__ = ()
+
     element = 'string'
     native_types = six.string_types
     default_value = ''
@@ -246,67 +733,321 @@ class StringElement(Element):
         return len(self.content)
 
 
-class ArrayElement(Element, MutableSequence):
+def _ancestry(element):
+    """
+    List an element and the elements containing it, outermost first.
+
+    :type element: Element
+
+    :rtype: list[Element]
+    """
+    ordered = []
+    seen = set()
+    stack = [(element, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            ordered.append(node)  # After everything containing it.
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.append((node, True))
+        stack.extend((container, False) for container in _containers(node))
+    return ordered
+
+
+def _containers(element):
+    """
+    List the elements containing an element which are still alive, and
+    forget those which are not.
+
+    :type element: Element
+
+    :rtype: list[Element]
+    """
+    parent = element._parent
+    if parent is None:
+        return []
+    if type(parent) is not list:
+        container = parent()
+        if container is None:
+            element._parent = None
+            return []
+        return [container]
+    containers = []
+    refs = []
+    for ref in parent:
+        container = ref()
+        if container is not None:
+            containers.append(container)
+            refs.append(ref)
+    if len(refs) != len(parent):
+        parent[:] = refs
+    if len(parent) < 2:
+        element._parent = parent[0] if parent else None
+    return containers
+
+
+class _ContainerElement(Element):
+    """
+    Base class for elements containing other elements.
+
+    Serialized refract data is cached on the element, and discarded whenever
+    the element or anything it contains changes.
+
+    Clones share the elements contained by the original until either side
+    needs its own: a clone copies its storage when its contents are first
+    accessed or changed, and the original makes its clones do so before it,
+    or anything within it, changes. The copied storage holds clones in turn,
+    so each step only copies one level.
+    """
+    __slots__ = ('_cache', '_cow')  # _cow: original, or list of clones
+
+    def __init__(self, *args, **kwargs):
+        self._cache = None
+        self._cow = None
+        super(_ContainerElement, self).__init__(*args, **kwargs)
+
+    def _invalidate(self):
+        self._cache = None
+
+    def _set_trusted(self, content):
+        self._cache = None
+        self._cow = None
+        adopt = self._adopt
+        self._content = [adopt(child) for child in content]
+
+    def clone(self):
+        """
+        Obtain a copy-on-write clone of this Element
+
+        :return: New element with identical data
+        """
+        cls = self.__class__
+        if cls not in _shareable:
+            from .traversal import structure, CUSTOM
+            _shareable[cls] = structure(cls, 'set_content') != CUSTOM
+        if not _shareable[cls]:
+            return super(_ContainerElement, self).clone()
+        clone = cls.__new__(cls)
+        clone._parent = None
+        clone._cow = None
+        clone.namespace = self.namespace
+        clone._meta = None
+        clone._attributes = None
+        if self._meta:
+            clone._meta = clone._element_map(self._cloned_keyvals(self._meta))
+        if self._attributes:
+            clone._attributes = clone._element_map(
+                self._cloned_keyvals(self._attributes))
+        if hasattr(self, '__dict__'):
+            clone.__dict__.update(self.__dict__)
+        self._share_content(clone)
+        clone._cache = self._cache
+        original = self
+        if self._cow is not None and type(self._cow) is not list:
+            original = self._cow  # Still sharing the storage of another.
+        clones = original._cow
+        if clones is None:
+            clones = original._cow = []
+        clones.append(weakref.ref(clone))
+        count = len(clones)
+        if count >= 8 and count & (count - 1) == 0:
+            clones[:] = [ref for ref in clones if original._shares(ref())]
+        clone._cow = original
+        if _instrumented:
+            _count_created(clone)
+        return clone
+
+    def _shares(self, clone):
+        """
+        Whether a clone still shares the storage of this element.
+        """
+        return clone is not None and clone._cow is self
+
+    def _share_content(self, clone):
+        """
+        Give a clone the storage of this element.
+        """
+        raise NotImplementedError
+
+    def _own_content(self):
+        """
+        Replace shared storage with storage holding clones of its elements.
+        """
+        raise NotImplementedError
+
+    def _unshare(self):
+        """
+        Stop sharing the storage of the original of this clone.
+        """
+        self._cow = None
+        self._own_content()
+
+    def _unshare_clones(self):
+        """
+        Stop sharing the storage of this element with its clones.
+        """
+        clones = self._cow
+        self._cow = None
+        for ref in clones:
+            clone = ref()
+            if self._shares(clone):
+                clone._unshare()
+
+    def _materialize(self):
+        """
+        Ensure a clone has its own storage before handing out its contents.
+        """
+        if self._cow is not None and type(self._cow) is not list:
+            self._unshare()
+
+
+class ArrayElement(_ContainerElement, MutableSequence):
+    __slots__ = ()
+
     element = 'array'
     native_types = (tuple, list, set)
     default_value = []
 
     def __setitem__(self, index, value):
-        self._content[index] = self.namespace.element(value)
+        self._will_change()
+        if isinstance(index, slice):
+            value = [self._adopt(self.namespace.element(v)) for v in value]
+            for child in self._content[index]:
+                self._release(child)
+        else:
+            value = self._adopt(self.namespace.element(value))
+            self._release(self._content[index])
+        self._content[index] = value
+        self._changed()
+        if _journaled:
+            if isinstance(index, slice):
+                _record(self, 'replace', None, self)
+            else:
+                _record(self, 'replace', None, value,
+                        (_position(index, len(self._content)),))
 
     def __getitem__(self, index):
+        self._materialize()
         return self._content[index]
 
     def __delitem__(self, index):
+        self._will_change()
+        removed = self._content[index]
+        count = len(self._content)
         del self._content[index]
+        for child in removed if isinstance(index, slice) else (removed,):
+            self._release(child)
+        self._changed()
+        if _journaled:
+            if isinstance(index, slice):
+                _record(self, 'replace', None, self)
+            else:
+                _record(self, 'delete', _position(index, count), None)
 
     def __len__(self):
         return len(self._content)
 
     def insert(self, index, value):
-        self._content.insert(index, self.namespace.element(value))
+        self._will_change()
+        value = self._adopt(self.namespace.element(value))
+        count = len(self._content)
+        self._content.insert(index, value)
+        self._changed()
+        if _journaled:
+            _record(self, 'insert', _position(index, count), value)
 
     @property
     def content(self):
+        self._materialize()
         return self._content[0:]  # Full slice as efficient copy
 
     def set_content(self, value):
         self._require_native_type(value)
-        self._content = [self.namespace.element(v) for v in value]
+        self._will_change()
+        for child in self._content or ():
+            self._release(child)
+        self._content = [self._adopt(v if isinstance(v, Element)
+                                     else self.namespace.element(v))
+                         for v in value]
+        self._changed()
+        if _journaled and self._parent is not None:  # Not when constructed
+            _record(self, 'replace', None, self)
+
+    def _cloned_content(self):
+        return [child.clone() for child in self._content]
+
+    def _share_content(self, clone):
+        clone._content = self._content
+
+    def _own_content(self):
+        self._content = [self._adopt(child.clone())
+                         for child in self._content]
 
-    @property
-    def native_value(self):
-        return [item.native_value for item in self]
+    @classmethod
+    def from_refract(cls, doc, namespace):
+        from .traversal import decode
+        return decode(namespace, doc, cls)
 
-    @property
-    def refracted(self):
-        refracted = super(ArrayElement, self).refracted
-        refracted['content'] = [item.refracted for item in self]
-        return refracted
 
+class MemberElement(_ContainerElement):
+    __slots__ = ('_key', '_value')
 
-class MemberElement(Element):
     element = 'member'
     default_value = (None, None)
     native_types = (tuple, dict)
     scalar = False
 
-    _key = None
-    _value = None
+    def __init__(self, *args, **kwargs):
+        self._key = None
+        self._value = None
+        super(MemberElement, self).__init__(*args, **kwargs)
 
     def set_content(self, value):
         self._require_native_type(value)
         if len(value) != 2:
             raise ValueError('MemberElement values are two-element tuples')
-        self.key, self.value = value
+        self._set_key(value[0])
+        self._set_value(value[1])
+        if _journaled and self._parent is not None:  # Not when constructed
+            _record(self, 'key', None, None)
+
+    def _set_trusted(self, content):
+        self._cache = None
+        self._cow = None
+        self._key = self._adopt(content[0])
+        self._value = self._adopt(content[1])
+
+    def _cloned_content(self):
+        return self._key.clone(), self._value.clone()
+
+    def _share_content(self, clone):
+        clone._key = self._key
+        clone._value = self._value
+
+    def _own_content(self):
+        self._key = self._adopt(self._key.clone())
+        self._value = self._adopt(self._value.clone())
 
     @property
     def key(self):
+        self._materialize()
         return self._key
 
     @key.setter
     def key(self, value):
-        self._key = self.namespace.element(value)
+        self._set_key(value)
+        if _journaled:
+            _record(self, 'key', None, None)
+
+    def _set_key(self, value):
+        self._will_change()
+        if self._key is not None:
+            self._release(self._key)
+        self._key = self._adopt(self.namespace.element(value))
+        self._changed()
 
     @property
     def content(self):
@@ -314,50 +1055,54 @@ class MemberElement(Element):
 
     @property
     def value(self):
+        self._materialize()
         return self._value
 
     @value.setter
     def value(self, value):
-        self._value = self.namespace.element(value)
+        self._set_value(value)
+        if _journaled:
+            _record(self, 'value', None, None)
 
-    @property
-    def native_value(self):
-        return {
-            'key': self.key.native_value,
-            'value': self.value.native_value
-        }
-
-    @property
-    def refracted(self):
-        refracted = super(MemberElement, self).refracted
-        refracted['content'] = {
-            'key': self.key.refracted,
-            'value': self.value.refracted
-        }
-        return refracted
+    def _set_value(self, value):
+        self._will_change()
+        if self._value is not None:
+            self._release(self._value)
+        self._value = self._adopt(self.namespace.element(value))
+        self._changed()
 
     @classmethod
     def from_refract(cls, doc, namespace):
         raise NotImplementedError  # Only loads as part of ObjectElement
 
 
-class ObjectElement(Element, MutableMapping):
+class ObjectElement(_ContainerElement, MutableMapping):
     """
     Object Element imlpementing the array[Member Element] schema.
+
+    Members are kept in order in a list, and indexed by the native value of
+    their keys. When several members share a key, the first one wins.
     """
+    __slots__ = ('_index',)
+
     element = 'object'
     native_types = (dict,)
     default_value = {}
 
     def __iter__(self):
-        for member in self.content:
-            yield member.key.native_value
+        for member in self._content[0:]:
+            yield member._key.native_value
 
     def __setitem__(self, key, value):
         existing = self.get(key)
         if existing is None:
-            self._content.append(MemberElement((key, value),
-                                               namespace=self.namespace))
+            member = MemberElement((key, value), namespace=self.namespace)
+            self._will_change()
+            self._content.append(self._adopt(member))
+            self._index_member(member)
+            self._changed()
+            if _journaled:
+                _record(self, 'insert', len(self._content) - 1, member)
         else:
             existing.value = value
 
@@ -365,51 +1110,130 @@ class ObjectElement(Element, MutableMapping):
         return len(self._content)
 
     def __getitem__(self, key):
-        for member in self._content:
-            if member.key.native_value == key:
-                return member
-        raise KeyError
+        self._materialize()
+        try:
+            return self._index[key]
+        except TypeError:  # Unhashable keys are never indexed.
+            raise KeyError(key)
 
     def __delitem__(self, key):
-        for index, member in enumerate(self._content):
-            if member.key.native_value == key:
+        member = self[key]
+        self._will_change()
+        for index, candidate in enumerate(self._content):
+            if candidate is member:
                 self._content.pop(index)
-                return
-        raise KeyError
+                break
+        del self._index[key]
+        self._release(member)
+        if len(self._index) != len(self._content):
+            self._rebuild_index()  # Another member may share the key.
+        self._changed()
+        if _journaled:
+            _record(self, 'delete', key, None)
 
     def set_content(self, value):
-        self._require_native_type(value)
-        self._content = [MemberElement((k, v), namespace=self.namespace)
-                         for k, v in six.iteritems(value)]
+        """
+        Set the members from a dict, or from a list of MemberElements.
 
-    @property
-    def native_value(self):
-        return {m.key.native_value: m.value.native_value for m in self.content}
+        A list of members keeps keys that are equal or unhashable as
+        elements, as refract data may contain.
+        """
+        if not (isinstance(value, list) and
+                all(isinstance(v, MemberElement) for v in value)):
+            self._require_native_type(value)
+            value = [MemberElement((k, v), namespace=self.namespace)
+                     for k, v in six.iteritems(value)]
+        self._will_change()
+        for member in self._content or ():
+            self._release(member)
+        self._content = [self._adopt(member) for member in value]
+        self._rebuild_index()
+        self._changed()
+        if _journaled and self._parent is not None:  # Not when constructed
+            _record(self, 'replace', None, self)
+
+    def _set_trusted(self, content):
+        super(ObjectElement, self)._set_trusted(content)
+        self._rebuild_index()
+
+    def _insert_member(self, index, member):
+        """
+        Insert a MemberElement at a position among the members.
+        """
+        self._will_change()
+        count = len(self._content)
+        self._content.insert(index, self._adopt(member))
+        indexed = len(self._index)
+        self._index_member(member)
+        if len(self._index) == indexed:
+            self._rebuild_index()  # The key may be shared by a later member.
+        self._changed()
+        if _journaled:
+            _record(self, 'insert', _position(index, count), member)
+
+    def _cloned_content(self):
+        return [member.clone() for member in self._content]
+
+    def _share_content(self, clone):
+        clone._content = self._content
+        clone._index = self._index
+
+    def _own_content(self):
+        self._content = [self._adopt(member.clone())
+                         for member in self._content]
+        self._rebuild_index()
 
     @property
-    def refracted(self):
-        refracted = super(ObjectElement, self).refracted
-        refracted['content'] = [m.refracted for m in self._content]
-        return refracted
+    def content(self):
+        self._materialize()
+        return self._content
+
+    def _index_member(self, member):
+        try:
+            key = member._key
+            self._index.setdefault(key._content if type(key) is StringElement
+                                   else key.native_value, member)
+        except TypeError:
+            pass
+
+    def _rebuild_index(self):
+        self._index = {}
+        for member in self._content:
+            self._index_member(member)
+
+    def _child_changed(self, child):
+        if isinstance(child, MemberElement):  # Not a meta/attribute value
+            try:
+                indexed = self._index.get(child._key.native_value) is child
+            except TypeError:
+                indexed = False
+            if not indexed:
+                self._rebuild_index()  # A member key was changed in place.
 
     @classmethod
     def from_refract(cls, doc, namespace):
-        parse = namespace.from_refract
-        # Content populates to a list, so keeping order is less surprising.
-        content = OrderedDict(
-            (parse(m['content']['key']), parse(m['content']['value']))
-            for m in doc['content'])
-        return cls(content, doc['meta'], doc['attributes'], namespace)
+        from .traversal import decode
+        # Members are decoded in order into a list of MemberElements, since
+        # keys may repeat and keeping order is less surprising.
+        return decode(namespace, doc, cls)
+
+
+#: Initializers setting up no more than ``Element.trusted`` does
+_trusted_initializers = tuple(
+    getattr(cls.__init__, '__func__', cls.__init__)
+    for cls in (Element, _ContainerElement, MemberElement))
 
 
 class LinkElement(Element):
+    __slots__ = ()
+
     element = 'link'
     default_value = []
     scalar = False
 
     @property
     def relation(self):
-        el = self.attributes.get('relation')
+        el = self._attributes.get('relation') if self._attributes else None
         return el.native_value if el else None
 
     @relation.setter
@@ -420,7 +1244,7 @@ class LinkElement(Element):
 
     @property
     def href(self):
-        el = self.attributes.get('href')
+        el = self._attributes.get('href') if self._attributes else None
         return el.native_value if el else None
 
     @href.setter
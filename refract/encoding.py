@@ -0,0 +1,156 @@
+"""
+Incremental refract JSON encoding.
+"""
+import json
+from json.encoder import encode_basestring_ascii
+
+import six
+
+from .elements import Element
+from .traversal import structure, SCALAR, ARRAY, OBJECT, MEMBER
+
+__all__ = ['iterencode', 'dump']
+
+_encode = json.JSONEncoder().encode
+
+
+def _encode_value(value):
+    if isinstance(value, six.string_types):
+        return encode_basestring_ascii(value)
+    return _encode(value)
+
+
+_bare_prefixes = {}
+
+
+def _prefix(element, compact):
+    if not element._meta and not element._attributes:
+        key = (element.element, compact)
+        try:
+            return _bare_prefixes[key]
+        except KeyError:
+            prefix = _bare_prefixes[key] = _prefix_with(
+                element.element, None if compact else '{}',
+                None if compact else '{}')
+            return prefix
+    meta = attributes = None
+    if element._meta or not compact:
+        meta = _encode(element._refracted_keyvals(element._meta, compact))
+    if element._attributes or not compact:
+        attributes = _encode(element._refracted_keyvals(element._attributes,
+                                                        compact))
+    return _prefix_with(element.element, meta, attributes)
+
+
+def _prefix_with(name, meta, attributes):
+    prefix = '{"element": ' + _encode_value(name)
+    if meta is not None:
+        prefix += ', "meta": ' + meta
+    if attributes is not None:
+        prefix += ', "attributes": ' + attributes
+    return prefix + ', "content": '
+
+
+def _parts(element, compact):
+    """
+    Yield the JSON text of an element, or its direct child elements in place
+    of their text.
+    """
+    kind = structure(type(element), 'refracted')
+    if kind == SCALAR:
+        yield _prefix(element, compact) + _encode_value(element.content) + '}'
+    elif kind in (ARRAY, OBJECT):
+        yield _prefix(element, compact) + '['
+        separator = ''
+        for child in element._content:
+            if separator:
+                yield separator
+            else:
+                separator = ', '
+            if structure(type(child), 'refracted') == SCALAR:
+                # Leaves are encoded directly rather than in their own frame.
+                yield (_prefix(child, compact) +
+                       _encode_value(child.content) + '}')
+            else:
+                yield child
+        yield ']}'
+    elif kind == MEMBER:
+        yield _prefix(element, compact) + '{"key": '
+        yield element._key
+        yield ', "value": '
+        yield element._value
+        yield '}}'
+    else:  # Custom serialization; encode whatever it produces.
+        yield _encode(element.to_refract(compact))
+
+
+def iterencode(element, compact=False):
+    """
+    Serialize an element to refract JSON, one chunk of text at a time.
+
+    The tree is walked once without recursion, so only the path to the node
+    being encoded is held in memory. Joined, the chunks parse to the same
+    data as ``element.to_refract(compact)``.
+
+    :param element: The element to serialize
+    :type element: Element
+
+    :param compact: Leave out empty meta and attributes
+    :type compact: bool
+
+    :rtype: Iterator[str]
+    """
+    stack = [iter((element,))]
+    while stack:
+        for part in stack[-1]:
+            if isinstance(part, Element):
+                stack.append(_parts(part, compact))
+                break
+            yield part
+        else:
+            stack.pop()
+
+
+def dump(element, fp, buffer_size=65536, compact=False, processes=None,
+         chunk_size=1000):
+    """
+    Serialize an element as refract JSON to a file-like object.
+
+    Sockets can be written to through ``socket.makefile('w')``.
+
+    :param element: The element to serialize
+    :type element: Element
+
+    :param fp: Text file-like object with a ``write`` method
+    :type fp: file
+
+    :param buffer_size: Approximate number of characters per write
+    :type buffer_size: int
+
+    :param compact: Leave out empty meta and attributes
+    :type compact: bool
+
+    :param processes: Serialize the items of a large array in this many
+        worker processes
+    :type processes: int | None
+
+    :param chunk_size: Number of array items serialized by a worker at once
+    :type chunk_size: int
+    """
+    chunks = None
+    if processes:
+        from . import pool
+        if pool.splits(element, processes, chunk_size):
+            chunks = pool.encoded_chunks(element, compact, processes,
+                                         chunk_size)
+    buffered = []
+    size = 0
+    for chunk in chunks or iterencode(element, compact):
+        buffered.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            fp.write(''.join(buffered))
+            buffered = []
+            size = 0
+    if buffered:
+        fp.write(''.join(buffered))
@@ -0,0 +1,196 @@
+"""
+Counters and hooks instrumenting a Namespace.
+
+Instrumentation is collected once ``Namespace.instrument()`` is called. It
+counts the elements created per class, calls of detection predicates and
+those not matching, and ``from_refract`` calls per element name, and sums
+the time spent in ``refracted`` and ``from_refract``.
+
+Hooks are called with the details of each event as it happens:
+
+``created``
+    Called with each element created in the namespace.
+``detected``
+    Called with a value and the element class detected for it.
+``refracted``
+    Called with an element and the seconds spent serializing it.
+``from_refract``
+    Called with refract data, the element decoded from it and the seconds
+    spent decoding it. Documents decoded together by ``from_refract_many``
+    are each given an equal share of the time.
+
+Namespaces which are not instrumented only check a module flag when
+elements are created, so cost next to nothing.
+"""
+import weakref
+from collections import defaultdict
+from timeit import default_timer
+
+from . import elements
+
+__all__ = ['Instrumentation']
+
+EVENTS = ('created', 'detected', 'refracted', 'from_refract')
+
+
+class Instrumentation(object):
+    """
+    Counters and hooks of an instrumented Namespace.
+
+    :ivar created: Number of elements created, by class name
+    :ivar detection_calls: Number of detection predicate calls
+    :ivar detection_misses: Number of detection predicate calls not matching
+    :ivar detection_cache_misses: Number of values whose type was not yet
+        in the detection cache
+    :ivar from_refract_calls: Number of documents decoded, by element name
+    :ivar from_refract_time: Seconds spent decoding refract data
+    :ivar refracted_calls: Number of elements serialized to refract data
+    :ivar refracted_time: Seconds spent serializing to refract data
+    """
+    def __init__(self):
+        self.hooks = defaultdict(list)
+        self._depth = {'refracted': 0, 'from_refract': 0}
+        self.reset()
+
+    def reset(self):
+        """
+        Set all counters back to zero.
+        """
+        self.created = defaultdict(int)
+        self.detection_calls = 0
+        self.detection_misses = 0
+        self.detection_cache_misses = 0
+        self.from_refract_calls = defaultdict(int)
+        self.from_refract_time = 0.0
+        self.refracted_calls = 0
+        self.refracted_time = 0.0
+
+    def snapshot(self):
+        """
+        Copy the counters as they are now.
+
+        :rtype: dict
+        """
+        return {
+            'created': dict(self.created),
+            'detection': {'calls': self.detection_calls,
+                          'misses': self.detection_misses,
+                          'cache_misses': self.detection_cache_misses},
+            'from_refract': {'calls': dict(self.from_refract_calls),
+                             'time': self.from_refract_time},
+            'refracted': {'calls': self.refracted_calls,
+                          'time': self.refracted_time},
+        }
+
+    def add_hook(self, event, func):
+        """
+        Call a function on every event of a kind.
+
+        :param event: ``created``, ``detected``, ``refracted`` or
+            ``from_refract``
+        :type event: str
+
+        :param func: Function called with the details of each event
+        :type func: callable
+        """
+        if event not in EVENTS:
+            raise ValueError('Unknown instrumentation event: {}'.format(
+                event))
+        self.hooks[event].append(func)
+
+    def remove_hook(self, event, func):
+        """
+        Stop calling a function added with ``add_hook``.
+        """
+        self.hooks[event].remove(func)
+
+    def element_created(self, element):
+        self.created[type(element).__name__] += 1
+        for hook in self.hooks.get('created', ()):
+            hook(element)
+
+    def detected(self, value, element_class):
+        for hook in self.hooks.get('detected', ()):
+            hook(value, element_class)
+
+    def refracted(self, func, element, *args):
+        """
+        Serialize an element with func, timing it unless within another
+        serialization.
+        """
+        if self._depth['refracted']:  # Timed by the outer call
+            return func(element, *args)
+        result, elapsed = self._timed('refracted', func, (element,) + args)
+        self.refracted_calls += 1
+        self.refracted_time += elapsed
+        for hook in self.hooks.get('refracted', ()):
+            hook(element, elapsed)
+        return result
+
+    def from_refract(self, func, doc, *args):
+        """
+        Decode refract data with func, timing it unless within another
+        decoding.
+        """
+        if self._depth['from_refract']:
+            return func(doc, *args)
+        result, elapsed = self._timed('from_refract', func, (doc,) + args)
+        self.from_refract_calls[doc.get('element')] += 1
+        self.from_refract_time += elapsed
+        for hook in self.hooks.get('from_refract', ()):
+            hook(doc, result, elapsed)
+        return result
+
+    def from_refract_many(self, func, docs, *args):
+        """
+        Decode a list of refract documents with func, timing it.
+        """
+        if self._depth['from_refract']:
+            return func(docs, *args)
+        results, elapsed = self._timed('from_refract', func, (docs,) + args)
+        calls = self.from_refract_calls
+        for doc in docs:
+            calls[doc.get('element')] += 1
+        self.from_refract_time += elapsed
+        hooks = self.hooks.get('from_refract', ())
+        if hooks and docs:
+            share = elapsed / len(docs)
+            for doc, result in zip(docs, results):
+                for hook in hooks:
+                    hook(doc, result, share)
+        return results
+
+    def _timed(self, operation, func, args):
+        self._depth[operation] += 1
+        start = default_timer()
+        try:
+            result = func(*args)
+        finally:
+            self._depth[operation] -= 1
+        return result, default_timer() - start
+
+
+#: Weak references to the instrumented namespaces, by id
+_namespaces = {}
+
+
+def enable(namespace):
+    """
+    Note that a namespace is instrumented, until it is disabled or
+    collected.
+    """
+    key = id(namespace)
+    _namespaces[key] = weakref.ref(namespace, lambda ref: _forget(key))
+    elements._instrumented = len(_namespaces)
+
+
+def disable(namespace):
+    """
+    Note that a namespace is no longer instrumented.
+    """
+    _forget(id(namespace))
+
+
+def _forget(key):
+    _namespaces.pop(key, None)
+    elements._instrumented = len(_namespaces)
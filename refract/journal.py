@@ -0,0 +1,309 @@
+"""
+Journals of the changes made to element trees, for updating caches, search
+indexes and replicas incrementally rather than from scratch.
+
+A ``Journal`` records the changes made to the trees of a namespace, or to
+the tree within a root element, from the moment it is created until it is
+closed. Changes are recorded as they are made through:
+
+- ``ArrayElement.__setitem__``, ``insert`` and ``__delitem__``, and so
+  ``append``, ``extend``, ``pop`` and ``remove`` too
+- ``ObjectElement.__setitem__`` and ``__delitem__``
+- the ``key`` and ``value`` setters of ``MemberElement``
+- setting and deleting values of ``meta`` and ``attributes``
+
+``set_content`` is recorded as a replacement of the element once it is
+within a container; constructing elements is not recorded.
+
+Each change is the root of the changed tree and an operation of
+``refract.diff`` addressed from it, so changes to a root can be applied to a
+copy of it with ``refract.diff.patch``. Changes which can not be addressed
+by a path, such as to the key of a member, or to an element within a meta
+value, are recorded as a replacement of the nearest element that can be.
+Elements contained in several trees are addressed through a container
+leading to a journaled root, or else the first still alive.
+
+Trees which are not journaled only check a module flag when changed, so
+cost next to nothing.
+"""
+import weakref
+from collections import namedtuple
+
+from . import elements
+from .diff import Operation
+from .traversal import structure, ARRAY, OBJECT
+
+__all__ = ['Change', 'Journal']
+
+Change = namedtuple('Change', 'root operation')
+
+
+class Journal(object):
+    """
+    Changes made to the trees of a namespace, or within a root element.
+
+    Journals only hold a weak reference to what they record, and stop
+    recording once it is collected.
+
+    :ivar changes: Changes recorded and not yet drained
+    :ivar subscribers: Functions called with each change as it is recorded
+    """
+    def __init__(self, target, keep=True):
+        """
+        Start recording changes.
+
+        :param target: Namespace whose trees are recorded, or the root
+            element of a tree; roots must not be members
+        :type target: refract.Namespace or Element
+
+        :param keep: Whether changes are kept until drained; turn this off
+            when they are only passed to subscribers
+        :type keep: bool
+        """
+        self._target = weakref.ref(target)
+        self.keep = keep
+        self.changes = []
+        self.subscribers = []
+        self.closed = False
+        _attach(target, self)
+
+    @property
+    def target(self):
+        """
+        The namespace or root element recorded, or None once collected.
+        """
+        return self._target()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def drain(self):
+        """
+        Take the changes recorded since the last time.
+
+        :rtype: list[Change]
+        """
+        changes = self.changes
+        self.changes = []
+        return changes
+
+    def operations(self):
+        """
+        Take the operations of the changes recorded since the last time,
+        which ``refract.diff.patch`` can apply to a copy of a journaled
+        root.
+
+        :rtype: list[Operation]
+        """
+        return [change.operation for change in self.drain()]
+
+    def subscribe(self, func):
+        """
+        Call a function with each change as it is recorded.
+
+        :param func: Function called with a Change
+        :type func: callable
+        """
+        self.subscribers.append(func)
+
+    def unsubscribe(self, func):
+        """
+        Stop calling a function added with ``subscribe``.
+        """
+        self.subscribers.remove(func)
+
+    def close(self):
+        """
+        Stop recording changes. Changes already recorded can still be
+        drained.
+        """
+        if not self.closed:
+            self.closed = True
+            target = self.target
+            if target is not None:
+                _detach(target, self)
+
+    def record(self, root, operation):
+        change = Change(root, operation)
+        if self.keep:
+            self.changes.append(change)
+        for func in self.subscribers:
+            func(change)
+
+
+#: Journals and a weak reference to their target, by id of the target
+_targets = {}
+
+
+def _attach(target, journal):
+    key = id(target)
+    entry = _targets.get(key)
+    if entry is None:
+        entry = _targets[key] = (
+            weakref.ref(target, lambda ref: _forget(key)), [])
+    entry[1].append(journal)
+    elements._journaled = len(_targets)
+
+
+def _detach(target, journal):
+    key = id(target)
+    entry = _targets.get(key)
+    if entry is not None and entry[0]() is target:
+        entry[1].remove(journal)
+        if not entry[1]:
+            _forget(key)
+
+
+def _forget(key):
+    _targets.pop(key, None)
+    elements._journaled = len(_targets)
+
+
+def _journals(target):
+    entry = _targets.get(id(target))
+    if entry is None or entry[0]() is not target:
+        return None
+    return entry[1]
+
+
+def _container(element):
+    """
+    The container through which a change to an element is addressed: one
+    leading to a journaled root when there are several, or else the first.
+    """
+    containers = elements._containers(element)
+    if len(containers) > 1:
+        for container in containers:
+            if _journaled_ancestor(container):
+                return container
+    return containers[0] if containers else None
+
+
+def _keyval(element, child):
+    """
+    Find the meta or attribute value an element is, as an operation setting
+    it again.
+    """
+    for op, keyvals in (('meta', element._meta),
+                        ('attribute', element._attributes)):
+        for key, value in (keyvals or {}).items():
+            if value is child:
+                return op, key
+    return None
+
+
+def _indexed_key(obj, member):
+    """
+    The key addressing a member of an object, or None when no path leads to
+    it.
+    """
+    try:
+        key = member._key.native_value
+        if obj._index.get(key) is member:
+            return key
+    except TypeError:
+        pass
+    return None
+
+
+def _lifted(node, operation):
+    """
+    Address an operation on an element from its container instead.
+
+    :return: The container and the operation addressed from it
+    """
+    parent = _container(node)
+    op, path, key, value = operation
+    kind = structure(type(parent))
+    if kind == ARRAY:
+        for index, child in enumerate(parent._content):
+            if child is node:
+                return parent, Operation(op, (index,) + path, key, value)
+    keyval = _keyval(parent, node)
+    if keyval is not None:
+        return parent, Operation(keyval[0], (), keyval[1], node)
+    if kind == OBJECT:  # Members are replaced with their objects.
+        return parent, Operation('replace', (), None, parent)
+    container = _container(parent)
+    if (isinstance(parent, elements.MemberElement) and
+            parent._value is node and container is not None and
+            structure(type(container)) == OBJECT):
+        member_key = _indexed_key(container, parent)
+        if member_key is not None:
+            return container, Operation(op, (member_key,) + path, key,
+                                        value)
+    return parent, Operation('replace', (), None, parent)
+
+
+def _member_operation(member, changed):
+    """
+    Address a change of the key or value of a member from its object.
+    """
+    obj = _container(member)
+    if obj is None or structure(type(obj)) != OBJECT:
+        return member, Operation('replace', (), None, member)
+    if changed == 'value':
+        key = _indexed_key(obj, member)
+        if key is not None:
+            return obj, Operation('replace', (key,), None, member._value)
+    return obj, Operation('replace', (), None, obj)
+
+
+def record(element, op, key, value, path=()):
+    """
+    Record a change made to an element with the journals of its trees.
+
+    :param element: The changed element
+    :type element: Element
+
+    :param op: Operation, as listed by ``refract.diff``, or ``key`` or
+        ``value`` for the parts of a member
+    :type op: str
+
+    :param path: Path of the operation from the element
+    :type path: tuple
+    """
+    namespace_journals = _journals(element.namespace)
+    if namespace_journals is None and not _journaled_ancestor(element):
+        return
+    if op in ('key', 'value'):
+        node, operation = _member_operation(element, op)
+    else:
+        node, operation = element, Operation(op, path, key, value)
+    while True:
+        journals = _journals(node)
+        if journals:
+            _emit(journals, node, operation)
+        if _container(node) is None:
+            break
+        node, operation = _lifted(node, operation)
+    if namespace_journals:
+        _emit(namespace_journals, node, operation)
+
+
+def _journaled_ancestor(element):
+    """
+    Whether an element, or any element containing it, has a journal; a
+    quick check before working out any paths.
+    """
+    seen = set()
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if id(node) in _targets and _journals(node):
+            return True
+        if node._parent is not None and id(node) not in seen:
+            seen.add(id(node))
+            stack.extend(elements._containers(node))
+    return False
+
+
+def _emit(journals, root, operation):
+    value = operation.value
+    if value is not None:
+        operation = operation._replace(value=value.clone())
+    for journal in list(journals):
+        journal.record(root, operation)
@@ -0,0 +1,216 @@
+"""
+Lazily loaded element trees, read from refract binary data in place.
+
+Containers are created without their contents, which are read from the
+data the first time anything accesses them. Each read covers one level:
+scalars are loaded along with their container, while contained arrays and
+objects are created without their contents in turn. Members are loaded with
+their key and value, and meta and attributes with their element.
+
+Stand-ins take the place of the list of items of a container, and of the
+key index of an object, until they are read. Every way of reading or
+changing a container, including those of the traversal engine, goes
+through them and so reads them first. Once read, the container holds plain
+storage again.
+
+Memory-mapped files are read in place, so opening a large document only
+reads its string table, and then the parts of it that are accessed.
+"""
+import mmap
+import struct
+
+from .binary import (_view, _read_strings, _read_varint, _read_tree,
+                     _MAGIC, _CONTAINER_NODE, _HAS_KEYVALS)
+from .traversal import structure, MEMBER, OBJECT, CUSTOM
+
+__all__ = ['loads', 'load']
+
+
+class _Source(object):
+    """
+    The contents of a container, not yet read.
+
+    :ivar content: The items read, once they are
+    :ivar keys: The key index of an object, once its members are read
+    """
+    __slots__ = ('owner', 'view', 'pos', 'count', 'strings', 'namespace',
+                 'content', 'keys')
+
+    def __init__(self, owner, view, pos, count, strings, namespace):
+        self.owner = owner
+        self.view = view
+        self.pos = pos
+        self.count = count
+        self.strings = strings
+        self.namespace = namespace
+        self.content = self.keys = None
+
+    def read(self):
+        """
+        Read the contents, and give them to the container.
+        """
+        owner = self.owner
+        if owner is None:  # Already read
+            return
+        pos = self.pos
+        items = []
+        try:
+            for _ in range(self.count):
+                item, pos = _read_node(self.view, pos, self.strings,
+                                       self.namespace)
+                items.append(owner._adopt(item))
+        except (IndexError, struct.error):
+            raise ValueError('Truncated refract binary data')
+        self.owner = self.view = self.strings = None
+        self.content = items
+        if isinstance(owner._content, _PendingItems):
+            owner._content = items
+        if isinstance(getattr(owner, '_index', None), _PendingIndex):
+            owner._rebuild_index()
+            self.keys = owner._index
+
+
+def _reading(base, name, storage):
+    method = getattr(base, name)
+
+    def read_first(self, *args, **kwargs):
+        source = self._source
+        source.read()
+        return method(getattr(source, storage), *args, **kwargs)
+    read_first.__name__ = name
+    return read_first
+
+
+def _pending(base, storage, names):
+    """
+    Create a subclass of list or dict standing in for storage not yet read.
+
+    Its methods read the storage first, then act on it in its stead, so
+    anything holding on to the stand-in sees the storage read and changes
+    made to it.
+    """
+    namespace = {'__slots__': ('_source',), '__hash__': None}
+    for name in names:
+        if hasattr(base, name):
+            namespace[name] = _reading(base, name, storage)
+
+    def __init__(self, source):
+        base.__init__(self)
+        self._source = source
+    namespace['__init__'] = __init__
+    return type('_Pending' + base.__name__.capitalize(), (base,), namespace)
+
+
+_COMMON = ('__contains__', '__delitem__', '__eq__', '__ge__', '__getitem__',
+           '__gt__', '__iter__', '__le__', '__lt__', '__ne__', '__repr__',
+           '__setitem__', '__sizeof__', '__reduce__', '__reduce_ex__',
+           'clear', 'copy', 'pop')
+
+_LIST_METHODS = _COMMON + (
+    '__add__', '__iadd__', '__imul__', '__mul__', '__rmul__', '__reversed__',
+    '__getslice__', '__setslice__', '__delslice__', 'append', 'count',
+    'extend', 'index', 'insert', 'remove', 'reverse', 'sort')
+
+_PendingItems = _pending(list, 'content', _LIST_METHODS)
+
+_PendingIndex = _pending(dict, 'keys', _COMMON + (
+    '__len__', 'get', 'has_key', 'items', 'iteritems', 'iterkeys',
+    'itervalues', 'keys', 'popitem', 'setdefault', 'update', 'values',
+    'viewitems', 'viewkeys', 'viewvalues'))
+
+
+def _items_len(self):
+    source = self._source
+    if source.content is None:
+        return source.count  # Known without reading the items
+    return len(source.content)
+
+
+_PendingItems.__len__ = _items_len
+
+
+def _read_node(view, pos, strings, namespace):
+    """
+    Read a node, leaving the contents of arrays and objects to be read when
+    they are accessed.
+
+    :return: The element and the position after its node
+    :rtype: tuple
+    """
+    header, start = _read_varint(view, pos)
+    cls = namespace.element_classes[strings[header >> 3]]
+    if (header & 3 != _CONTAINER_NODE or
+            structure(cls, 'set_content') == CUSTOM):
+        return _read_tree(view, pos, strings, namespace)
+    length, start = _read_varint(view, start)
+    end = start + length
+    keyvals = [{}, {}]
+    if header & _HAS_KEYVALS:
+        meta_count, start = _read_varint(view, start)
+        attribute_count, start = _read_varint(view, start)
+        for keyval_index in range(meta_count + attribute_count):
+            index, start = _read_varint(view, start)
+            keyvals[keyval_index >= meta_count][strings[index]], start = \
+                _read_tree(view, start, strings, namespace)
+    count, start = _read_varint(view, start)
+    meta, attributes = keyvals[0] or None, keyvals[1] or None
+    if structure(cls) == MEMBER:  # Only ever read along with its object
+        key, start = _read_node(view, start, strings, namespace)
+        value, start = _read_node(view, start, strings, namespace)
+        return cls((key, value), meta, attributes, namespace), end
+    element = cls([], meta, attributes, namespace)
+    source = _Source(element, view, start, count, strings, namespace)
+    element._content = _PendingItems(source)
+    if structure(cls) == OBJECT:
+        element._index = _PendingIndex(source)
+    return element, end
+
+
+def loads(data, namespace):
+    """
+    Load an element tree from refract binary data, reading the contents of
+    its containers only as they are accessed.
+
+    The data must not change while the tree is in use.
+
+    :param data: Binary data, or any object supporting the buffer protocol,
+        such as a memory-mapped file
+    :type data: bytes | memoryview | mmap.mmap
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :rtype: Element
+
+    :raises ValueError: When the data is not refract binary data
+    """
+    view = _view(data)
+    if bytes(view[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError('Not refract binary data')
+    try:
+        strings, pos = _read_strings(view, len(_MAGIC))
+        element, pos = _read_node(view, pos, strings, namespace)
+    except (IndexError, struct.error):
+        raise ValueError('Truncated refract binary data')
+    if pos != len(view):
+        raise ValueError('Extra data after refract binary document')
+    return element
+
+
+def load(fp, namespace):
+    """
+    Memory-map a refract binary file, and load its element tree lazily.
+
+    The mapping stays open as long as any part of the tree still needs it,
+    whether or not the file is closed.
+
+    :param fp: File opened for reading in binary mode
+    :type fp: file
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :rtype: Element
+    """
+    return loads(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ),
+                 namespace)
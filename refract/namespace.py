@@ -1,9 +1,12 @@
 from collections import namedtuple
-
+from functools import partial
 
 import six
 
 from .elements import *
+from .packed import PackedArrayElement, _is_packable
+from .traversal import (build, build_many, decode, decode_many, structure,
+                        CUSTOM)
 
 ElementDetector = namedtuple('ElementDetector', 'test type')
 
@@ -12,14 +15,61 @@ class ElementClassNotFound(Exception):
     pass
 
 
+# Default detectors are module functions so namespaces can be pickled.
+
+def _is_null(value):
+    return value is None
+
+
+def _is_boolean(value):
+    return isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float))
+
+
+def _is_string(value):
+    return isinstance(value, six.string_types)
+
+
+def _is_array(value):
+    return isinstance(value, (list, tuple, set))
+
+
+def _is_object(value):
+    return isinstance(value, dict)
+
+
 class Namespace(object):
-    def __init__(self, no_defaults=False):
+    def __init__(self, no_defaults=False, intern_strings=True,
+                 interned_length=64, packed_size=None):
         """
         :param no_defaults: Exclude default primitive Element types
         :type no_defaults: bool
+
+        :param intern_strings: Whether each call wrapping or decoding values
+            keeps a single copy of equal meta, attribute and member keys
+        :type intern_strings: bool
+
+        :param interned_length: Longest string content also kept as a single
+            copy; 0 interns keys only
+        :type interned_length: int
+
+        :param packed_size: Wrap lists and tuples of at least this many
+            integers, or of floats, in PackedArrayElements, and decode arrays
+            of as many numbers into them; None never packs
+        :type packed_size: int | None
         """
+        self.intern_strings = intern_strings
+        self.interned_length = interned_length
+        self.packed_size = packed_size
         self.element_classes = {}
         self.element_detection = []
+        self._cacheable = set()
+        self._detection_cache = {}
+        self._dispatch = None
+        self._instrumentation = None
         if not no_defaults:
             default_classes = (
                 BooleanElement,
@@ -32,15 +82,25 @@ class Namespace(object):
             )
             for element_class in default_classes:
                 self.register_element_class(element_class)
-            self.add_detection(lambda v: v is None, NullElement)
-            self.add_detection(lambda v: isinstance(v, bool), BooleanElement)
-            self.add_detection(lambda v: isinstance(v, (int, float)),
-                               NumberElement)
-            self.add_detection(lambda v: isinstance(v, six.string_types),
-                               StringElement)
-            self.add_detection(lambda v: isinstance(v, (list, tuple, set)),
-                               ArrayElement)
-            self.add_detection(lambda v: isinstance(v, dict), ObjectElement)
+            self.add_detection(_is_null, NullElement, cacheable=True)
+            self.add_detection(_is_boolean, BooleanElement, cacheable=True)
+            self.add_detection(_is_number, NumberElement, cacheable=True)
+            self.add_detection(_is_string, StringElement, cacheable=True)
+            if packed_size is not None:
+                self.add_detection(partial(_is_packable, packed_size),
+                                   PackedArrayElement)
+            self.add_detection(_is_array, ArrayElement, cacheable=True)
+            self.add_detection(_is_object, ObjectElement, cacheable=True)
+
+    def __reduce__(self):
+        # Detection is cached again as values are seen.
+        state = dict(self.__dict__)
+        del state['_detection_cache']
+        state['_dispatch'] = None
+        # Instrumentation stays with the namespace it was collected for.
+        state['_instrumentation'] = None
+        state.pop('detected_element_class', None)
+        return self.__class__, (True,), state
 
     def register_element_class(self, element_class, name=None):
         """
@@ -53,6 +113,8 @@ class Namespace(object):
         :type name: str
         """
         self.element_classes[name or element_class.element] = element_class
+        self._detection_cache.clear()
+        self._dispatch = None
 
     def unregister_element_class(self, name):
         """
@@ -62,8 +124,11 @@ class Namespace(object):
         :type name: str
         """
         del self.element_classes[name]
+        self._detection_cache.clear()
+        self._dispatch = None
 
-    def add_detection(self, func, element_class, prepend=False):
+    def add_detection(self, func, element_class, prepend=False,
+                      cacheable=False):
         """
         Add a new detection function used to determine element type for a value.
 
@@ -75,12 +140,19 @@ class Namespace(object):
 
         :param prepend: Whether to put this at the front of detection functions
         :type: bool
+
+        :param cacheable: Whether func's result depends only on the exact type
+            of the value, allowing detection to be cached per type
+        :type cacheable: bool
         """
         detector = ElementDetector(func, element_class)
+        if cacheable:
+            self._cacheable.add(detector)
         if prepend:
             self.element_detection.insert(0, detector)
         else:
             self.element_detection.append(detector)
+        self._detection_cache.clear()
 
     def element(self, value):
         """
@@ -92,10 +164,36 @@ class Namespace(object):
         :return: Element wrapping the value
         :rtype: Element
         """
-        if isinstance(value, Element):
-            return value
-        element_class = self.detected_element_class(value)
-        return element_class(value, namespace=self)
+        return build(self, value)
+
+    def elements(self, values, processes=None, chunk_size=1000):
+        """
+        Given many values, return the Elements wrapping them.
+
+        The values are wrapped in a single walk, rather than one call per
+        value.
+
+        :param values: Values that can be described by this namespace
+        :type values: Iterable[Any]
+
+        :param processes: Wrap values in this many worker processes, for
+            large batches. Workers need this namespace, so its element
+            classes and detectors must be picklable where processes are not
+            forked.
+        :type processes: int | None
+
+        :param chunk_size: Number of values sent to a worker at once
+        :type chunk_size: int
+
+        :return: Elements wrapping the values, in order
+        :rtype: list[Element]
+        """
+        values = list(values)
+        if processes and processes > 1 and len(values) > chunk_size:
+            from .pool import map_chunks, build_chunk
+            return map_chunks(self, build_chunk, values, processes,
+                              chunk_size)
+        return build_many(self, values)
 
     def detected_element_class(self, value):
         """
@@ -109,11 +207,202 @@ class Namespace(object):
 
         :raises ElementClassNotFound: When no appropriate element class found
         """
+        try:
+            plan = self._detection_cache[type(value)]
+        except KeyError:
+            plan = self._detection_plan(value)
+        for test, element_class in plan:
+            if test is None or test(value):
+                return element_class
+        raise ElementClassNotFound
+
+    def _counted_detected_element_class(self, value):
+        """
+        ``detected_element_class``, counting detection for instrumentation.
+        """
+        instrumentation = self._instrumentation
+        try:
+            plan = self._detection_cache[type(value)]
+        except KeyError:
+            instrumentation.detection_cache_misses += 1
+            plan = self._detection_plan(value)
+        for test, element_class in plan:
+            if test is not None:
+                instrumentation.detection_calls += 1
+                if not test(value):
+                    instrumentation.detection_misses += 1
+                    continue
+            instrumentation.detected(value, element_class)
+            return element_class
+        instrumentation.detected(value, None)
+        raise ElementClassNotFound
+
+    def _detection_plan(self, value):
+        """
+        Build and cache the detectors to consult for values of this type.
+
+        Cacheable detectors are evaluated once per type: those that do not
+        match are dropped, and the first that does ends the plan, without a
+        test. Detectors that are not cacheable are kept so they run for every
+        value.
+
+        :param value: A value whose type has not been seen yet
+        :type value: Any
+
+        :return: Pairs of a test, or None when it always matches, and the
+            element class it detects
+        :rtype: tuple[tuple[callable | None, Type[Element]]]
+        """
+        instrumentation = self._instrumentation
+        cacheable = self._cacheable
+        plan = []
         for detector in self.element_detection:  # type: ElementDetector
+            if detector not in cacheable:
+                plan.append(detector)
+                continue
+            if instrumentation is not None:
+                instrumentation.detection_calls += 1
             if detector.test(value):
-                return detector.type
-        raise ElementClassNotFound
+                plan.append((None, detector.type))
+                break
+            if instrumentation is not None:
+                instrumentation.detection_misses += 1
+        plan = tuple(plan)
+        self._detection_cache[type(value)] = plan
+        return plan
 
-    def from_refract(self, doc):
+    @property
+    def instrumentation(self):
+        """
+        Counters and hooks of this namespace, while it is instrumented.
+
+        :rtype: refract.instrumentation.Instrumentation | None
+        """
+        return self._instrumentation
+
+    def instrument(self):
+        """
+        Start counting the elements created, detection and decoding in this
+        namespace, and timing serialization and decoding.
+
+        :return: The counters and hooks, kept until ``uninstrument``
+        :rtype: refract.instrumentation.Instrumentation
+        """
+        if self._instrumentation is None:
+            from .instrumentation import Instrumentation, enable
+            self._instrumentation = Instrumentation()
+            # Shadows the method, so detection in namespaces which are not
+            # instrumented checks nothing.
+            self.detected_element_class = self._counted_detected_element_class
+            enable(self)
+        return self._instrumentation
+
+    def uninstrument(self):
+        """
+        Stop instrumenting this namespace, dropping its counters and hooks.
+        """
+        if self._instrumentation is not None:
+            from .instrumentation import disable
+            del self.detected_element_class
+            self._instrumentation = None
+            disable(self)
+
+    def stats(self):
+        """
+        A snapshot of the counters of this namespace.
+
+        :return: Counters, as described by ``Instrumentation.snapshot``, or an
+            empty dict when the namespace is not instrumented
+        :rtype: dict
+        """
+        if self._instrumentation is None:
+            return {}
+        return self._instrumentation.snapshot()
+
+    def from_refract(self, doc, processes=None, chunk_size=1000,
+                     trusted=False):
+        """
+        Decode refract data into an Element.
+
+        :param doc: Refract data
+        :type doc: dict
+
+        :param processes: Decode the items of a large array in this many
+            worker processes
+        :type processes: int | None
+
+        :param chunk_size: Number of array items decoded by a worker at once
+        :type chunk_size: int
+
+        :param trusted: Whether the data was serialized by this library, such
+            as by ``Element.refracted``. Elements are then created without
+            checking their content, and meta and attribute values holding
+            refract data are decoded into elements.
+        :type trusted: bool
+
+        :rtype: Element
+        """
+        if self._instrumentation is not None:
+            return self._instrumentation.from_refract(
+                self._from_refract, doc, processes, chunk_size, trusted)
+        return self._from_refract(doc, processes, chunk_size, trusted)
+
+    def _from_refract(self, doc, processes, chunk_size, trusted):
+        if processes:
+            from . import pool
+            element = pool.decoded(self, doc, processes, chunk_size,
+                                   trusted)
+            if element is not None:
+                return element
         cls = self.element_classes[doc['element']]
+        if trusted and structure(cls, 'from_refract') != CUSTOM:
+            return decode(self, doc, cls, trusted=True)
         return cls.from_refract(doc, self)
+
+    def from_binary(self, data):
+        """
+        Load an Element from refract binary data, as written by
+        ``Element.to_binary``.
+
+        :param data: Binary data, or a view of it, which is read in place
+        :type data: bytes | memoryview
+
+        :rtype: Element
+        """
+        from .binary import loads
+        return loads(data, self)
+
+    def from_refract_many(self, docs, processes=None, chunk_size=1000,
+                          trusted=False):
+        """
+        Decode many refract documents into Elements.
+
+        :param docs: Refract data
+        :type docs: Iterable[dict]
+
+        :param processes: Decode in this many worker processes, as for
+            ``elements``
+        :type processes: int | None
+
+        :param chunk_size: Number of documents sent to a worker at once
+        :type chunk_size: int
+
+        :param trusted: Whether the data was serialized by this library, as
+            for ``from_refract``
+        :type trusted: bool
+
+        :return: The decoded Elements, in order
+        :rtype: list[Element]
+        """
+        docs = list(docs)
+        if self._instrumentation is not None:
+            return self._instrumentation.from_refract_many(
+                self._from_refract_many, docs, processes, chunk_size, trusted)
+        return self._from_refract_many(docs, processes, chunk_size, trusted)
+
+    def _from_refract_many(self, docs, processes, chunk_size, trusted):
+        if processes and processes > 1 and len(docs) > chunk_size:
+            from .pool import map_chunks, decode_chunk
+            return map_chunks(self, partial(decode_chunk, trusted=trusted),
+                              docs, processes, chunk_size)
+        return decode_many(self, docs, trusted)
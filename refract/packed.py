@@ -0,0 +1,479 @@
+"""
+Arrays of numbers packed into ``array.array`` storage.
+
+A ``PackedArrayElement`` keeps the items of an array of integers, or of
+floats, as machine numbers rather than one NumberElement each. It is an
+ArrayElement, and is serialized exactly as one: refract data of all the
+numbers is produced at once from the packed storage, and decoded back into
+it without creating an element per item. Its native value is a
+``memoryview`` of a copy of the numbers, from which NumPy can make an array
+without copying again. NumPy arrays of one dimension are packed in turn.
+
+Items read by index are views: NumberElements created on demand, which are
+part of the array from then on. Numbers set, inserted, deleted and appended
+are written to the packed storage. Anything else needing the items as
+elements, such as changing a view, comparing, hashing or diffing the array,
+or setting an item to anything but a number of the same type, unpacks it:
+its storage is replaced with NumberElements, just as lazy containers read
+their contents, and from then on it behaves as any other ArrayElement.
+
+Namespaces created with ``packed_size`` detect lists and tuples of at least
+that many numbers as PackedArrayElements, and decode arrays of as many
+plain numbers into them.
+"""
+import array
+import operator
+
+import six
+
+from . import elements
+from .elements import ArrayElement, NumberElement, _record, _position
+from .lazy import _pending, _LIST_METHODS
+from .traversal import (refracted, decode, dispatch_table, _decoded_keyvals,
+                        _private, _refracted, _store, _strings, ARRAY)
+
+__all__ = ['PackedArrayElement']
+
+try:
+    array.array('q')
+    _INTEGER_CODE = 'q'
+except ValueError:  # Python 2 has no long long arrays.
+    _INTEGER_CODE = 'l'
+
+_FLOAT_CODE = 'd'
+
+#: Types of the numbers written to packed storage as they are, by typecode
+_NUMBER_TYPES = {_INTEGER_CODE: six.integer_types, _FLOAT_CODE: (float,)}
+
+_NUMERIC_CODES = 'bBhHiIlLqQfd'
+
+
+def _typecode(values):
+    """
+    The typecode packing a list of numbers, or None unless they are all
+    integers, or all floats.
+    """
+    types = set(map(type, values))
+    if types == {float}:
+        return _FLOAT_CODE
+    if types and types <= set(six.integer_types):
+        return _INTEGER_CODE
+    return None
+
+
+def _is_ndarray(value):
+    """
+    Whether a value is a NumPy array of one dimension of numbers, checked
+    without importing NumPy.
+    """
+    dtype = getattr(value, 'dtype', None)
+    return (dtype is not None and getattr(value, 'ndim', None) == 1 and
+            getattr(dtype, 'kind', None) in ('i', 'u', 'f'))
+
+
+def _packed(value):
+    """
+    Pack numbers into an array, or return None when they can not be.
+
+    :param value: List or tuple of numbers, array, or NumPy array
+    :type value: Any
+
+    :rtype: array.array | None
+    """
+    if isinstance(value, array.array):
+        if value.typecode not in _NUMERIC_CODES:
+            return None
+        code = _FLOAT_CODE if value.typecode in 'fd' else _INTEGER_CODE
+    elif _is_ndarray(value):
+        return _packed(value.tolist())
+    elif isinstance(value, (list, tuple)):
+        code = _typecode(value)
+        if code is None:
+            return None
+    else:
+        return None
+    try:
+        return array.array(code, value)  # Copied as a block when it can be.
+    except OverflowError:
+        return None
+
+
+def _is_packable(size, value):
+    """
+    Detect lists and tuples of at least size integers, or of floats, and
+    arrays of as many numbers, for ``Namespace(packed_size=size)``.
+    """
+    if isinstance(value, (list, tuple)):
+        return len(value) >= size and _typecode(value) is not None
+    if isinstance(value, array.array):
+        return len(value) >= size and value.typecode in _NUMERIC_CODES
+    return _is_ndarray(value) and len(value) >= size
+
+
+class _Numbers(object):
+    """
+    The packed numbers of an array, standing in for its items until they
+    are needed as elements.
+
+    :ivar content: The items, once the array is unpacked
+    """
+    __slots__ = ('owner', 'content')
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.content = None
+
+    def read(self):
+        """
+        Unpack the numbers into elements, and give them to the array.
+        """
+        owner = self.owner
+        if owner is None:  # Already unpacked
+            return
+        self.owner = None
+        self.content = owner._unpack()
+
+
+_PackedItems = _pending(list, 'content', _LIST_METHODS)
+
+
+def _items_len(self):
+    source = self._source
+    if source.content is None:
+        return len(source.owner._packed)  # Known without unpacking
+    return len(source.content)
+
+
+_PackedItems.__len__ = _items_len
+
+
+def _number_docs(numbers, compact):
+    if compact:
+        return [{'element': 'number', 'content': number}
+                for number in numbers]
+    return [{'element': 'number', 'meta': {}, 'attributes': {},
+             'content': number} for number in numbers]
+
+
+class PackedArrayElement(ArrayElement):
+    """
+    Array of integers, or of floats, packed into an ``array.array``.
+
+    Content which can not be packed, such as numbers of both types, is held
+    as by ArrayElement.
+    """
+    __slots__ = ('_packed', '_views')
+
+    native_types = ArrayElement.native_types + (array.array,)
+
+    def __init__(self, *args, **kwargs):
+        self._packed = None
+        self._views = None
+        super(PackedArrayElement, self).__init__(*args, **kwargs)
+
+    def __repr__(self):
+        if self._packed is None:
+            return super(PackedArrayElement, self).__repr__()
+        return '<{}: {!r}>'.format(self.__class__.__name__,
+                                   self._packed.tolist())
+
+    @property
+    def packed(self):
+        """
+        Whether the items are held as packed numbers.
+
+        :rtype: bool
+        """
+        return self._packed is not None
+
+    def set_content(self, value):
+        packed = _packed(value)
+        if not packed:  # Empty arrays are not packed, as their type is open.
+            if self._packed is not None:
+                self._will_change()
+                self._release_packed()
+            super(PackedArrayElement, self).set_content(value)
+            return
+        self._will_change()
+        if self._packed is not None:
+            self._release_packed()
+        else:
+            for child in self._content or ():
+                self._release(child)
+        self._packed = packed
+        self._views = {}
+        self._content = _PackedItems(_Numbers(self))
+        self._changed()
+        if elements._journaled and self._parent is not None:
+            _record(self, 'replace', None, self)
+
+    def _release_packed(self):
+        """
+        Forget the packed numbers and their views, leaving no items.
+        """
+        for view in self._views.values():
+            self._release(view)
+        source = self._content._source
+        if source.owner is self:
+            source.owner = None
+            source.content = []
+        self._packed = self._views = None
+        self._content = []
+
+    def _unpack(self):
+        """
+        Replace the packed numbers with NumberElements, keeping the views
+        already created.
+
+        :return: The items
+        :rtype: list[Element]
+        """
+        packed, views = self._packed, self._views
+        self._packed = self._views = None
+        create = NumberElement.trusted
+        namespace = self.namespace
+        adopt = self._adopt
+        items = [adopt(create(number, namespace=namespace))
+                 for number in packed.tolist()]
+        for index, view in six.iteritems(views):
+            self._release(items[index])
+            items[index] = view
+        self._content = items
+        return items
+
+    def _unpacked(self):
+        """
+        Ensure the items are held as elements.
+        """
+        if self._packed is not None:
+            self._content._source.read()
+
+    def _view(self, index):
+        view = self._views.get(index)
+        if view is None:
+            view = self._views[index] = self._adopt(NumberElement.trusted(
+                self._packed[index], namespace=self.namespace))
+        return view
+
+    def _checked(self, index):
+        count = len(self._packed)
+        index = operator.index(index)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError('array index out of range')
+        return index
+
+    def _accepts(self, value):
+        return type(value) in _NUMBER_TYPES[self._packed.typecode]
+
+    def __getitem__(self, index):
+        if self._packed is None:
+            return super(PackedArrayElement, self).__getitem__(index)
+        if isinstance(index, slice):
+            return [self._view(i)
+                    for i in range(*index.indices(len(self._packed)))]
+        return self._view(self._checked(index))
+
+    def __setitem__(self, index, value):
+        packed = self._packed
+        if (packed is not None and not isinstance(index, slice) and
+                self._accepts(value)):
+            index = self._checked(index)
+            self._will_change()
+            try:
+                packed[index] = value
+            except OverflowError:
+                pass
+            else:
+                view = self._views.pop(index, None)
+                if view is not None:
+                    self._release(view)
+                self._changed()
+                if elements._journaled:
+                    _record(self, 'replace', None, NumberElement(
+                        value, namespace=self.namespace), (index,))
+                return
+        self._unpacked()
+        super(PackedArrayElement, self).__setitem__(index, value)
+
+    def __delitem__(self, index):
+        packed = self._packed
+        if packed is None or isinstance(index, slice) and self._views:
+            self._unpacked()
+            super(PackedArrayElement, self).__delitem__(index)
+            return
+        if isinstance(index, slice):
+            self._will_change()
+            del packed[index]
+            self._changed()
+            if elements._journaled:
+                _record(self, 'replace', None, self)
+            return
+        index = self._checked(index)
+        self._will_change()
+        del packed[index]
+        views = self._views
+        if views:
+            view = views.pop(index, None)
+            if view is not None:
+                self._release(view)
+            self._views = {i - (i > index): v for i, v in six.iteritems(views)}
+        self._changed()
+        if elements._journaled:
+            _record(self, 'delete', index, None)
+
+    def insert(self, index, value):
+        packed = self._packed
+        if packed is not None and self._accepts(value):
+            self._will_change()
+            position = _position(index, len(packed))
+            try:
+                packed.insert(position, value)
+            except OverflowError:
+                pass
+            else:
+                views = self._views
+                if views:
+                    self._views = {i + (i >= position): v
+                                   for i, v in six.iteritems(views)}
+                self._changed()
+                if elements._journaled:
+                    _record(self, 'insert', position, NumberElement(
+                        value, namespace=self.namespace))
+                return
+        self._unpacked()
+        super(PackedArrayElement, self).insert(index, value)
+
+    def extend(self, values):
+        packed = self._packed
+        if packed is not None and not elements._journaled:
+            if not (isinstance(values, (list, tuple, array.array)) or
+                    _is_ndarray(values)):
+                values = list(values)
+            more = _packed(values)
+            if more is not None and more.typecode == packed.typecode:
+                self._will_change()
+                packed.extend(more)
+                self._changed()
+                return
+        super(PackedArrayElement, self).extend(values)
+
+    def _child_changed(self, child):
+        if self._packed is not None:
+            for view in self._views.values():
+                if view is child:  # Views are packed no longer once changed.
+                    self._unpacked()
+                    break
+
+    def _cloned_content(self):
+        if self._packed is not None:
+            return self._packed[:]
+        return super(PackedArrayElement, self)._cloned_content()
+
+    def equals(self, value):
+        packed = self._packed
+        if packed is not None and not isinstance(value, elements.Element):
+            return value == packed.tolist()
+        return super(PackedArrayElement, self).equals(value)
+
+    @property
+    def native_value(self):
+        """
+        A ``memoryview`` of a copy of the packed numbers, or a list as for
+        ArrayElement when they are not packed. Python 2 gives a list either
+        way, as its arrays do not support memoryviews.
+        """
+        packed = self._packed
+        if packed is None:
+            return super(PackedArrayElement, self).native_value
+        if six.PY2:
+            return packed.tolist()
+        return memoryview(packed[:])
+
+    @property
+    def refracted(self):
+        return self._refract(False)
+
+    def to_refract(self, compact=False, processes=None, chunk_size=1000):
+        """
+        Serialize this Element to Refract data. Packed numbers are
+        serialized at once, so processes are not used.
+        """
+        return self._refract(compact)
+
+    def _refract(self, compact):
+        if self._packed is None:
+            return refracted(self, compact)
+        cache = self._cache
+        if cache is not None and compact in cache:
+            return _private(cache[compact])
+        result = _refracted(self, ARRAY,
+                            _number_docs(self._packed.tolist(), compact),
+                            compact)
+        _store(self, compact, result)
+        return _private(result)
+
+    @classmethod
+    def from_refract(cls, doc, namespace):
+        element = decoded(namespace, doc, cls=cls)
+        if element is None:
+            return decode(namespace, doc, cls)
+        return element
+
+
+def decoded(namespace, doc, keyvals=None, size=1, cls=PackedArrayElement):
+    """
+    Decode refract data of an array of plain numbers into a packed array,
+    without creating an element per item.
+
+    :param keyvals: Function decoding the meta and attributes of the array
+    :type keyvals: callable
+
+    :param size: Fewest items packed
+    :type size: int
+
+    :return: The array, or None when the data is not of at least size
+        integers or floats without meta or attributes
+    :rtype: PackedArrayElement | None
+    """
+    docs = doc['content']
+    if len(docs) < size:
+        return None
+    try:
+        numbers = [item['content'] for item in docs
+                   if item['element'] == 'number' and
+                   not item.get('meta') and not item.get('attributes')]
+    except (KeyError, TypeError, AttributeError):
+        return None
+    if len(numbers) != len(docs):
+        return None
+    packed = _packed(numbers)
+    if packed is None:
+        return None
+    if keyvals is None:
+        strings = _strings(namespace)
+
+        def keyvals(values):
+            return _decoded_keyvals(namespace, strings, values, False)
+
+    return cls(packed, keyvals(doc.get('meta')),
+               keyvals(doc.get('attributes')), namespace)
+
+
+def packing(namespace):
+    """
+    The function decoding refract data of arrays into packed arrays as for
+    ``decoded``, or None when the namespace does not pack them.
+
+    :type namespace: refract.Namespace
+
+    :rtype: callable | None
+    """
+    size = getattr(namespace, 'packed_size', None)
+    if size is None:
+        return None
+    table = dispatch_table(namespace)
+    if table.get('number', (None,))[0] is not NumberElement:
+        return None  # Items would not decode as NumberElements.
+    return lambda doc, keyvals: decoded(namespace, doc, keyvals, size)
@@ -0,0 +1,247 @@
+"""
+Process pools producing and serializing elements for a namespace.
+
+Workers receive the namespace once, as they start. The elements they
+produce are pickled without it, and attached to the calling namespace as
+they are unpickled, so they behave as if they were built in the calling
+process.
+
+Large arrays are serialized by splitting their items into chunks. Forked
+workers read the items of the array they inherit; others are sent them.
+Results are gathered in order, so output matches serial serialization.
+"""
+import functools
+import io
+import multiprocessing
+import os
+import pickle
+from multiprocessing import Pool
+
+from .traversal import (build_many, decode_many, structure, _decoded_keyvals,
+                        _refracted, _strings, ARRAY)
+
+__all__ = ['map_chunks', 'build_chunk', 'decode_chunk', 'splits',
+           'refracted', 'encoded_chunks', 'decoded']
+
+#: Namespace of the worker process
+_namespace = None
+
+#: Array whose items forked workers serialize
+_source = None
+
+_NAMESPACE_ID = 'namespace'
+
+
+def _initialize(namespace):
+    global _namespace
+    _namespace = namespace
+
+
+def _dumps(elements, namespace):
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = (
+        lambda obj: _NAMESPACE_ID if obj is namespace else None)
+    pickler.dump(elements)
+    return buffer.getvalue()
+
+
+def _loads(data, namespace):
+    unpickler = pickle.Unpickler(io.BytesIO(data))
+    unpickler.persistent_load = lambda pid: namespace
+    return unpickler.load()
+
+
+def build_chunk(values):
+    """
+    Wrap values in elements within a worker.
+    """
+    return _dumps(build_many(_namespace, values), _namespace)
+
+
+def decode_chunk(docs, trusted=False):
+    """
+    Decode refract data within a worker.
+    """
+    return _dumps(decode_many(_namespace, docs, trusted), _namespace)
+
+
+def _forks():
+    get_start_method = getattr(multiprocessing, 'get_start_method', None)
+    if get_start_method is None:  # Python 2 forks wherever it can.
+        return os.name == 'posix'
+    return get_start_method() == 'fork'
+
+
+def _chunk_items(task):
+    compact, items = task
+    if isinstance(items, tuple):  # Range of the inherited array's items
+        return compact, _source._content[items[0]:items[1]]
+    return compact, _loads(items, _namespace)
+
+
+def refract_chunk(task):
+    """
+    Serialize array items to refract data within a worker.
+    """
+    compact, items = _chunk_items(task)
+    return pickle.dumps([item.to_refract(compact) for item in items],
+                        pickle.HIGHEST_PROTOCOL)
+
+
+def encode_chunk(task):
+    """
+    Serialize array items to refract JSON within a worker.
+    """
+    from .encoding import iterencode
+    compact, items = _chunk_items(task)
+    return ', '.join(''.join(iterencode(item, compact)) for item in items)
+
+
+def splits(element, processes, chunk_size):
+    """
+    Whether an element is serialized in a pool with these settings.
+
+    :type element: Element
+    :type processes: int | None
+    :type chunk_size: int
+
+    :rtype: bool
+    """
+    return bool(processes and processes > 1 and
+                structure(type(element), 'refracted') == ARRAY and
+                len(element._content) > chunk_size)
+
+
+def _map_items(element, func, compact, processes, chunk_size):
+    """
+    Apply a worker function to chunks of an array's items, yielding the
+    results in order.
+    """
+    global _source
+    items = element._content
+    ranges = [(start, min(start + chunk_size, len(items)))
+              for start in range(0, len(items), chunk_size)]
+    if _forks():
+        tasks = [(compact, bounds) for bounds in ranges]
+        _source = element
+    else:
+        tasks = [(compact, _dumps(items[start:stop], element.namespace))
+                 for start, stop in ranges]
+    pool = Pool(processes, _initialize, (element.namespace,))
+    try:
+        for result in pool.imap(func, tasks):
+            yield result
+    finally:
+        _source = None
+        pool.terminate()
+        pool.join()
+
+
+def refracted(element, compact, processes, chunk_size):
+    """
+    Serialize an array to refract data, its items in a pool of workers.
+
+    :type element: ArrayElement
+    :type compact: bool
+    :type processes: int
+    :type chunk_size: int
+
+    :rtype: dict
+    """
+    content = []
+    for data in _map_items(element, refract_chunk, compact, processes,
+                           chunk_size):
+        content.extend(pickle.loads(data))
+    return _refracted(element, ARRAY, content, compact)
+
+
+def encoded_chunks(element, compact, processes, chunk_size):
+    """
+    Serialize an array to refract JSON, its items in a pool of workers.
+
+    :type element: ArrayElement
+    :type compact: bool
+    :type processes: int
+    :type chunk_size: int
+
+    :return: Chunks of JSON text of ``element.to_refract(compact)``
+    :rtype: Iterator[str]
+    """
+    from .encoding import _prefix
+    yield _prefix(element, compact) + '['
+    separator = ''
+    for text in _map_items(element, encode_chunk, compact, processes,
+                           chunk_size):
+        yield separator + text
+        separator = ', '
+    yield ']}'
+
+
+def decoded(namespace, doc, processes, chunk_size, trusted=False):
+    """
+    Decode refract data of an array, its items in a pool of workers, or
+    return None when the data is not split.
+
+    :type namespace: refract.Namespace
+    :type doc: dict
+    :type processes: int | None
+    :type chunk_size: int
+    :type trusted: bool
+
+    :rtype: ArrayElement | None
+    """
+    if not processes or processes < 2:
+        return None
+    cls = namespace.element_classes[doc['element']]
+    if (structure(cls, 'from_refract') != ARRAY or
+            len(doc['content']) <= chunk_size):
+        return None
+    items = map_chunks(namespace, functools.partial(decode_chunk,
+                                                    trusted=trusted),
+                       doc['content'], processes, chunk_size)
+    strings = _strings(namespace)
+    create = cls.trusted if trusted else cls
+    return create(
+        items,
+        _decoded_keyvals(namespace, strings, doc.get('meta'), trusted),
+        _decoded_keyvals(namespace, strings, doc.get('attributes'), trusted),
+        namespace)
+
+
+def map_chunks(namespace, func, items, processes, chunk_size):
+    """
+    Produce elements from items in a pool of worker processes.
+
+    :param namespace: Namespace for the elements. It is sent to the workers,
+        so its element classes and detectors must be picklable unless
+        processes are forked.
+    :type namespace: refract.Namespace
+
+    :param func: Worker function producing pickled elements from a chunk of
+        items, such as ``build_chunk`` or ``decode_chunk``
+    :type func: callable
+
+    :param items: Values or refract data
+    :type items: list
+
+    :param processes: Number of worker processes
+    :type processes: int
+
+    :param chunk_size: Number of items sent to a worker at once
+    :type chunk_size: int
+
+    :return: The elements, in the order of the items
+    :rtype: list[Element]
+    """
+    chunks = [items[start:start + chunk_size]
+              for start in range(0, len(items), chunk_size)]
+    pool = Pool(processes, _initialize, (namespace,))
+    try:
+        elements = []
+        for data in pool.imap(func, chunks):
+            elements.extend(_loads(data, namespace))
+    finally:
+        pool.close()
+        pool.join()
+    return elements
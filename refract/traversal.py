@@ -0,0 +1,876 @@
+"""
+Explicit-stack traversal engine for element trees.
+
+Serialization, native value conversion, construction from native values and
+decoding from refract all walk element trees of arbitrary depth. The
+functions here do so with an explicit stack instead of recursion, so deep
+trees do not hit the recursion limit and each level avoids the overhead of
+nested property and method calls.
+
+Elements whose class overrides the operation being performed are asked for
+their own result. Meta and attribute values are converted through their own
+properties, so only their nesting within each other uses recursion.
+
+Refract data of containers is cached on them by ``refracted``. Elements
+notify their containers of changes made through the element API, which
+discards the cached data along the path to the root.
+"""
+from collections import OrderedDict
+
+import six
+
+from .elements import Element, ArrayElement, MemberElement, ObjectElement
+
+__all__ = ['refracted', 'compacted', 'native_value', 'build', 'decode',
+           'structure', 'structural_hash', 'equal', 'build_many',
+           'decode_many', 'dispatch_table', 'flatten', 'unflatten']
+
+#: Element structures understood by the engine
+SCALAR, ARRAY, OBJECT, MEMBER, CUSTOM = range(1, 6)
+
+_structures = {None: {}, 'refracted': {}, 'native_value': {},
+               'set_content': {}, 'from_refract': {}}
+
+
+def structure(cls, operation=None):
+    """
+    Determine how the engine handles elements of a class.
+
+    :param cls: The element class
+    :type cls: Type[Element]
+
+    :param operation: Name of the Element attribute implementing the
+        operation (``refracted``, ``native_value``, ``set_content`` or
+        ``from_refract``). If the class overrides the implementation of its
+        structure, CUSTOM is returned.
+    :type operation: str | None
+
+    :rtype: int
+    """
+    try:
+        return _structures[operation][cls]
+    except KeyError:
+        pass
+    if issubclass(cls, MemberElement):
+        kind, base = MEMBER, MemberElement
+    elif issubclass(cls, ObjectElement):
+        kind, base = OBJECT, ObjectElement
+    elif issubclass(cls, ArrayElement):
+        kind, base = ARRAY, ArrayElement
+    else:
+        kind, base = SCALAR, Element
+    if operation is not None and _implementation(
+            cls, operation) is not _implementation(base, operation):
+        kind = CUSTOM
+    _structures[operation][cls] = kind
+    return kind
+
+
+def _implementation(cls, name):
+    attribute = getattr(cls, name)
+    return getattr(attribute, '__func__', attribute)
+
+
+def _children(element, kind):
+    if kind == MEMBER:
+        return (element._key, element._value)
+    if kind == SCALAR:
+        return ()
+    return element._content
+
+
+def _refracted(element, kind, content, compact):
+    if compact:
+        refracted = {'element': element.element}
+        if element._meta:
+            refracted['meta'] = element._refracted_keyvals(element._meta,
+                                                           True)
+        if element._attributes:
+            refracted['attributes'] = element._refracted_keyvals(
+                element._attributes, True)
+        refracted['content'] = element.content if kind == SCALAR else content
+        return refracted
+    return {
+        'element': element.element,
+        'meta': element._refracted_keyvals(element._meta),
+        'attributes': element._refracted_keyvals(element._attributes),
+        'content': element.content if kind == SCALAR else content
+    }
+
+
+def compacted(refracted):
+    """
+    Remove empty meta and attributes from the top level of refract data.
+
+    :param refracted: Refract data
+    :type refracted: dict
+
+    :rtype: dict
+    """
+    refracted = dict(refracted)
+    for key in ('meta', 'attributes'):
+        if key in refracted and not refracted[key]:
+            del refracted[key]
+    return refracted
+
+
+def _store(element, key, result):
+    cache = element._cache
+    if cache is None:
+        element._cache = {key: result}
+    else:
+        cache[key] = result
+
+
+def _private(result):
+    """
+    Copy the top level of cached refract data for a caller to modify.
+    """
+    result = dict(result)
+    for key in ('meta', 'attributes'):
+        if key in result:
+            result[key] = dict(result[key])
+    content = result['content']
+    if isinstance(content, list):
+        result['content'] = list(content)
+    elif isinstance(content, dict):
+        result['content'] = dict(content)
+    return result
+
+
+def refracted(element, compact=False):
+    """
+    Serialize an element tree to refract data.
+
+    The data of containers is cached on them until they, or anything they
+    contain, change. The top level of the returned data belongs to the
+    caller, while nested data is shared with the cache and must be treated
+    as read-only.
+
+    :param element: The root element
+    :type element: Element
+
+    :param compact: Leave out empty meta and attributes
+    :type compact: bool
+
+    :rtype: dict
+    """
+    kinds = _structures['refracted']
+    kind = structure(type(element))
+    if kind == SCALAR:
+        return _refracted(element, kind, None, compact)
+    if element._cache is not None and compact in element._cache:
+        return _private(element._cache[compact])
+    frame = (element, kind, _children(element, kind), [])
+    stack = []
+    while True:
+        node, kind, children, results = frame
+        index = len(results)
+        count = len(children)
+        while index < count:
+            child = children[index]
+            child_kind = (kinds.get(type(child)) or
+                          structure(type(child), 'refracted'))
+            if child_kind == SCALAR:
+                if child._meta or child._attributes:
+                    results.append(_refracted(child, SCALAR, None, compact))
+                elif compact:
+                    results.append({'element': child.element,
+                                    'content': child.content})
+                else:
+                    results.append({'element': child.element, 'meta': {},
+                                    'attributes': {},
+                                    'content': child.content})
+            elif child_kind == CUSTOM:
+                results.append(child.to_refract(compact))
+            else:
+                cache = child._cache
+                if cache is not None and compact in cache:
+                    results.append(cache[compact])
+                else:
+                    stack.append(frame)
+                    frame = (child, child_kind, _children(child, child_kind),
+                             [])
+                    break
+            index += 1
+        else:
+            if kind == MEMBER:
+                result = _refracted(node, kind, {'key': results[0],
+                                                 'value': results[1]},
+                                    compact)
+            else:
+                result = _refracted(node, kind, results, compact)
+            _store(node, compact, result)
+            if not stack:
+                return _private(result)
+            frame = stack.pop()
+            frame[3].append(result)
+
+
+def _keyvals_hash(keyvals):
+    if not keyvals:
+        return 0
+    return hash(frozenset((k, hash(v)) for k, v in keyvals.items()))
+
+
+def _scalar_hash(element):
+    try:
+        content = hash(element.content)
+    except TypeError:  # Equal unhashable content still hashes equally.
+        content = 0
+    return hash((element.element, content, _keyvals_hash(element._meta),
+                 _keyvals_hash(element._attributes)))
+
+
+def structural_hash(element):
+    """
+    Hash an element tree by element names, content, meta and attributes.
+
+    Hashes of containers are cached on them until they, or anything they
+    contain, change.
+
+    :param element: The root element
+    :type element: Element
+
+    :rtype: int
+    """
+    kind = structure(type(element))
+    if kind == SCALAR:
+        return _scalar_hash(element)
+    if element._cache is not None and 'hash' in element._cache:
+        return element._cache['hash']
+    frame = (element, _children(element, kind), [])
+    stack = []
+    while True:
+        node, children, hashes = frame
+        index = len(hashes)
+        count = len(children)
+        while index < count:
+            child = children[index]
+            child_kind = (_structures[None].get(type(child)) or
+                          structure(type(child)))
+            if child_kind == SCALAR:
+                hashes.append(_scalar_hash(child))
+            else:
+                cache = child._cache
+                if cache is not None and 'hash' in cache:
+                    hashes.append(cache['hash'])
+                else:
+                    stack.append(frame)
+                    frame = (child, _children(child, child_kind), [])
+                    break
+            index += 1
+        else:
+            result = hash((node.element, tuple(hashes),
+                           _keyvals_hash(node._meta),
+                           _keyvals_hash(node._attributes)))
+            _store(node, 'hash', result)
+            if not stack:
+                return result
+            frame = stack.pop()
+            frame[2].append(result)
+
+
+def _keyvals_equal(a, b, strict=False):
+    if not a and not b:
+        return True
+    if not strict:
+        return dict(a or ()) == dict(b or ())
+    a, b = a or {}, b or {}
+    return len(a) == len(b) and all(
+        key in b and equal(value, b[key], True)
+        for key, value in six.iteritems(a))
+
+
+def _shallow_equal(a, b, kind, strict=False):
+    return (a.element == b.element and
+            kind == (_structures[None].get(type(b)) or structure(type(b))) and
+            _keyvals_equal(a._meta, b._meta, strict) and
+            _keyvals_equal(a._attributes, b._attributes, strict))
+
+
+def _content_equal(a, b, strict):
+    return a.content == b.content and (
+        not strict or type(a.content) is type(b.content))
+
+
+def equal(a, b, strict=False):
+    """
+    Compare two element trees by element names, content, meta and
+    attributes.
+
+    :type a: Element
+    :type b: Element
+
+    :param strict: Whether scalar content must also be of the same type, so
+        that elements serialized differently, such as 1 and 1.0, differ
+    :type strict: bool
+
+    :rtype: bool
+    """
+    kinds = _structures[None]
+    kind = kinds.get(type(a)) or structure(type(a))
+    if not _shallow_equal(a, b, kind, strict):
+        return False
+    if kind == SCALAR:
+        return _content_equal(a, b, strict)
+    pairs = [(a, b, kind)]
+    while pairs:
+        a, b, kind = pairs.pop()
+        a_children, b_children = _children(a, kind), _children(b, kind)
+        if len(a_children) != len(b_children):
+            return False
+        for a, b in zip(a_children, b_children):
+            if a is b:
+                continue
+            kind = kinds.get(type(a)) or structure(type(a))
+            if not _shallow_equal(a, b, kind, strict):
+                return False
+            if kind == SCALAR:
+                if not _content_equal(a, b, strict):
+                    return False
+            else:
+                pairs.append((a, b, kind))
+    return True
+
+
+def _native_children(element, kind):
+    if kind == OBJECT:  # Object values are keyed by member key natives.
+        children = []
+        for member in element._content:
+            children.append(member._key)
+            children.append(member._value)
+        return children
+    return _children(element, kind)
+
+
+def native_value(element):
+    """
+    Convert an element tree to native Python values.
+
+    :param element: The root element
+    :type element: Element
+
+    :rtype: Any
+    """
+    kinds = _structures['native_value']
+    kind = structure(type(element))
+    if kind == SCALAR:
+        return element.content
+    frame = (kind, _native_children(element, kind), [])
+    stack = []
+    while True:
+        kind, children, results = frame
+        index = len(results)
+        count = len(children)
+        while index < count:
+            child = children[index]
+            child_kind = (kinds.get(type(child)) or
+                          structure(type(child), 'native_value'))
+            if child_kind == SCALAR:
+                results.append(child.content)
+            elif child_kind == CUSTOM:
+                results.append(child.native_value)
+            else:
+                stack.append(frame)
+                frame = (child_kind, _native_children(child, child_kind), [])
+                break
+            index += 1
+        else:
+            if kind == OBJECT:
+                result = dict(zip(results[0::2], results[1::2]))
+            elif kind == MEMBER:
+                result = {'key': results[0], 'value': results[1]}
+            else:
+                result = results
+            if not stack:
+                return result
+            frame = stack.pop()
+            frame[2].append(result)
+
+
+def _expands(cls, value):
+    """
+    Whether the engine builds the children of a value for an element class.
+    """
+    kind = (_structures['set_content'].get(cls) or
+            structure(cls, 'set_content'))
+    if kind == ARRAY:
+        return isinstance(value, ArrayElement.native_types)
+    if kind == OBJECT:
+        return isinstance(value, ObjectElement.native_types)
+    return False
+
+
+def _strings(namespace):
+    """
+    Create the table through which a single walk shares equal strings, or
+    return None when the namespace does not intern strings.
+
+    :rtype: dict | None
+    """
+    return {} if namespace.intern_strings else None
+
+
+def _build_frame(cls, value, strings):
+    if isinstance(value, dict):
+        keys = list(value.keys())
+        values = [value[key] for key in keys]
+        if strings is not None:
+            keys = [strings.setdefault(key, key)
+                    if isinstance(key, six.string_types) else key
+                    for key in keys]
+        return (cls, keys, values, [])
+    return (cls, None, list(value), [])
+
+
+def build(namespace, value):
+    """
+    Wrap a native value, and all values nested within it, in elements.
+
+    :param namespace: Namespace used to detect element classes
+    :type namespace: refract.Namespace
+
+    :param value: The value to wrap
+    :type value: Any
+
+    :rtype: Element
+    """
+    if isinstance(value, Element):
+        return value
+    cls = namespace.detected_element_class(value)
+    if not _expands(cls, value):
+        return cls(value, namespace=namespace)
+    return _build(namespace, _build_frame(cls, value, _strings(namespace)))
+
+
+def build_many(namespace, values):
+    """
+    Wrap many native values in elements in a single walk.
+
+    :param namespace: Namespace used to detect element classes
+    :type namespace: refract.Namespace
+
+    :param values: The values to wrap
+    :type values: Iterable[Any]
+
+    :rtype: list[Element]
+    """
+    return _build(namespace, (None, None, list(values), []))
+
+
+def _build(namespace, frame):
+    """
+    Build elements from a frame; a root frame without a class builds a list.
+
+    Dict keys, and strings no longer than the namespace's
+    ``interned_length``, are shared among equal strings within the walk.
+    """
+    detect = namespace.detected_element_class
+    strings = _strings(namespace)
+    limit = namespace.interned_length if strings is not None else -1
+    stack = []
+    while True:
+        cls, keys, values, built = frame
+        index = len(built)
+        count = len(values)
+        while index < count:
+            child = values[index]
+            if not isinstance(child, Element):
+                child_cls = detect(child)
+                if _expands(child_cls, child):
+                    stack.append(frame)
+                    frame = _build_frame(child_cls, child, strings)
+                    break
+                if (isinstance(child, six.string_types) and
+                        len(child) <= limit):
+                    child = strings.setdefault(child, child)
+                child = child_cls(child, namespace=namespace)
+            built.append(child)
+            index += 1
+        else:
+            if cls is None:
+                return built
+            if keys is None:
+                element = cls(built, namespace=namespace)
+            else:
+                element = cls(OrderedDict(zip(keys, built)),
+                              namespace=namespace)
+            if not stack:
+                return element
+            frame = stack.pop()
+            frame[3].append(element)
+
+
+def _decode_frame(cls, kind, doc):
+    if kind == OBJECT:
+        docs = []
+        for member in doc['content']:
+            docs.append(member['content']['key'])
+            docs.append(member['content']['value'])
+    elif kind == MEMBER:
+        docs = [doc['content']['key'], doc['content']['value']]
+    else:
+        docs = doc['content']
+    return (cls, kind, doc, docs, [])
+
+
+def dispatch_table(namespace):
+    """
+    The element classes of a namespace by element name, along with how the
+    engine decodes each of them.
+
+    The table is kept by the namespace until its element classes are
+    registered or unregistered.
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :rtype: dict[str, tuple[Type[Element], int]]
+    """
+    table = namespace._dispatch
+    if table is None:
+        table = namespace._dispatch = {
+            name: (cls, structure(cls, 'from_refract'))
+            for name, cls in six.iteritems(namespace.element_classes)}
+    return table
+
+
+def decode(namespace, doc, cls=None, trusted=False):
+    """
+    Decode refract data into an element tree.
+
+    Meta and attribute values holding refract data are decoded into the
+    elements they describe, as are those of the members of objects.
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :param doc: Refract data
+    :type doc: dict
+
+    :param cls: Class of the root element, if already known. It is decoded
+        by the engine even when it implements ``from_refract`` itself, which
+        may call this with its own class.
+    :type cls: Type[Element]
+
+    :param trusted: Whether the data was serialized by this library, so
+        elements can be created without checking their content
+    :type trusted: bool
+
+    :rtype: Element
+    """
+    if cls is None:
+        cls, kind = dispatch_table(namespace)[doc['element']]
+        if kind == CUSTOM:
+            return cls.from_refract(doc, namespace)
+    kind = structure(cls)
+    if kind == SCALAR:
+        strings = _strings(namespace)
+        create = cls.trusted if trusted else cls
+        return create(
+            doc['content'],
+            _decoded_keyvals(namespace, strings, doc.get('meta'), trusted),
+            _decoded_keyvals(namespace, strings, doc.get('attributes'),
+                             trusted),
+            namespace)
+    if cls is ArrayElement:
+        pack = _packing(namespace)
+        if pack is not None:
+            strings = _strings(namespace)
+            element = pack(doc, lambda values: _decoded_keyvals(
+                namespace, strings, values, trusted))
+            if element is not None:
+                return element
+    return _decode(namespace, _decode_frame(cls, kind, doc), trusted)
+
+
+def decode_many(namespace, docs, trusted=False):
+    """
+    Decode many refract documents in a single walk.
+
+    :param namespace: Namespace providing the element classes
+    :type namespace: refract.Namespace
+
+    :param docs: Refract data
+    :type docs: Iterable[dict]
+
+    :param trusted: Whether the data was serialized by this library, as for
+        ``decode``
+    :type trusted: bool
+
+    :rtype: list[Element]
+    """
+    return _decode(namespace, (None, None, None, list(docs), []), trusted)
+
+
+def _packing(namespace):
+    """
+    The function decoding arrays of numbers into packed arrays, or None when
+    the namespace does not pack them.
+    """
+    if getattr(namespace, 'packed_size', None) is None:
+        return None
+    from .packed import packing
+    return packing(namespace)
+
+
+def _is_refract(table, value):
+    return (type(value) is dict and 'content' in value and
+            value.get('element') in table)
+
+
+def _decoded_keyvals(namespace, strings, keyvals, trusted):
+    """
+    Decode meta or attribute values: refract data into the elements it
+    describes, and other values into elements wrapping them.
+
+    Refract data is serialized meta and attribute values that are members
+    or have meta or attributes of their own; only this nesting recurses.
+    """
+    if not keyvals:
+        return None
+    table = dispatch_table(namespace)
+    decoded = {}
+    for key, value in six.iteritems(keyvals):
+        if strings is not None:
+            key = strings.setdefault(key, key)
+        if _is_refract(table, value):
+            decoded[key] = decode(namespace, value, trusted=trusted)
+        else:
+            decoded[key] = build(namespace, value)
+    return decoded
+
+
+def _decode(namespace, frame, trusted=False):
+    """
+    Decode elements from a frame; a root frame without a class decodes a
+    list.
+    """
+    for result in decoding(namespace, frame, trusted):
+        return result
+
+
+def decoding(namespace, frame, trusted=False, every=None, budget=None):
+    """
+    Decode elements from a frame, as a generator which can pause the walk.
+
+    Element classes are looked up in the dispatch table of the namespace.
+    Meta and attribute keys, member keys, and string content no longer than
+    the namespace's ``interned_length``, are shared among equal strings
+    within the walk. Trusted data is created through ``Element.trusted``.
+    Arrays of numbers are decoded into packed arrays when the namespace packs
+    them.
+
+    :param frame: Frame of the root, as made by ``_decode_frame``, or one
+        without a class holding a list of refract data to decode
+    :type frame: tuple
+
+    :param every: Yield None each time this many elements are decoded, or
+        never when None. Pauses are checked between the levels of the tree
+        and every this many items of each, so elements created outside the
+        walk (such as by custom ``from_refract`` implementations) are not
+        counted.
+    :type every: int | None
+
+    :param budget: List holding the number of elements to decode before the
+        next pause, shared between walks, and counted down by them
+    :type budget: list[int] | None
+
+    :return: Generator yielding the pauses, and lastly the decoded element
+        or list of elements
+    :rtype: Iterator[Element | list[Element] | None]
+    """
+    table = dispatch_table(namespace)
+    strings = _strings(namespace)
+    limit = namespace.interned_length if strings is not None else -1
+
+    def keyvals(values):
+        return values and _decoded_keyvals(namespace, strings, values,
+                                           trusted)
+
+    pack = _packing(namespace)
+    if every is not None and budget is None:
+        budget = [every]
+    stack = []
+    while True:
+        cls, kind, doc, docs, decoded = frame
+        start = index = len(decoded)
+        count = len(docs)
+        if every is not None and count - index > budget[0]:
+            count = index + max(budget[0], 0)
+        while index < count:
+            child = docs[index]
+            child_cls, child_kind = table[child['element']]
+            if child_kind == SCALAR:
+                content = child['content']
+                if (strings is not None and
+                        isinstance(content, six.string_types) and
+                        (len(content) <= limit or
+                         kind == OBJECT and not index & 1)):  # A key
+                    content = strings.setdefault(content, content)
+                if trusted:
+                    child = child_cls.trusted(
+                        content, keyvals(child.get('meta')),
+                        keyvals(child.get('attributes')), namespace)
+                else:
+                    child = child_cls(
+                        content, keyvals(child.get('meta')),
+                        keyvals(child.get('attributes')), namespace)
+            elif child_kind in (ARRAY, OBJECT, MEMBER):
+                packed = None
+                if pack is not None and child_cls is ArrayElement:
+                    packed = pack(child, keyvals)
+                if packed is None:
+                    stack.append(frame)
+                    frame = _decode_frame(child_cls, child_kind, child)
+                    break
+                child = packed
+            else:
+                child = child_cls.from_refract(child, namespace)
+            decoded.append(child)
+            index += 1
+        else:
+            if every is not None:
+                budget[0] -= index - start
+                if budget[0] <= 0:
+                    budget[0] = every
+                    yield None
+                if index < len(docs):
+                    continue  # Paused part way through the items.
+            if cls is None:
+                yield decoded
+                return
+            if kind == OBJECT:
+                content = []
+                for index, member in enumerate(doc['content']):
+                    member_cls = table[member['element']][0]
+                    pair = (decoded[2 * index], decoded[2 * index + 1])
+                    create = member_cls.trusted if trusted else member_cls
+                    content.append(create(
+                        pair, keyvals(member.get('meta')),
+                        keyvals(member.get('attributes')), namespace))
+            elif kind == MEMBER:
+                content = tuple(decoded)
+            else:
+                content = decoded
+            create = cls.trusted if trusted else cls
+            element = create(content, keyvals(doc.get('meta')),
+                             keyvals(doc.get('attributes')), namespace)
+            if not stack:
+                yield element
+                return
+            frame = stack.pop()
+            frame[4].append(element)
+            continue
+        if every is not None:
+            budget[0] -= index - start + 1  # The items and the child frame
+
+
+def flatten(element):
+    """
+    List the nodes of an element tree in document order, for pickling.
+
+    Each node is a tuple of its class and either its content, or the number
+    of elements it contains, followed by its meta and attributes when it has
+    any. The content of packed arrays is their packed storage. A flat list
+    pickles without recursion however deep the tree.
+
+    :param element: The root element
+    :type element: Element
+
+    :rtype: list[tuple]
+    """
+    kinds = _structures[None]
+    nodes = []
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        cls = type(node)
+        kind = kinds.get(cls) or structure(cls)
+        if kind == SCALAR:
+            value = node._content
+        elif getattr(node, '_packed', None) is not None:
+            value = node._packed
+        else:
+            children = _children(node, kind)
+            value = len(children)
+            stack.extend(reversed(children))
+        if node._meta or node._attributes:
+            nodes.append((cls, value, dict(node._meta or ()) or None,
+                          dict(node._attributes or ()) or None))
+        else:
+            nodes.append((cls, value))
+    return nodes
+
+
+def _assembled(namespace, frame):
+    cls, kind, meta, attributes, _, children = frame
+    content = tuple(children) if kind == MEMBER else children
+    return cls.trusted(content, meta, attributes, namespace)
+
+
+#: Whether scalar classes are created by ``Element.trusted`` just as Element
+_plain_scalars = {}
+
+
+def _plain(cls):
+    try:
+        return _plain_scalars[cls]
+    except KeyError:
+        pass
+    from .elements import _trusted_initializers
+    plain = _plain_scalars[cls] = (
+        structure(cls, 'set_content') != CUSTOM and
+        _implementation(cls, '__init__') in _trusted_initializers and
+        _implementation(cls, '_set_trusted') is
+        _implementation(Element, '_set_trusted') and
+        cls.__new__ is object.__new__)
+    return plain
+
+
+def unflatten(namespace, nodes):
+    """
+    Rebuild an element tree from the nodes listed by ``flatten``.
+
+    :param namespace: Namespace of the elements
+    :type namespace: refract.Namespace
+
+    :param nodes: The nodes of the tree
+    :type nodes: list[tuple]
+
+    :rtype: Element
+    """
+    kinds = _structures[None]
+    new = object.__new__
+    stack = []
+    for node in nodes:
+        cls, value = node[0], node[1]
+        meta, attributes = node[2:] if len(node) > 2 else (None, None)
+        kind = kinds.get(cls) or structure(cls)
+        if kind == SCALAR:
+            if meta is None and attributes is None and _plain(cls):
+                element = new(cls)  # As Element.trusted, without calls
+                element._parent = None
+                element.namespace = namespace
+                element._content = value
+                element._meta = element._attributes = None
+            else:
+                element = cls.trusted(value, meta, attributes, namespace)
+        elif not isinstance(value, six.integer_types):  # Packed storage
+            element = cls(value, meta, attributes, namespace)
+        elif value:
+            stack.append([cls, kind, meta, attributes, value, []])
+            continue
+        else:
+            element = _assembled(namespace, [cls, kind, meta, attributes,
+                                             0, []])
+        while stack:
+            frame = stack[-1]
+            frame[5].append(element)
+            if len(frame[5]) < frame[4]:
+                break
+            stack.pop()
+            element = _assembled(namespace, frame)
+        else:
+            return element
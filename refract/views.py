@@ -0,0 +1,130 @@
+"""
+Read-only native views of element trees.
+
+Views present arrays as sequences and objects as mappings on top of the
+elements themselves. Nothing is copied up front; items are unwrapped as they
+are accessed, and views of containers are themselves views. Since they read
+the elements directly, views reflect later changes to the tree.
+"""
+from collections import Mapping, Sequence
+
+from .traversal import structure, SCALAR, ARRAY, OBJECT, MEMBER
+
+__all__ = ['view', 'ArrayView', 'ObjectView', 'MemberView']
+
+
+def view(element):
+    """
+    Obtain a native view of an element.
+
+    Scalars give their content, and elements with a custom ``native_value``
+    give that value.
+
+    :param element: The element to view
+    :type element: refract.Element
+
+    :rtype: Any
+    """
+    kind = structure(type(element), 'native_value')
+    if kind == SCALAR:
+        return element.content
+    if kind == ARRAY:
+        return ArrayView(element)
+    if kind == OBJECT:
+        return ObjectView(element)
+    if kind == MEMBER:
+        return MemberView(element)
+    return element.native_value
+
+
+class _View(object):
+    __slots__ = ('_element',)
+
+    def __init__(self, element):
+        self._element = element
+
+    def __repr__(self):
+        return '<{} of {!r}>'.format(self.__class__.__name__, self._element)
+
+    __hash__ = None  # Views reflect mutable elements.
+
+
+class ArrayView(_View, Sequence):
+    """
+    Sequence of the native views of an ArrayElement's items.
+
+    Slicing gives a list of item views.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [view(item) for item in self._element._content[index]]
+        return view(self._element._content[index])
+
+    def __len__(self):
+        return len(self._element._content)
+
+    def __iter__(self):
+        for item in self._element._content:
+            yield view(item)
+
+    def __eq__(self, other):
+        if not isinstance(other, (ArrayView, list)):
+            return NotImplemented
+        return (len(self) == len(other) and
+                all(a == b for a, b in zip(self, other)))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+
+class ObjectView(_View, Mapping):
+    """
+    Mapping of an ObjectElement's member keys to native views of their values.
+
+    Keys are looked up as they are by the element, so when several members
+    share a key, the first one wins. Members with unhashable keys are left
+    out.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return view(self._element._index[key]._value)
+        except TypeError:  # Unhashable keys are never indexed.
+            raise KeyError(key)
+
+    def __len__(self):
+        return len(self._element._index)
+
+    def __iter__(self):
+        index = self._element._index
+        for member in self._element._content:
+            key = member._key.native_value
+            try:
+                if index.get(key) is member:
+                    yield key
+            except TypeError:
+                pass
+
+
+class MemberView(_View, Mapping):
+    """
+    Mapping of ``key`` and ``value`` to the views of a MemberElement's parts.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key == 'key':
+            return view(self._element._key)
+        if key == 'value':
+            return view(self._element._value)
+        raise KeyError(key)
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        return iter(('key', 'value'))
@@ -5,7 +5,7 @@ setup(
     name='refract',
     use_scm_version=True,
     setup_requires=['setuptools_scm'],
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
 
     description='Refract elements manipulation library',
     author='Joshua Benner',
@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+asyncio = pytest.importorskip('asyncio')
+
+from refract import Namespace, ArrayElement, ObjectElement  # noqa: E402
+from refract import aio  # noqa: E402
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def namespace():
+    return Namespace()
+
+
+@pytest.fixture
+def tree(namespace):
+    el = namespace.element([{'id': i, 'tags': ['a', i], 'deep': [[i]]}
+                            for i in range(50)] + ['end', 1.5, None])
+    el.meta['title'] = 'Title'
+    el[0].meta['ref'] = namespace.element('x')
+    el[0].meta['ref'].meta['id'] = 'y'
+    return el
+
+
+def reader_of(loop, text, chunk=7):
+    reader = asyncio.StreamReader(loop=loop)
+    data = text.encode('utf-8')
+    for start in range(0, len(data), chunk):
+        reader.feed_data(data[start:start + chunk])
+    reader.feed_eof()
+    return reader
+
+
+def ticking(loop, coroutine):
+    """
+    Run a coroutine along with a task counting its pauses.
+    """
+    ticks = [0]
+    done = [False]
+
+    def tick():
+        if not done[0]:
+            ticks[0] += 1
+            loop.call_soon(tick)
+
+    def finish(future):
+        done[0] = True
+
+    task = loop.create_task(coroutine)
+    task.add_done_callback(finish)
+    loop.call_soon(tick)
+    return loop.run_until_complete(task), ticks[0]
+
+
+@pytest.mark.parametrize('trusted', [False, True])
+def test_from_refract(loop, namespace, tree, trusted):
+    decoded, ticks = ticking(loop, aio.from_refract(
+        namespace, tree.refracted, every=10, trusted=trusted))
+    assert decoded == tree
+    assert ticks >= 20  # About 500 elements, pausing every 10
+
+
+def test_from_refract_scalar(loop, namespace):
+    doc = namespace.element('a').refracted
+    assert loop.run_until_complete(
+        aio.from_refract(namespace, doc)).native_value == 'a'
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_load(loop, namespace, tree, compact):
+    text = json.dumps(tree.to_refract(compact=compact))
+    loaded, ticks = ticking(loop, aio.load(reader_of(loop, text), namespace,
+                                           every=10, chunk_size=5))
+    assert isinstance(loaded, ArrayElement)
+    assert loaded == tree
+    assert ticks >= 20
+
+
+def test_load_not_streamed(loop, namespace):
+    obj = namespace.element({'a': [1, 2], 'b': {'c': None}})
+    text = json.dumps(obj.refracted)
+    loaded = loop.run_until_complete(
+        aio.load(reader_of(loop, text), namespace))
+    assert isinstance(loaded, ObjectElement)
+    assert loaded == obj
+
+
+def test_load_incomplete(loop, namespace):
+    reader = reader_of(loop, '{"element": "array", "content": [1')
+    with pytest.raises(ValueError):
+        loop.run_until_complete(aio.load(reader, namespace))
+
+
+class Writer(object):
+    """
+    Stand-in for a StreamWriter recording its writes and drains.
+    """
+    def __init__(self):
+        self.data = []
+        self.drained = 0
+
+    def write(self, data):
+        self.data.append(data)
+
+    def drain(self):
+        self.drained += 1
+        return asyncio.sleep(0)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_dump(loop, tree, compact):
+    writer = Writer()
+    _, ticks = ticking(loop, aio.dump(tree, writer, compact=compact,
+                                      every=10, buffer_size=100))
+    text = b''.join(writer.data).decode('utf-8')
+    assert json.loads(text) == tree.to_refract(compact=compact)
+    assert writer.drained == len(writer.data) > 10
+    assert ticks >= 20
+
+
+def test_dump_round_trip(loop, namespace, tree):
+    writer = Writer()
+    loop.run_until_complete(aio.dump(tree, writer))
+    reader = reader_of(loop, b''.join(writer.data).decode('utf-8'))
+    assert loop.run_until_complete(aio.load(reader, namespace)) == tree
@@ -123,3 +123,52 @@ def test_array_delete(array, array_native):
     del array[0]
     del array_native[0]
     assert array.native_value == array_native
+
+
+def test_array_from_refract(array):
+    loaded = ArrayElement.from_refract(array.refracted, Namespace())
+    assert isinstance(loaded[0], StringElement)
+    assert loaded.refracted == array.refracted
+
+
+def test_array_to_refract_compact(array):
+    array[0].id = 'first'
+    assert array.to_refract(compact=True) == {
+        'element': 'array',
+        'content': [
+            {'element': 'string', 'meta': {'id': 'first'}, 'content': 'a'},
+            {'element': 'boolean', 'content': True},
+            {'element': 'null', 'content': None},
+            {'element': 'number', 'content': 1}
+        ]
+    }
+
+
+def test_array_from_compact_refract(array):
+    compact = array.to_refract(compact=True)
+    assert Namespace().from_refract(compact).refracted == array.refracted
+
+
+def test_array_refracted_cached(array):
+    assert array.refracted['content'][0] is array.refracted['content'][0]
+
+
+def test_array_refracted_private_top_level(array):
+    array.refracted['content'].append('changed')
+    assert len(array.refracted['content']) == 4
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda a: a.__setitem__(0, 'b'),
+    lambda a: a.__setitem__(slice(0, 1), ['b', 'c']),
+    lambda a: a.insert(1, 'b'),
+    lambda a: a.__delitem__(1),
+    lambda a: a[0].set_content('b'),
+    lambda a: a.meta.__setitem__('id', 'b'),
+])
+def test_array_refracted_invalidated(mutate):
+    outer = ArrayElement([['a', True, None, 1]], namespace=Namespace())
+    before = outer.refracted
+    mutate(outer[0])
+    assert outer.refracted != before
+    assert outer.refracted == outer.clone().refracted
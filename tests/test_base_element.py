@@ -1,7 +1,9 @@
+import gc
+
 import pytest
 
-from refract import Element, Namespace
-from refract.elements import ElementMap
+from refract import ArrayElement, Element, Namespace
+from refract.elements import ElementMap, _containers
 
 
 def test_element_map_create():
@@ -96,3 +98,108 @@ def test_name_property(prop, value):
     setattr(el, prop, value)
     assert getattr(el, prop) == value
 
+
+def test_element_meta_allocated_lazily():
+    el = Element('foo', namespace=Namespace())
+    assert el.refracted['meta'] == {}
+    assert el.id is None
+    assert el._meta is None and el._attributes is None
+    el.meta['id'] = 'bar'
+    assert el.refracted['meta'] == {'id': 'bar'}
+
+
+def test_element_meta_assign():
+    el = Element('foo', namespace=Namespace())
+    el.attributes = {'bar': 'baz'}
+    assert el.attributes['bar'].native_value == 'baz'
+    el.attributes = None
+    assert el.attributes == {}
+
+
+def test_element_eq_structural():
+    namespace = Namespace()
+    assert namespace.element('a') == namespace.element('a')
+    assert namespace.element('a') != namespace.element('b')
+    assert namespace.element(1) != namespace.element('1')
+    assert namespace.element('a') != 'a'
+
+
+def test_element_eq_meta():
+    namespace = Namespace()
+    el, other = namespace.element('a'), namespace.element('a')
+    el.id = 'first'
+    assert el != other
+    other.id = 'first'
+    assert el == other
+    assert hash(el) == hash(other)
+
+
+def test_element_hash_dedupes():
+    namespace = Namespace()
+    elements = [namespace.element([1, {'a': 'b'}]) for _ in range(3)]
+    assert len(set(elements)) == 1
+
+
+def test_element_hash_invalidated():
+    el = Namespace().element([1, {'a': ['b']}])
+    before = hash(el)
+    el[1]['a'].value[0].set_content('c')
+    assert hash(el) != before
+    assert hash(el) == hash(Namespace().element([1, {'a': ['c']}]))
+
+
+def test_element_equals_element():
+    namespace = Namespace()
+    assert namespace.element([1, 2]).equals(namespace.element([1, 2]))
+    assert namespace.element([1, 2]).equals([1, 2])
+    assert not namespace.element([1, 2]).equals((1, 2))
+
+
+def test_element_trusted():
+    namespace = Namespace()
+    title = namespace.element('Title')
+    el = Element.trusted('foo', {'title': title}, namespace=namespace)
+    assert el == Element('foo', {'title': 'Title'}, namespace=namespace)
+    assert el.meta['title'] is title
+    assert title._parent() is el
+    assert el.attributes == {}
+
+
+def test_element_trusted_containers():
+    from refract import (ArrayElement, MemberElement, ObjectElement,
+                         StringElement, NumberElement)
+    namespace = Namespace()
+    member = MemberElement.trusted(
+        (StringElement.trusted('id', namespace=namespace),
+         NumberElement.trusted(1, namespace=namespace)), namespace=namespace)
+    obj = ObjectElement.trusted([member], namespace=namespace)
+    array = ArrayElement.trusted([obj], namespace=namespace)
+    assert array == namespace.element([{'id': 1}])
+    assert obj['id'] is member
+    refracted = array.refracted
+    member.value = 2  # Changes still reach the containers.
+    assert array.refracted != refracted
+    assert array.native_value == [{'id': 2}]
+
+
+def test_element_trusted_custom_content():
+    class UpperElement(Element):
+        element = 'upper'
+
+        def set_content(self, value):
+            super(UpperElement, self).set_content(value.upper())
+
+    assert UpperElement.trusted('foo').content == 'FOO'
+
+
+def test_element_does_not_keep_containers_alive():
+    namespace = Namespace()
+    leaf = namespace.element('a')
+    kept = ArrayElement([leaf], namespace=namespace)
+    for _ in range(100):
+        ArrayElement([leaf], namespace=namespace)
+    gc.collect()
+    assert _containers(leaf) == [kept]
+    before = kept.refracted
+    leaf.set_content('b')
+    assert kept.refracted != before
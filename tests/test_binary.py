@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import sys
+
+import pytest
+
+from refract import (ArrayElement, Element, LinkElement, Namespace,
+                     StringElement)
+from refract.binary import dumps, loads, dump, load
+
+
+@pytest.fixture
+def namespace():
+    return Namespace()
+
+
+@pytest.mark.parametrize('value', [
+    None, True, False, 0, -1, 2 ** 70, -2 ** 70, 2.5, float('inf'), '',
+    u'snowman ☃', 'x' * 1000, [], {}, [1, ['a', None]],
+    {'a': [1, {'b': 'c'}], 'd': {}},
+])
+def test_binary_round_trip(namespace, value):
+    element = namespace.element(value)
+    loaded = loads(dumps(element), namespace)
+    assert type(loaded) is type(element)
+    assert loaded == element
+    assert loaded.native_value == value
+
+
+def test_binary_meta_and_attributes(namespace):
+    element = namespace.element({'a': ['b']})
+    element.id = 'root'
+    element.meta['links'] = [{'href': 'x'}]
+    element['a'].value.attributes['x'] = [1, 2]
+    element['a'].value[0].meta['title'] = u'caf\xe9'
+    loaded = loads(dumps(element), namespace)
+    assert loaded == element
+    assert loaded.refracted == element.refracted
+    assert loaded['a'].value.attributes.owner is loaded['a'].value
+
+
+def test_binary_duplicate_keys(namespace):
+    doc = namespace.element({'a': 1}).refracted
+    doc['content'].append(doc['content'][0])
+    element = namespace.from_refract(doc)
+    assert loads(dumps(element), namespace).refracted == element.refracted
+
+
+def test_binary_string_table(namespace):
+    one = len(dumps(namespace.element([{'name': 'value'}])))
+    many = len(dumps(namespace.element([{'name': 'value'}] * 100)))
+    assert many - one < 100 * 12  # Names and strings are not repeated.
+    assert many < len(json.dumps(
+        namespace.element([{'name': 'value'}] * 100).to_refract(True))) / 10
+
+
+def test_binary_views(namespace):
+    element = namespace.element([1, 'a', {'b': 2.5}])
+    data = dumps(element)
+    assert loads(bytearray(data), namespace) == element
+    assert loads(memoryview(b'..' + data)[2:], namespace) == element
+
+
+def test_binary_link(namespace):
+    namespace.register_element_class(LinkElement)
+    link = LinkElement(attributes={'href': '/x'}, namespace=namespace)
+    loaded = loads(dumps(namespace.element([link])), namespace)
+    assert type(loaded[0]) is LinkElement
+    assert loaded[0].href == '/x'
+
+
+def test_binary_custom_classes(namespace):
+    class NameElement(StringElement):
+        element = 'name'
+
+    class ListElement(ArrayElement):
+        element = 'list'
+
+    namespace.register_element_class(NameElement)
+    namespace.register_element_class(ListElement)
+    element = ListElement([NameElement('a'), 1], namespace=namespace)
+    loaded = loads(dumps(element), namespace)
+    assert type(loaded) is ListElement
+    assert type(loaded[0]) is NameElement
+    assert loaded == element
+
+
+def test_binary_custom_serialization(namespace):
+    class PlainElement(Element):
+        element = 'plain'
+
+        @property
+        def refracted(self):
+            return {'element': 'plain', 'meta': {}, 'attributes': {},
+                    'content': self.content.upper()}
+
+        @classmethod
+        def from_refract(cls, doc, namespace):
+            return cls(doc['content'].lower(), namespace=namespace)
+
+    namespace.register_element_class(PlainElement)
+    element = namespace.element([PlainElement('a', namespace=namespace)])
+    assert loads(dumps(element), namespace)[0].content == 'a'
+
+
+def test_binary_deep(namespace):
+    depth = sys.getrecursionlimit() * 2
+    element = namespace.element([])
+    for _ in range(depth):
+        element = namespace.element([element])
+    element.meta['title'] = namespace.element([])
+    loaded = loads(dumps(element), namespace)
+    assert loaded == element
+
+
+def test_binary_unserializable(namespace):
+    with pytest.raises(TypeError):
+        dumps(Element(object(), namespace=namespace))
+
+
+@pytest.mark.parametrize('data', [b'', b'{"element"', b'RFB\x01\x01\x06'])
+def test_binary_invalid(namespace, data):
+    with pytest.raises(ValueError):
+        loads(data, namespace)
+
+
+def test_binary_extra_data(namespace):
+    with pytest.raises(ValueError):
+        loads(dumps(namespace.element(1)) + b'\x00', namespace)
+
+
+def test_binary_methods_and_files(namespace):
+    element = namespace.element({'a': [1, 2]})
+    assert namespace.from_binary(element.to_binary()) == element
+    fp = io.BytesIO()
+    dump(element, fp)
+    fp.seek(0)
+    assert load(fp, namespace) == element
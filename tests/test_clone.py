@@ -0,0 +1,110 @@
+import pytest
+
+from refract import ArrayElement, Namespace, ObjectElement
+
+
+@pytest.fixture
+def native():
+    return [1, {'a': ['b', 'c'], 'd': {'e': 2}}, ['f']]
+
+
+@pytest.fixture
+def original(native):
+    return Namespace().element(native)
+
+
+def test_clone_shares_storage(original):
+    clone = original.clone()
+    assert clone._content is original._content
+    assert clone == original
+    assert clone.refracted == original.refracted
+
+
+def test_clone_change_not_seen_by_original(original, native):
+    clone = original.clone()
+    clone[1]['a'].value[0] = 'changed'
+    clone[2].append('g')
+    assert original.native_value == native
+    assert clone.native_value[1]['a'] == ['changed', 'c']
+    assert clone.native_value[2] == ['f', 'g']
+
+
+def test_clone_copies_only_accessed_path(original):
+    clone = original.clone()
+    clone[1]['d'].value['e'] = 3
+    assert clone._content is not original._content
+    assert clone._content[2]._content is original._content[2]._content
+
+
+def test_original_change_not_seen_by_clone(original, native):
+    leaf = original[1]['a'].value[0]
+    clone = original.clone()
+    leaf.set_content('changed')
+    original[1]['d'].value.meta['id'] = 'x'
+    original.append('new')
+    assert clone.native_value == native
+    assert clone == Namespace().element(native)
+    assert original.native_value[1]['a'] == ['changed', 'c']
+
+
+def test_clone_of_clone(original, native):
+    clone = original.clone()
+    second = clone.clone()
+    clone[2].append('g')
+    original[2].append('h')
+    assert second.native_value == native
+
+
+def test_clone_refracted_cache_independent(original, native):
+    original.refracted
+    clone = original.clone()
+    original[0].set_content(5)
+    assert clone.refracted == Namespace().element(native).refracted
+
+
+def test_clone_object_members(native):
+    obj = Namespace().element(native[1])
+    clone = obj.clone()
+    clone['x'] = 1
+    del clone['a']
+    assert isinstance(clone, ObjectElement)
+    assert list(obj) == ['a', 'd']
+    assert list(clone) == ['d', 'x']
+    assert clone['d'].value['e'].value.native_value == 2
+
+
+def test_clone_meta(original):
+    original.id = 'root'
+    clone = original.clone()
+    clone.id = 'other'
+    assert original.id == 'root'
+
+
+def test_clone_unrelated_tree_unaffected(original, monkeypatch):
+    from refract import elements
+    clone = original.clone()
+    other = Namespace().element({'a': [1, 2]})
+    walks = []
+    ancestry = elements._ancestry
+    monkeypatch.setattr(elements, '_ancestry',
+                        lambda element: walks.append(element) or
+                        ancestry(element))
+    other['a'].value[0] = 3
+    assert walks == []
+    original[2].append('g')
+    assert walks
+    assert clone[2].native_value == ['f']
+
+
+def test_clone_custom_set_content():
+    class Custom(ArrayElement):
+        __slots__ = ()
+
+        def set_content(self, value):
+            super(Custom, self).set_content(list(value))
+
+    element = Custom([2, 1], namespace=Namespace())
+    clone = element.clone()
+    clone.append(0)
+    assert element.native_value == [2, 1]
+    assert clone.native_value == [2, 1, 0]
@@ -0,0 +1,116 @@
+import io
+import json
+
+import pytest
+
+from refract import ArrayElement, Namespace, NumberElement, ObjectElement
+from refract.decoding import RefractParser, iterparse, load
+
+
+@pytest.fixture
+def namespace():
+    return Namespace()
+
+
+@pytest.fixture
+def tree(namespace):
+    el = namespace.element([
+        'a "quoted" [string] {with} \\ escapes', True, None, -1.5e3,
+        {'foo': 'bar', 'nested': [1, {'deep': []}]},
+        [[[]]],
+    ])
+    el.id = 'root'
+    return el
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 65536])
+def test_load(namespace, tree, chunk_size):
+    fp = io.StringIO(json.dumps(tree.refracted))
+    assert load(fp, namespace, chunk_size).refracted == tree.refracted
+
+
+def test_load_bytes(namespace, tree):
+    fp = io.BytesIO(json.dumps(tree.refracted, ensure_ascii=False)
+                    .encode('utf-8'))
+    assert load(fp, namespace, 3).refracted == tree.refracted
+
+
+def test_load_object(namespace):
+    obj = namespace.element({'a': [1, 2], 'b': {'c': None}})
+    fp = io.StringIO(json.dumps(obj.refracted))
+    loaded = load(fp, namespace, 5)
+    assert isinstance(loaded, ObjectElement)
+    assert loaded.refracted == obj.refracted
+
+
+def test_iterparse(namespace, tree):
+    fp = io.StringIO(json.dumps(tree.refracted))
+    items = list(iterparse(fp, namespace, 4))
+    assert [item.refracted for item in items] == \
+        [item.refracted for item in tree]
+
+
+def test_iterparse_content_before_element(namespace, tree):
+    doc = json.dumps(tree.refracted['content'])
+    text = '{"content": ' + doc + ', "meta": {}, "attributes": {}, ' \
+        '"element": "array"}'
+    items = list(iterparse(io.StringIO(text), namespace, 4))
+    assert [item.refracted for item in items] == \
+        [item.refracted for item in tree]
+
+
+def test_iterparse_not_array(namespace):
+    fp = io.StringIO(json.dumps(NumberElement(1).refracted))
+    with pytest.raises(ValueError):
+        list(iterparse(fp, namespace))
+
+
+def test_parser_feed_returns_items(namespace):
+    text = json.dumps(namespace.element([1, 2]).refracted)
+    parser = RefractParser(namespace, keep_items=False)
+    split = text.index('1}') + 2  # After the first item
+    assert [i.native_value for i in parser.feed(text[:split])] == [1]
+    assert [i.native_value for i in parser.feed(text[split:])] == [2]
+    root = parser.close()
+    assert isinstance(root, ArrayElement)
+    assert len(root) == 0
+
+
+def test_parser_undecoded_items(namespace):
+    text = json.dumps(namespace.element([1, 2]).refracted)
+    parser = RefractParser(namespace, keep_items=False, decode_items=False)
+    split = text.index('1}') + 2
+    assert parser.feed(text[:split]) == [
+        {'element': 'number', 'meta': {}, 'attributes': {}, 'content': 1}]
+    parser.feed(text[split:])
+    assert parser.close() == {'element': 'array', 'meta': {},
+                              'attributes': {}, 'content': []}
+
+
+def test_parser_incomplete(namespace):
+    parser = RefractParser(namespace)
+    parser.feed('{"element": "array", "content": [')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_from_refract_processes(namespace):
+    element = namespace.element([{'id': i} for i in range(23)])
+    element.id = 'root'
+    loaded = namespace.from_refract(element.refracted, processes=2,
+                                    chunk_size=5)
+    assert loaded == element
+    assert loaded.id == 'root'
+
+
+@pytest.mark.parametrize('trusted', (False, True))
+def test_from_refract_processes_keyvals(namespace, trusted):
+    element = namespace.element([{'id': i} for i in range(23)])
+    element.meta['ref'] = namespace.element(['x'])
+    element.meta['ref'].id = 'inner'
+    doc = element.refracted
+    serial = namespace.from_refract(doc, trusted=trusted)
+    pooled = namespace.from_refract(doc, processes=2, chunk_size=5,
+                                    trusted=trusted)
+    assert pooled == serial == element
+    assert pooled.meta['ref'].id == 'inner'
@@ -0,0 +1,210 @@
+import json
+import random
+
+import pytest
+
+from refract import (Namespace, ArrayElement, MemberElement,
+                     ObjectElement)
+from refract.diff import Operation, diff, patch, to_refract, from_refract
+
+
+@pytest.fixture
+def namespace():
+    return Namespace()
+
+
+@pytest.fixture
+def old(namespace):
+    element = namespace.element({
+        'title': 'API',
+        'resources': [{'href': '/a', 'methods': ['GET']},
+                      {'href': '/b', 'methods': ['GET', 'PUT']},
+                      {'href': '/c', 'methods': []}],
+        'version': 1,
+    })
+    element.meta['id'] = 'root'
+    return element
+
+
+def patched(old, new):
+    operations = diff(old, new)
+    result = patch(old.clone(), operations)
+    assert result == new
+    assert result.refracted == new.refracted
+    return operations
+
+
+def test_diff_equal(old):
+    assert diff(old, old.clone()) == []
+
+
+def test_diff_replace_scalar(old):
+    new = old.clone()
+    new['version'] = 2
+    assert patched(old, new) == [
+        Operation('replace', ('version',), None, new['version'].value)]
+
+
+def test_diff_array_insert_delete(old):
+    new = old.clone()
+    resources = new['resources'].value
+    del resources[0]
+    resources.append({'href': '/d', 'methods': ['POST']})
+    resources[0]['methods'].value.append('DELETE')
+    operations = patched(old, new)
+    assert [(op.op, op.path, op.key) for op in operations] == [
+        ('delete', ('resources',), 0),
+        ('insert', ('resources',), 2),
+        ('insert', ('resources', 0, 'methods'), 2),
+    ]
+
+
+def test_diff_object_members(old):
+    new = old.clone()
+    del new['title']
+    new['description'] = 'Changed'
+    operations = patched(old, new)
+    assert [(op.op, op.path, op.key) for op in operations] == [
+        ('delete', (), 'title'), ('insert', (), 2)]
+    assert isinstance(operations[1].value, MemberElement)
+
+
+def test_diff_member_inserted_in_order(namespace):
+    old = namespace.element({'a': 1, 'c': 3})
+    new = namespace.element({'a': 1, 'b': 2, 'c': 3})
+    assert [(op.op, op.key) for op in patched(old, new)] == [('insert', 1)]
+
+
+def test_diff_object_reordered(namespace):
+    old = namespace.element({'a': 1, 'b': 2})
+    new = namespace.element({'b': 2, 'a': 1})
+    assert [op.op for op in patched(old, new)] == ['replace']
+
+
+def test_diff_keyvals(old):
+    new = old.clone()
+    del new.meta['id']
+    new.meta['title'] = 'Title'
+    new['resources'].value[1].attributes['typeAttributes'] = ['fixed']
+    new['version'].attributes['typeAttributes'] = ['required']
+    operations = patched(old, new)
+    assert sorted((op.op, op.path, op.key) for op in operations) == sorted([
+        ('meta', (), 'id'), ('meta', (), 'title'),
+        ('attribute', ('resources', 1), 'typeAttributes'),
+        ('insert', (), 2), ('delete', (), 'version')])
+
+
+def test_diff_element_changed(namespace):
+    old = namespace.element([1, [2], {'a': 'b'}])
+    new = namespace.element(['1', {'x': 2}, {'a': 'b'}])
+    assert [(op.op, op.path) for op in patched(old, new)] == [
+        ('replace', (0,)), ('replace', (1,))]
+
+
+def test_diff_root_replaced(namespace):
+    old = namespace.element([1])
+    new = namespace.element({'a': 1})
+    assert patched(old, new)[0].path == ()
+
+
+def test_diff_skips_identical_branches(namespace, monkeypatch):
+    old = namespace.element([{'same': list(range(100))}, {'changed': 1}])
+    new = old.clone()
+    new[1]['changed'] = 2
+    seen = []
+    from refract import diff as module
+    original = module._array_operations
+
+    def recording(old, new, path, pairs):
+        seen.append(path)
+        return original(old, new, path, pairs)
+
+    monkeypatch.setattr(module, '_array_operations', recording)
+    patched(old, new)
+    assert seen == [()]  # The unchanged array was never walked.
+
+
+@pytest.mark.parametrize('old_value, new_value', [
+    ([-1, 5], [-2, 5]),  # hash(-1) == hash(-2)
+    ({'x': -1}, {'x': -2}),
+    ([1], [1.0]),
+    ({'x': 1}, {'x': 1.0}),
+    ([[-1]], [[-2]]),
+])
+def test_diff_equal_hashes(namespace, old_value, new_value):
+    old = namespace.element(old_value)
+    new = namespace.element(new_value)
+    old.meta['id'] = namespace.element(-1)
+    new.meta['id'] = namespace.element(-2)
+    operations = patched(old, new)
+    assert operations
+    result = patch(old.clone(), operations)
+    assert json.dumps(result.refracted) == json.dumps(new.refracted)
+
+
+def test_patch_does_not_share_elements(namespace, old):
+    new = old.clone()
+    new['resources'].value.append('x')
+    operations = diff(old, new)
+    first = patch(old.clone(), operations)
+    second = patch(old.clone(), operations)
+    first['resources'].value[-1].set_content('y')
+    assert second == new
+
+
+def test_operations_serialized(namespace, old):
+    new = old.clone()
+    new['extra'] = {'nested': [1, 2]}
+    new['resources'].value.insert(0, 'first')
+    new.meta['title'] = 'Title'
+    del new.meta['id']
+    operations = diff(old, new)
+    loaded = from_refract(json.loads(json.dumps(to_refract(operations))),
+                          namespace)
+    assert loaded == operations
+    assert patch(old.clone(), loaded) == new
+
+
+def mutated(element, rng):
+    containers = [element]
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        children = ([m.value for m in node.content]
+                    if isinstance(node, ObjectElement) else
+                    list(node.content) if isinstance(node, ArrayElement)
+                    else [])
+        containers.extend(c for c in children
+                          if isinstance(c, (ArrayElement, ObjectElement)))
+        stack.extend(children)
+    for _ in range(rng.randint(1, 4)):
+        node = rng.choice(containers)
+        choice = rng.random()
+        if isinstance(node, ObjectElement):
+            keys = list(node.keys())
+            if keys and choice < 0.3:
+                del node[rng.choice(keys)]
+            elif keys and choice < 0.6:
+                node[rng.choice(keys)] = rng.randint(0, 3)
+            else:
+                node['k{}'.format(rng.randint(0, 9))] = [rng.randint(0, 3)]
+        else:
+            if len(node) and choice < 0.3:
+                del node[rng.randrange(len(node))]
+            elif len(node) and choice < 0.5:
+                node[rng.randrange(len(node))] = {'x': rng.randint(0, 3)}
+            elif choice < 0.8:
+                node.insert(rng.randint(0, len(node)), rng.randint(0, 3))
+            else:
+                node.meta['title'] = 'changed'
+    return element
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_diff_random_changes(namespace, seed):
+    rng = random.Random(seed)
+    old = namespace.element([
+        {'id': i, 'tags': [rng.randint(0, 3) for _ in range(3)],
+         'nested': {'a': [i, {'b': i}]}} for i in range(5)] + [1, 'x'])
+    new = mutated(old.clone(), rng)
+    patched(old, new)
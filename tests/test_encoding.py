@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from six import StringIO
+
+from refract import Element, LinkElement, Namespace, ObjectElement
+
+
+@pytest.fixture
+def namespace():
+    return Namespace()
+
+
+@pytest.fixture
+def tree(namespace):
+    el = namespace.element([
+        'a', True, None, 1.5, u'☃',
+        {'foo': 'bar', 'nested': [1, {'deep': []}]},
+        [[[]]],
+    ])
+    el.id = 'root'
+    el[0].meta['classes'] = ['x', 'y']
+    el[1].attributes['typeAttributes'] = ObjectElement({'fixed': True},
+                                                       namespace=namespace)
+    return el
+
+
+def test_iterencode_matches_refracted(tree):
+    assert json.loads(''.join(tree.iterencode())) == tree.refracted
+
+
+def test_iterencode_scalar():
+    el = Element({'raw': [1, 2]}, namespace=Namespace())
+    assert json.loads(''.join(el.iterencode())) == el.refracted
+
+
+def test_iterencode_link():
+    link = LinkElement(namespace=Namespace())
+    link.href = '/foo'
+    assert json.loads(''.join(link.iterencode())) == link.refracted
+
+
+def test_dump(tree):
+    fp = StringIO()
+    tree.dump(fp)
+    assert json.loads(fp.getvalue()) == tree.refracted
+
+
+def test_dump_small_buffer(tree):
+    from refract.encoding import dump
+
+    fp = StringIO()
+    dump(tree, fp, buffer_size=1)
+    assert json.loads(fp.getvalue()) == tree.refracted
+
+
+def test_iterencode_compact(tree):
+    assert json.loads(''.join(tree.iterencode(compact=True))) == \
+        tree.to_refract(compact=True)
+
+
+def test_iterencode_compact_custom(namespace):
+    class PlainElement(Element):
+        element = 'plain'
+
+        @property
+        def refracted(self):
+            return {'element': 'plain', 'meta': {}, 'attributes': {},
+                    'content': 'custom'}
+
+    array = namespace.element([PlainElement(namespace=namespace)])
+    assert array.to_refract(compact=True)['content'] == [
+        {'element': 'plain', 'content': 'custom'}]
+    assert json.loads(''.join(array.iterencode(compact=True))) == \
+        array.to_refract(compact=True)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_dump_processes(namespace, compact):
+    element = namespace.element([{'id': i, 'tags': ['a']} for i in range(23)])
+    element.id = 'root'
+    fp = StringIO()
+    element.dump(fp, compact=compact, processes=2, chunk_size=5)
+    assert json.loads(fp.getvalue()) == element.to_refract(compact)
+
+
+def test_to_refract_processes(namespace):
+    element = namespace.element([[i, str(i)] for i in range(23)])
+    assert (element.to_refract(processes=2, chunk_size=5) ==
+            element.refracted)
+    assert (element.to_refract(True, processes=2, chunk_size=5) ==
+            element.to_refract(True))
+
+
+def test_to_refract_processes_sent_items(namespace, monkeypatch):
+    from refract import pool
+    monkeypatch.setattr(pool, '_forks', lambda: False)
+    element = namespace.element([{'id': i} for i in range(23)])
+    assert (element.to_refract(processes=2, chunk_size=5) ==
+            element.refracted)
@@ -0,0 +1,124 @@
+import gc
+import pickle
+
+import pytest
+
+from refract import elements
+from refract.namespace import Namespace, ElementClassNotFound
+from refract.elements import *
+
+
+def test_instrumentation_disabled():
+    n = Namespace()
+    n.element([1, 'a'])
+    assert n.instrumentation is None
+    assert n.stats() == {}
+
+
+def test_instrumentation_created():
+    n = Namespace()
+    n.instrument()
+    element = n.element([1, {'a': 'b'}])
+    element.clone()
+    assert n.stats()['created'] == {
+        'ArrayElement': 2, 'NumberElement': 1, 'ObjectElement': 1,
+        'MemberElement': 1, 'StringElement': 2}
+
+
+def test_instrumentation_detection():
+    n = Namespace()
+
+    class FooElement(Element):
+        element = 'foo'
+
+    n.add_detection(lambda v: v == 42, FooElement, prepend=True)
+    n.instrument()
+    for value in (1, 2, 42, 'a'):
+        n.detected_element_class(value)
+    assert n.stats()['detection'] == {
+        'calls': 4 + 3 + 4, 'misses': 3 + 2 + 3, 'cache_misses': 2}
+
+
+def test_instrumentation_from_refract():
+    n = Namespace()
+    docs = [n.element(v).refracted for v in ([1], 'a', [2])]
+    instrumentation = n.instrument()
+    n.from_refract(docs[0])
+    n.from_refract_many(docs)
+    stats = n.stats()['from_refract']
+    assert stats['calls'] == {'array': 3, 'string': 1}
+    assert stats['time'] > 0
+    instrumentation.reset()
+    assert n.stats()['from_refract'] == {'calls': {}, 'time': 0.0}
+
+
+def test_instrumentation_refracted():
+    n = Namespace()
+    element = n.element({'a': [1]})
+    element.meta['title'] = 'Title'
+    n.instrument()
+    element.refracted
+    element.to_refract(compact=True)
+    element.to_refract()
+    stats = n.stats()['refracted']
+    assert stats['calls'] == 3  # Meta serialized within, not counted again
+    assert stats['time'] > 0
+
+
+def test_instrumentation_hooks():
+    n = Namespace()
+    instrumentation = n.instrument()
+    events = []
+    instrumentation.add_hook('created', lambda e: events.append(
+        ('created', e.element)))
+    instrumentation.add_hook('detected', lambda v, cls: events.append(
+        ('detected', v, cls)))
+    instrumentation.add_hook('refracted', lambda e, seconds: events.append(
+        ('refracted', e.element)))
+    instrumentation.add_hook('from_refract', lambda doc, e, seconds:
+                             events.append(('from_refract', e.element)))
+    element = n.element(1)
+    n.from_refract(element.refracted)
+    assert events == [('detected', 1, NumberElement), ('created', 'number'),
+                      ('refracted', 'number'), ('created', 'number'),
+                      ('from_refract', 'number')]
+    with pytest.raises(ValueError):
+        instrumentation.add_hook('unknown', len)
+
+
+def test_instrumentation_detection_not_found():
+    n = Namespace(no_defaults=True)
+    detected = []
+    n.instrument().add_hook('detected', lambda v, cls: detected.append(cls))
+    with pytest.raises(ElementClassNotFound):
+        n.element(1)
+    assert detected == [None]
+
+
+def test_instrumentation_uninstrument():
+    gc.collect()
+    before = elements._instrumented
+    n = Namespace()
+    n.instrument()
+    assert elements._instrumented == before + 1
+    n.uninstrument()
+    assert elements._instrumented == before
+    assert 'detected_element_class' not in vars(n)
+    n.element(1)
+    assert n.stats() == {}
+
+
+def test_instrumentation_not_pickled():
+    n = Namespace()
+    n.instrument()
+    copy = pickle.loads(pickle.dumps(n))
+    assert copy.instrumentation is None
+    assert copy.element([1]).native_value == [1]
+
+
+def test_instrumentation_collected():
+    gc.collect()
+    before = elements._instrumented
+    Namespace().instrument()
+    gc.collect()
+    assert elements._instrumented == before
@@ -0,0 +1,251 @@
+import gc
+import random
+
+import pytest
+
+from refract import elements, Namespace, ArrayElement, ObjectElement
+from refract.diff import Operation, patch
+from refract.journal import Change, Journal
+
+
+@pytest.fixture(autouse=True)
+def collected():
+    yield
+    gc.collect()  # Journals left open would make changes elsewhere slower.
+
+
+@pytest.fixture
+def namespace():
+    return Namespace()
+
+
+@pytest.fixture
+def root(namespace):
+    return namespace.element({'a': [1, 2, {'b': 'c'}], 'd': 'e'})
+
+
+def replayed(root, replica, journal):
+    result = patch(replica, journal.operations())
+    assert result == root
+    assert result.refracted == root.refracted
+    return result
+
+
+def test_journal_array(root):
+    replica = root.clone()
+    journal = Journal(root)
+    items = root['a'].value
+    items.append(3)
+    items[0] = 10
+    del items[-3]
+    items.insert(-1, 'x')
+    items.insert(-10, 'y')
+    assert journal.changes == [
+        Change(root, Operation('insert', ('a',), 3, items[-1])),
+        Change(root, Operation('replace', ('a', 0), None, items[1])),
+        Change(root, Operation('delete', ('a',), 1, None)),
+        Change(root, Operation('insert', ('a',), 2, items[3])),
+        Change(root, Operation('insert', ('a',), 0, items[0])),
+    ]
+    replayed(root, replica, journal)
+    assert journal.changes == []
+
+
+def test_journal_object(root):
+    replica = root.clone()
+    journal = Journal(root)
+    root['a'].value[2]['b'] = 'z'
+    root['f'] = True
+    del root['d']
+    operations = [change.operation for change in journal.changes]
+    assert [op[:3] for op in operations] == [
+        ('replace', ('a', 2, 'b'), None),
+        ('insert', (), 2),
+        ('delete', (), 'd'),
+    ]
+    assert operations[1].value.key.native_value == 'f'
+    replayed(root, replica, journal)
+
+
+def test_journal_keyvals(root):
+    replica = root.clone()
+    journal = Journal(root)
+    root.meta['title'] = 'Title'
+    root['a'].value[0].attributes['typeAttributes'] = ['fixed']
+    root.meta['title'].meta['id'] = 'inner'  # Re-sets the meta value
+    del root.meta['title'].meta['id']
+    root['a'].value.attributes = {'x': 1}
+    assert [change.operation[:3] for change in journal.changes] == [
+        ('meta', (), 'title'),
+        ('attribute', ('a', 0), 'typeAttributes'),
+        ('meta', (), 'title'),
+        ('meta', (), 'title'),
+        ('attribute', ('a',), 'x'),
+    ]
+    replayed(root, replica, journal)
+
+
+def test_journal_member_key(root):
+    replica = root.clone()
+    journal = Journal(root)
+    root.content[0].key = 'A'
+    root.content[0].key.meta['id'] = 'key'
+    assert [change.operation[:3] for change in journal.changes] == [
+        ('replace', (), None), ('replace', (), None)]
+    replica = replayed(root, replica, journal)
+    assert replica is not root
+
+
+def test_journal_values_cloned(root):
+    journal = Journal(root)
+    root['a'].value.append([1])
+    root['a'].value[-1].append(2)
+    first, second = journal.drain()
+    assert first.operation.value.native_value == [1]
+    assert second.operation == Operation('insert', ('a', 3), 1,
+                                         root['a'].value[3][1])
+
+
+def test_journal_construction_not_recorded(namespace):
+    journal = Journal(namespace)
+    namespace.element({'a': [1]})
+    ObjectElement({'a': 1}, meta={'title': 'T'}, namespace=namespace)
+    element = ArrayElement([1], namespace=namespace)
+    element.clone()
+    element.set_content([2])
+    assert journal.changes == []
+
+
+def test_journal_namespace(namespace):
+    journal = Journal(namespace)
+    first = namespace.element([1])
+    second = namespace.element({'a': [2]})
+    other = Namespace().element([3])
+    first.append(2)
+    second['a'].value.pop()
+    other.append(4)
+    assert journal.drain() == [
+        Change(first, Operation('insert', (), 1, first[1])),
+        Change(second, Operation('delete', ('a',), 0, None)),
+    ]
+
+
+def test_journal_root_within_tree(root):
+    inner = root['a'].value
+    journal = Journal(inner)
+    root['a'].value[2]['b'] = 'z'
+    root['d'] = 'f'
+    assert journal.drain() == [Change(
+        inner, Operation('replace', (2, 'b'), None, inner[2]['b'].value))]
+
+
+def test_journal_detached(root):
+    journal = Journal(root)
+    items = root['a'].value
+    del root['a']
+    items.append(1)
+    assert len(journal.drain()) == 1
+
+
+def test_journal_set_content(root):
+    replica = root.clone()
+    journal = Journal(root)
+    root['d'].value.set_content('f')
+    root['a'].value.set_content([3])
+    root.content[0].set_content(('z', 1))
+    assert [change.operation[:3] for change in journal.changes] == [
+        ('replace', ('d',), None), ('replace', ('a',), None),
+        ('replace', (), None)]
+    replayed(root, replica, journal)
+
+
+def test_journal_container_leading_to_root(namespace, root):
+    leaf = namespace.element([1])
+    ArrayElement([leaf], namespace=namespace)  # Discarded
+    other = ArrayElement([leaf], namespace=namespace)
+    namespaced = Journal(namespace)
+    journal = Journal(root)
+    root['a'] = leaf
+    leaf.append(2)
+    assert journal.drain()[-1].operation[:3] == ('insert', ('a',), 1)
+    assert namespaced.drain()[-1].root is root
+    assert other[0] is leaf
+
+
+def test_journal_subscribe(root):
+    journal = Journal(root, keep=False)
+    changes = []
+    journal.subscribe(changes.append)
+    root['d'] = 'f'
+    assert [change.operation.path for change in changes] == [('d',)]
+    assert journal.changes == []
+    journal.unsubscribe(changes.append)
+    root['d'] = 'g'
+    assert len(changes) == 1
+
+
+def test_journal_close(root):
+    gc.collect()
+    before = elements._journaled
+    with Journal(root) as journal:
+        assert elements._journaled == before + 1
+        root['d'] = 'f'
+    assert elements._journaled == before
+    root['d'] = 'g'
+    assert len(journal.drain()) == 1
+
+
+def test_journal_collected():
+    gc.collect()
+    before = elements._journaled
+    Journal(Namespace())
+    Journal(Namespace().element([1]))
+    gc.collect()
+    assert elements._journaled == before
+
+
+def mutate(element, rng):
+    containers = [element]
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        children = ([m.value for m in node.content]
+                    if isinstance(node, ObjectElement) else
+                    list(node.content) if isinstance(node, ArrayElement)
+                    else [])
+        containers.extend(c for c in children
+                          if isinstance(c, (ArrayElement, ObjectElement)))
+        stack.extend(children)
+    node = rng.choice(containers)
+    choice = rng.random()
+    if isinstance(node, ObjectElement):
+        keys = list(node.keys())
+        if keys and choice < 0.3:
+            del node[rng.choice(keys)]
+        elif keys and choice < 0.6:
+            node[rng.choice(keys)] = rng.randint(0, 3)
+        elif choice < 0.9:
+            node['k{}'.format(rng.randint(0, 9))] = [rng.randint(0, 3)]
+        else:
+            node.content[0].key = 'renamed'
+    elif len(node) and choice < 0.3:
+        del node[rng.randrange(-len(node), len(node))]
+    elif len(node) and choice < 0.5:
+        node[rng.randrange(len(node))] = {'x': rng.randint(0, 3)}
+    elif choice < 0.8:
+        node.insert(rng.randint(-3, len(node) + 3), rng.randint(0, 3))
+    else:
+        node.meta['title'] = 'changed'
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_journal_random_changes(namespace, seed):
+    rng = random.Random(seed)
+    root = namespace.element([
+        {'id': i, 'tags': [rng.randint(0, 3) for _ in range(3)],
+         'nested': {'a': [i, {'b': i}]}} for i in range(5)] + [1, 'x'])
+    replica = root.clone()
+    journal = Journal(root)
+    for _ in range(20):
+        mutate(root, rng)
+        replica = replayed(root, replica, journal)
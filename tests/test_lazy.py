@@ -0,0 +1,102 @@
+import tempfile
+
+import pytest
+
+from refract import ArrayElement, Namespace
+from refract.binary import dumps
+from refract.lazy import loads, load
+
+
+@pytest.fixture
+def namespace():
+    return Namespace()
+
+
+@pytest.fixture
+def tree(namespace):
+    element = namespace.element({'a': [1, {'b': ['c']}], 'd': {'e': None}})
+    element.id = 'root'
+    element['a'].value.attributes['x'] = [1, 2]
+    return element
+
+
+def pending(element):
+    return type(element._content) is not list
+
+
+def test_lazy_reads_on_access(tree, namespace):
+    loaded = loads(dumps(tree), namespace)
+    assert pending(loaded)
+    assert len(loaded) == 2
+    assert pending(loaded)
+    assert loaded.id == 'root'
+    array = loaded['a'].value
+    assert not pending(loaded)
+    assert pending(array)
+    assert pending(loaded['d'].value)
+    assert array.attributes['x'].native_value == [1, 2]
+    assert array[0].native_value == 1
+    assert pending(array[1]['b'].value)
+    assert loaded == tree
+    assert loaded.refracted == tree.refracted
+    assert not pending(loaded['d'].value)
+
+
+def test_lazy_traversal(tree, namespace):
+    data = dumps(tree)
+    assert loads(data, namespace).native_value == tree.native_value
+    assert dumps(loads(data, namespace)) == data
+    assert list(loads(data, namespace)) == ['a', 'd']
+    assert loads(data, namespace).native_view['a'][1]['b'][0] == 'c'
+
+
+def test_lazy_changes(tree, namespace):
+    loaded = loads(dumps(tree), namespace)
+    loaded['a'].value.append(3)
+    loaded['d'] = 4
+    del loaded['a'].value[0]
+    assert loaded.native_value == {'a': [{'b': ['c']}, 3], 'd': 4}
+    refracted = loaded.refracted
+    loaded['a'].value[0]['b'].value.append('f')
+    assert loaded.refracted != refracted
+
+
+def test_lazy_clone(tree, namespace):
+    loaded = loads(dumps(tree), namespace)
+    clone = loaded.clone()
+    clone['a'].value.append(3)
+    assert loaded == tree
+    assert clone['a'].value.native_value == [1, {'b': ['c']}, 3]
+
+
+def test_lazy_custom_content(namespace):
+    class SortedElement(ArrayElement):
+        element = 'sorted'
+
+        def set_content(self, value):
+            super(SortedElement, self).set_content(
+                sorted(value, key=lambda v: getattr(v, 'content', v)))
+
+    namespace.register_element_class(SortedElement)
+    element = SortedElement([3, 1, 2], namespace=namespace)
+    loaded = loads(dumps(element), namespace)
+    assert not pending(loaded)
+    assert loaded.native_value == [1, 2, 3]
+
+
+def test_lazy_truncated(tree, namespace):
+    data = dumps(tree)
+    with pytest.raises(ValueError):
+        loads(data[:-1], namespace)
+    with pytest.raises(ValueError):
+        loads(data + b'\x00', namespace)
+
+
+def test_lazy_load_file(tree, namespace):
+    with tempfile.TemporaryFile() as fp:
+        fp.write(dumps(tree))
+        fp.flush()
+        fp.seek(0)
+        loaded = load(fp, namespace)
+    assert loaded['d'].value.native_value == {'e': None}
+    assert loaded == tree
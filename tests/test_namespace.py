@@ -1,6 +1,7 @@
 import pytest
 
-from refract.namespace import Namespace, ElementClassNotFound
+from refract.namespace import (Namespace, ElementClassNotFound,
+                               ElementDetector)
 from refract.elements import *
 
 
@@ -66,3 +67,144 @@ def test_namespace_element_not_detected():
     n = Namespace(no_defaults=True)
     with pytest.raises(ElementClassNotFound):
         n.detected_element_class('foo')
+
+
+def test_namespace_detect_cached_per_type():
+    n = Namespace(no_defaults=True)
+    calls = []
+
+    def is_int(v):
+        calls.append(v)
+        return isinstance(v, int)
+
+    n.add_detection(is_int, NumberElement, cacheable=True)
+    assert n.detected_element_class(1) == NumberElement
+    assert n.detected_element_class(2) == NumberElement
+    assert calls == [1]
+
+
+def test_namespace_detect_cache_invalidated():
+    n = Namespace()
+
+    class FooElement(Element):
+        element = 'foo'
+
+    assert n.detected_element_class(1) == NumberElement
+    n.add_detection(lambda v: isinstance(v, int), FooElement, prepend=True,
+                    cacheable=True)
+    assert n.detected_element_class(1) == FooElement
+
+
+def test_namespace_detect_uncacheable():
+    n = Namespace()
+
+    class FooElement(Element):
+        element = 'foo'
+
+    n.add_detection(lambda v: v == 42, FooElement, prepend=True)
+    assert n.detected_element_class(1) == NumberElement
+    assert n.detected_element_class(42) == FooElement
+    assert n.detected_element_class(2) == NumberElement
+
+
+def test_namespace_detectors_are_pairs():
+    n = Namespace()
+    n.element_detection.insert(
+        0, ElementDetector(lambda v: v == 42, StringElement))
+    assert [element_class for _, element_class in n.element_detection][:2] == [
+        StringElement, NullElement]
+    assert n.detected_element_class(42) == StringElement
+    assert n.detected_element_class(1) == NumberElement
+
+
+def test_namespace_elements():
+    n = Namespace()
+    values = [1, 'a', [None, {'b': True}], {'c': [2.5]}]
+    elements = n.elements(values)
+    assert [e.native_value for e in elements] == values
+    assert elements == [n.element(v) for v in values]
+
+
+def test_namespace_from_refract_many():
+    n = Namespace()
+    docs = [n.element(v).to_refract(compact=True)
+            for v in (1, 'a', [None, {'b': True}])]
+    assert n.from_refract_many(docs) == [n.from_refract(d) for d in docs]
+
+
+def test_namespace_elements_processes():
+    n = Namespace()
+    values = [{'id': i, 'tags': ['a', i]} for i in range(25)]
+    elements = n.elements(values, processes=2, chunk_size=4)
+    assert [e.native_value for e in elements] == values
+    assert all(e.namespace is n for e in elements)
+    elements[0]['tags'].value.append('b')
+    assert elements[0].native_value['tags'] == ['a', 0, 'b']
+
+
+def test_namespace_from_refract_many_processes():
+    n = Namespace()
+    docs = [n.element({'id': i}).refracted for i in range(25)]
+    elements = n.from_refract_many(docs, processes=2, chunk_size=4)
+    assert [e.refracted for e in elements] == docs
+
+
+def copied(string):
+    return ''.join(list(string))  # An equal string that is not the same
+
+
+def test_namespace_from_refract_interns_strings():
+    n = Namespace(interned_length=4)
+    docs = [{'element': 'object', 'meta': {copied('id'): 'x'}, 'content': [
+        {'element': 'member', 'content': {
+            'key': {'element': 'string', 'content': copied('long key')},
+            'value': {'element': 'string', 'content': copied(value)}}}]}
+        for value in ('abc', 'abc', 'long value', 'long value')]
+    elements = n.from_refract_many(docs)
+    keys = [e.content[0].key.content for e in elements]
+    values = [e.content[0].value.content for e in elements]
+    meta_keys = [list(e.meta)[0] for e in elements]
+    assert all(key is keys[0] for key in keys)
+    assert all(key is meta_keys[0] for key in meta_keys)
+    assert values[0] is values[1]
+    assert values[2] is not values[3]
+    assert [e.refracted for e in elements] == \
+        [n.from_refract(d).refracted for d in docs]
+
+
+def test_namespace_element_interns_strings():
+    n = Namespace()
+    element = n.element([{copied('key'): copied('value')} for _ in range(2)])
+    assert element[0]['key'].key.content is element[1]['key'].key.content
+    assert element[0]['key'].value.content is \
+        element[1]['key'].value.content
+
+
+def test_namespace_interning_disabled():
+    n = Namespace(intern_strings=False)
+    element = n.element([copied('value') for _ in range(2)])
+    assert element[0].content is not element[1].content
+
+
+def test_namespace_from_refract_trusted():
+    n = Namespace()
+    element = n.element([1, 'a', {'b': [None, True]}])
+    element.meta['title'] = 'Title'
+    element[1].attributes['typeAttributes'] = ['fixed']
+    element[2].meta['ref'] = n.element('other')
+    element[2].meta['ref'].meta['id'] = 'x'  # Serialized as refract data
+    for doc in (element.refracted, element.to_refract(compact=True)):
+        decoded = n.from_refract(doc, trusted=True)
+        assert decoded == element
+        assert decoded.refracted == element.refracted
+    assert n.from_refract_many([element.refracted, element[0].refracted],
+                               trusted=True) == [element, element[0]]
+
+
+def test_namespace_from_refract_untrusted_checks_content():
+    n = Namespace()
+    doc = {'element': 'array', 'content': [
+        {'element': 'number', 'content': 'one'}]}
+    with pytest.raises(ValueError):
+        n.from_refract(doc)
+    assert n.from_refract(doc, trusted=True)[0].content == 'one'
@@ -132,3 +132,59 @@ def test_object_refracted(obj, obj_refracted):
 def test_object_from_refracted(obj_refracted):
     obj = ObjectElement.from_refract(obj_refracted, Namespace())
     assert obj.refracted == obj_refracted
+
+
+def test_object_index_set_content(obj):
+    obj.set_content({'a': 1})
+    assert 'a' in obj
+    assert 'foo' not in obj
+
+
+def test_object_index_member_key_set(obj):
+    obj['foo'].key = 'renamed'
+    assert 'foo' not in obj
+    assert obj['renamed'].value.native_value == 'bar'
+
+
+def test_object_index_member_key_content_set(obj):
+    obj['foo'].key.set_content('renamed')
+    assert 'foo' not in obj
+    assert obj['renamed'].value.native_value == 'bar'
+
+
+def test_object_index_set_after_delete(obj):
+    del obj['foo']
+    obj['foo'] = 'again'
+    assert list(obj.keys()) == ['z', 'foo']
+    assert obj['foo'].value.native_value == 'again'
+
+
+def test_object_index_duplicate_keys(obj_refracted):
+    obj_refracted['content'][1]['content']['key']['content'] = 'foo'
+    obj = ObjectElement.from_refract(obj_refracted, Namespace())
+    assert obj['foo'].value.native_value == 'bar'
+    del obj['foo']
+    assert obj['foo'].value.native_value == 1
+
+
+def test_object_from_compact_refract(obj, obj_refracted):
+    compact = obj.to_refract(compact=True)
+    assert 'meta' not in compact['content'][0]
+    assert 'meta' not in compact['content'][0]['content']['key']
+    loaded = Namespace().from_refract(compact)
+    assert loaded.refracted == obj_refracted
+
+
+def test_object_refracted_invalidated_by_nested_value(obj):
+    outer = ObjectElement({'inner': obj}, namespace=Namespace())
+    outer.refracted
+    obj['foo'].value.set_content('changed')
+    value = outer.refracted['content'][0]['content']['value']
+    assert value['content'][0]['content']['value']['content'] == 'changed'
+
+
+def test_object_refracted_invalidated_by_member_key(obj):
+    obj.refracted
+    obj.content[0].key = 'renamed'
+    assert obj.refracted['content'][0]['content']['key']['content'] == \
+        'renamed'
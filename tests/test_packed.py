@@ -0,0 +1,226 @@
+import array
+import io
+import pickle
+
+import pytest
+import six
+
+from refract import Namespace, ArrayElement, NumberElement
+from refract.journal import Journal
+from refract.packed import PackedArrayElement
+
+
+@pytest.fixture
+def namespace():
+    return Namespace(packed_size=3)
+
+
+def test_packed_detection(namespace):
+    element = namespace.element({
+        'ints': [1, 2, 3], 'floats': (1.5, 2.5, 3.5), 'short': [1, 2],
+        'mixed': [1, 2.0, 3], 'booleans': [True, False, True],
+        'nested': [[1], [2], [3]]})
+    assert type(element['ints'].value) is PackedArrayElement
+    assert type(element['floats'].value) is PackedArrayElement
+    for key in ('short', 'mixed', 'booleans', 'nested'):
+        assert type(element[key].value) is ArrayElement
+    assert type(Namespace().element([1, 2, 3])) is ArrayElement
+
+
+def test_packed_unpackable_content(namespace):
+    element = namespace.element([1, 2, 2 ** 70])
+    assert isinstance(element, PackedArrayElement)
+    assert not element.packed
+    assert element.native_value == [1, 2, 2 ** 70]
+
+
+def test_packed_array_content(namespace):
+    element = namespace.element(array.array('i', [1, 2, 3]))
+    assert element.packed
+    assert element.native_value.tolist() == [1, 2, 3]
+    assert PackedArrayElement(array.array('f', [0.5]),
+                              namespace=namespace).native_value[0] == 0.5
+
+
+@pytest.mark.skipif(six.PY2, reason='Python 2 arrays give no memoryviews')
+def test_packed_native_value(namespace):
+    element = namespace.element({'a': [1, 2, 3]})
+    value = element['a'].value.native_value
+    assert isinstance(value, memoryview)
+    assert value.format == 'q'
+    assert value.tolist() == [1, 2, 3]
+    assert element.native_value['a'].tolist() == [1, 2, 3]
+    element['a'].value.append(4)
+    assert value.tolist() == [1, 2, 3]  # A copy
+
+
+def test_packed_serialized(namespace):
+    value = {'a': [1, 2, 3], 'b': [0.5, 1.5, 2.5]}
+    packed = namespace.element(value)
+    packed['a'].value.meta['title'] = 'Numbers'
+    plain = Namespace().element(value)
+    plain['a'].value.meta['title'] = 'Numbers'
+    assert packed.refracted == plain.refracted
+    assert packed.to_refract(compact=True) == plain.to_refract(compact=True)
+    assert packed['a'].value.to_refract(True) == plain['a'].value.to_refract(
+        True)
+    for compact in (False, True):
+        packed_text, plain_text = io.StringIO(), io.StringIO()
+        packed.dump(packed_text, compact=compact)
+        plain.dump(plain_text, compact=compact)
+        assert packed_text.getvalue() == plain_text.getvalue()
+
+
+def test_packed_decoded(namespace):
+    plain = Namespace().element({'a': [1, 2, 3], 'b': [1, 2],
+                                 'c': [1, 'x', 2]})
+    plain['a'].value.attributes['typeAttributes'] = ['fixed']
+    for trusted in (False, True):
+        element = namespace.from_refract(plain.refracted, trusted=trusted)
+        assert type(element['a'].value) is PackedArrayElement
+        assert element['a'].value.packed
+        assert type(element['b'].value) is ArrayElement
+        assert type(element['c'].value) is ArrayElement
+        assert element == plain
+    root = namespace.from_refract(Namespace().element([4, 5, 6]).refracted)
+    assert type(root) is PackedArrayElement
+    many = namespace.from_refract_many([plain['a'].value.refracted])
+    assert type(many[0]) is PackedArrayElement
+
+
+def test_packed_items_with_meta_not_decoded_packed(namespace):
+    plain = Namespace().element([1, 2, 3])
+    plain[0].meta['id'] = 'first'
+    element = namespace.from_refract(plain.refracted)
+    assert type(element) is ArrayElement
+    assert element == plain
+
+
+def test_packed_from_refract(namespace):
+    doc = Namespace().element([1, 2, 3]).refracted
+    element = PackedArrayElement.from_refract(doc, namespace)
+    assert element.packed
+    doc = Namespace().element([1, 'a']).refracted
+    element = PackedArrayElement.from_refract(doc, namespace)
+    assert type(element) is PackedArrayElement
+    assert element.native_value == [1, 'a']
+
+
+def test_packed_binary(namespace):
+    element = namespace.element({'a': [1, 2, 3]})
+    loaded = namespace.from_binary(element.to_binary())
+    assert loaded['a'].value.packed
+    assert loaded == element
+
+
+def test_packed_views(namespace):
+    element = namespace.element([1, 2, 3, 4])
+    view = element[1]
+    assert isinstance(view, NumberElement)
+    assert element[1] is view
+    assert element[-3] is view
+    assert element[1:3][0] is view
+    assert list(element)[1] is view
+    with pytest.raises(IndexError):
+        element[4]
+    with pytest.raises(IndexError):
+        element[-5]
+    assert element.packed
+
+
+def test_packed_changes(namespace):
+    element = namespace.element([1, 2, 3, 4])
+    view = element[2]
+    element.append(5)
+    element.insert(0, 0)
+    element[1] = 10
+    del element[-1]
+    element.extend(array.array('q', [6, 7]))
+    element.pop(0)
+    assert element.packed
+    assert element.native_value.tolist() == [10, 2, 3, 4, 6, 7]
+    assert element[2] is view
+    del element[1:3]
+    assert not element.packed  # Views can not be kept through slices.
+    assert element.native_value == [10, 4, 6, 7]
+
+
+def test_packed_unpacked_by_views(namespace):
+    element = namespace.element([1, 2, 3])
+    view = element[1]
+    view.meta['title'] = 'Two'
+    assert not element.packed
+    assert element[1] is view
+    assert element.native_value == [1, 2, 3]
+    element = namespace.element([1, 2, 3])
+    element[0] = 'one'
+    assert element.native_value == ['one', 2, 3]
+    element = namespace.element([1, 2, 3])
+    element.append(0.5)
+    assert element.native_value == [1, 2, 3, 0.5]
+
+
+def test_packed_changes_discard_cache(namespace):
+    root = namespace.element({'a': [1, 2, 3]})
+    root.refracted
+    root['a'].value[0] = 5
+    assert root.refracted['content'][0]['content']['value']['content'][0][
+        'content'] == 5
+
+
+def test_packed_equal(namespace):
+    element = namespace.element([1, 2, 3])
+    assert element.equals([1, 2, 3])
+    assert not element.equals((1, 2, 3))
+    assert element.packed
+    plain = Namespace().element([1, 2, 3])
+    assert hash(element) == hash(plain)
+    assert element == plain
+    assert element.equals(plain)
+
+
+def test_packed_clone(namespace):
+    element = namespace.element([1, 2, 3])
+    clone = element.clone()
+    element.append(4)
+    assert type(clone) is PackedArrayElement
+    assert clone.packed
+    assert clone.native_value.tolist() == [1, 2, 3]
+
+
+def test_packed_pickle(namespace):
+    copy = pickle.loads(pickle.dumps(namespace))
+    assert copy.packed_size == 3
+    assert copy.element([1, 2, 3]).packed
+    element = pickle.loads(pickle.dumps(namespace.element([1, 2, 3])))
+    assert type(element) is PackedArrayElement
+    assert element.packed
+    assert element == Namespace().element([1, 2, 3])
+    root = namespace.element({'a': [0.5, 1.5, 2.5]})
+    root['a'].value.id = 'numbers'
+    loaded = pickle.loads(pickle.dumps(root))
+    assert loaded['a'].value.packed
+    assert loaded['a'].value.id == 'numbers'
+    assert loaded == root
+
+
+def test_packed_journal(namespace):
+    root = namespace.element({'a': [1, 2, 3]})
+    journal = Journal(root)
+    items = root['a'].value
+    items.append(4)
+    items[0] = 5
+    del items[1]
+    items.set_content([7, 8, 9])
+    assert [change.operation[:3] for change in journal.drain()] == [
+        ('insert', ('a',), 3), ('replace', ('a', 0), None),
+        ('delete', ('a',), 1), ('replace', ('a',), None)]
+    assert items.packed
+
+
+def test_packed_numpy(namespace):
+    numpy = pytest.importorskip('numpy')
+    element = namespace.element(numpy.arange(5, dtype='int32'))
+    assert element.packed
+    assert numpy.frombuffer(element.native_value, dtype='int64').tolist() == [
+        0, 1, 2, 3, 4]
@@ -0,0 +1,109 @@
+import pickle
+import sys
+
+import pytest
+
+from refract import ArrayElement, Element, Namespace, StringElement
+from refract.elements import ElementMap
+
+
+@pytest.fixture
+def namespace():
+    return Namespace()
+
+
+def round_trip(value):
+    return pickle.loads(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+@pytest.mark.parametrize('value', [
+    None, True, 1, 2.5, 'a', [], {}, [1, ['a', None]],
+    {'a': [1, {'b': 'c'}], 'd': {}},
+])
+def test_pickle_round_trip(namespace, value):
+    element = namespace.element(value)
+    loaded = round_trip(element)
+    assert type(loaded) is type(element)
+    assert loaded == element
+    assert loaded.native_value == value
+
+
+def test_pickle_meta_and_attributes(namespace):
+    element = namespace.element({'a': ['b']})
+    element.id = 'root'
+    element['a'].value.attributes['x'] = [1, 2]
+    element['a'].meta['title'] = 'member'
+    loaded = round_trip(element)
+    assert loaded.refracted == element.refracted
+    loaded['a'].value.attributes['x'].append(3)
+    assert loaded['a'].value.attributes.owner is loaded['a'].value
+    assert element['a'].value.attributes['x'].native_value == [1, 2]
+
+
+def test_pickle_shares_namespace(namespace):
+    loaded = round_trip([namespace.element([1, 'a']), namespace.element(2)])
+    assert loaded[0].namespace is loaded[1].namespace
+    assert loaded[0][0].namespace is loaded[0].namespace
+
+
+def test_pickle_restores_parents(namespace):
+    loaded = round_trip(namespace.element([['a']]))
+    before = loaded.refracted
+    loaded[0][0].set_content('b')
+    assert loaded.refracted != before
+
+
+def test_pickle_duplicate_keys(namespace):
+    doc = namespace.element({'a': 1}).refracted
+    doc['content'].append(doc['content'][0])
+    element = namespace.from_refract(doc)
+    assert round_trip(element).refracted == element.refracted
+
+
+def test_pickle_loads_trusted(namespace, monkeypatch):
+    element = namespace.element({'a': [1, 'b'], 'c': None})
+    element['a'].value[1].meta['id'] = 'x'
+    data = pickle.dumps(element, pickle.HIGHEST_PROTOCOL)
+
+    def checked(self, value):
+        raise AssertionError('content checked')
+
+    monkeypatch.setattr(Element, '_require_native_type', checked)
+    loaded = pickle.loads(data)
+    monkeypatch.undo()
+    assert loaded == element
+    assert loaded.refracted == element.refracted
+
+
+def test_pickle_deep(namespace):
+    element = cursor = ArrayElement(namespace=namespace)
+    for _ in range(sys.getrecursionlimit() * 2):
+        child = ArrayElement(namespace=namespace)
+        cursor.append(child)
+        cursor = child
+    assert round_trip(element) == element
+
+
+def test_pickle_clone(namespace):
+    element = namespace.element([1, [2]])
+    assert round_trip(element.clone()) == element
+
+
+def test_pickle_element_map(namespace):
+    mapping = ElementMap(namespace, a='b')
+    loaded = round_trip(mapping)
+    assert isinstance(loaded['a'], StringElement)
+    assert loaded['a'].native_value == 'b'
+    element = namespace.element('x')
+    element.id = 'y'
+    loaded_element, loaded_meta = round_trip((element, element.meta))
+    assert loaded_meta is loaded_element.meta
+
+
+def test_pickle_namespace(namespace):
+    namespace.element(1)
+    loaded = round_trip(namespace)
+    assert loaded.element_classes == namespace.element_classes
+    assert loaded._detection_cache == {}
+    assert loaded.element([None, {'a': 1.5}]).native_value == [None,
+                                                               {'a': 1.5}]
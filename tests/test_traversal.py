@@ -0,0 +1,187 @@
+import json
+import sys
+
+import pytest
+
+from refract import (ArrayElement, Element, MemberElement, Namespace,
+                     StringElement)
+
+
+@pytest.fixture
+def depth():
+    return sys.getrecursionlimit() * 2
+
+
+@pytest.fixture
+def deep_native(depth):
+    value = []
+    cursor = value
+    for level in range(depth):
+        child = []
+        cursor.append({'level': level, 'next': child} if level % 2 else child)
+        cursor = child
+    return value
+
+
+@pytest.fixture
+def deep(deep_native):
+    return Namespace().element(deep_native)
+
+
+def encoded(element):
+    # Deeply nested values can not be compared or dumped without recursion.
+    return ''.join(element.iterencode())
+
+
+def test_deep_native_value(deep, depth):
+    native = deep.native_value
+    for _ in range(depth):
+        assert isinstance(native, list)
+        native = native[0]
+        if isinstance(native, dict):
+            native = native['next']
+    assert native == []
+
+
+def test_deep_refracted_round_trip(deep):
+    loaded = Namespace().from_refract(deep.refracted)
+    assert encoded(loaded) == encoded(deep)
+
+
+def test_deep_build_from_refracted(deep, depth):
+    refracted = deep.refracted
+    for _ in range(depth):
+        assert refracted['element'] == 'array'
+        refracted = refracted['content'][0]
+        if refracted['element'] == 'object':
+            refracted = refracted['content'][-1]['content']['value']
+    assert refracted['content'] == []
+
+
+def test_custom_refracted_in_tree():
+    class ShoutElement(StringElement):
+        element = 'shout'
+
+        @property
+        def refracted(self):
+            refracted = super(ShoutElement, self).refracted
+            refracted['content'] = refracted['content'].upper()
+            return refracted
+
+    namespace = Namespace()
+    array = namespace.element(['a', ShoutElement('b', namespace=namespace)])
+    assert [i['content'] for i in array.refracted['content']] == ['a', 'B']
+
+
+def test_subclass_native_value():
+    class CountElement(ArrayElement):
+        element = 'count'
+
+        @property
+        def native_value(self):
+            return len(self)
+
+    namespace = Namespace()
+    counted = CountElement([1, 2], namespace=namespace)
+    array = namespace.element([counted, [counted]])
+    assert array.native_value == [2, [2]]
+
+
+def test_element_refracted_has_no_children():
+    el = Element('foo', namespace=Namespace())
+    assert json.loads(json.dumps(el.refracted))['content'] == 'foo'
+
+
+def test_deep_equal(deep, deep_native):
+    other = Namespace().element(deep_native)
+    assert deep == other
+    assert hash(deep) == hash(other)
+
+
+@pytest.fixture
+def annotated():
+    namespace = Namespace()
+    element = namespace.element({'id': 1, 'items': ['a', {'b': None}]})
+    element.meta['title'] = 'Title'
+    element.meta['ref'] = namespace.element(['x'])
+    element.meta['ref'].attributes['typeAttributes'] = ['fixed']
+    element.content[0].meta['description'] = 'The identifier'
+    element.content[0].attributes['typeAttributes'] = ['required']
+    element['items'].value[1].meta['classes'] = ['record']
+    return element
+
+
+def test_decode_keyvals_round_trip(annotated):
+    namespace = annotated.namespace
+    for doc in (annotated.refracted, annotated.to_refract(compact=True)):
+        for trusted in (False, True):
+            decoded = namespace.from_refract(doc, trusted=trusted)
+            assert decoded == annotated
+            assert decoded.refracted == annotated.refracted
+    ref = namespace.from_refract(annotated.refracted).meta['ref']
+    assert isinstance(ref, ArrayElement)
+    assert ref.attributes['typeAttributes'].native_value == ['fixed']
+
+
+def test_decode_member_keyvals(annotated):
+    decoded = annotated.namespace.from_refract(annotated.refracted)
+    member = decoded.content[0]
+    assert member.meta['description'].native_value == 'The identifier'
+    assert member.attributes['typeAttributes'].native_value == ['required']
+
+
+def test_decode_member_items():
+    namespace = Namespace()
+    element = ArrayElement([MemberElement(('a', [1]), namespace=namespace)],
+                           namespace=namespace)
+    element[0].meta['id'] = 'pair'
+    for trusted in (False, True):
+        decoded = namespace.from_refract(element.refracted, trusted=trusted)
+        assert type(decoded[0]) is MemberElement
+        assert decoded == element
+        assert decoded.refracted == element.refracted
+
+
+def test_decode_member_keyvals_values():
+    namespace = Namespace()
+    element = namespace.element('a')
+    element.meta['pair'] = MemberElement(('b', [1]), namespace=namespace)
+    element.attributes['pair'] = MemberElement(('c', 2), namespace=namespace)
+    decoded = namespace.from_refract(element.refracted)
+    assert type(decoded.meta['pair']) is MemberElement
+    assert type(decoded.attributes['pair']) is MemberElement
+    assert decoded == element
+    assert decoded.refracted == element.refracted
+
+
+def test_decode_scalar_keyvals():
+    namespace = Namespace()
+    element = namespace.element('a')
+    element.meta['ref'] = namespace.element('b')
+    element.meta['ref'].meta['id'] = 'c'
+    decoded = StringElement.from_refract(element.refracted, namespace)
+    assert decoded == element
+    assert decoded.meta['ref'].meta['id'].native_value == 'c'
+
+
+def test_decode_dispatch_table():
+    from refract.traversal import decode, dispatch_table, CUSTOM
+
+    class TagElement(Element):
+        element = 'tag'
+
+        @classmethod
+        def from_refract(cls, doc, namespace):
+            return cls(doc['content'].lower(), namespace=namespace)
+
+    namespace = Namespace()
+    doc = {'element': 'array', 'content': [{'element': 'tag',
+                                            'content': 'A'}]}
+    assert 'tag' not in dispatch_table(namespace)
+    namespace.register_element_class(TagElement)
+    assert dispatch_table(namespace)['tag'] == (TagElement, CUSTOM)
+    assert decode(namespace, doc)[0].content == 'a'
+    assert decode(namespace, doc['content'][0]).content == 'a'
+    namespace.unregister_element_class('tag')
+    with pytest.raises(KeyError):
+        decode(namespace, doc)
@@ -0,0 +1,81 @@
+from collections import Mapping, Sequence
+
+import pytest
+
+from refract import ArrayElement, MemberElement, Namespace, StringElement
+
+
+@pytest.fixture
+def native():
+    return [1, 'a', {'b': [True, None], 'c': {'d': 2.5}}]
+
+
+@pytest.fixture
+def element(native):
+    return Namespace().element(native)
+
+
+def test_view_matches_native_value(element, native):
+    view = element.native_view
+    assert isinstance(view, Sequence)
+    assert view == native
+    assert view[2] == native[2]
+    assert isinstance(view[2], Mapping)
+    assert view[2]['c']['d'] == 2.5
+
+
+def test_view_scalar():
+    assert StringElement('a').native_view == 'a'
+
+
+def test_view_slice(element):
+    assert element.native_view[1:] == ['a', {'b': [True, None],
+                                             'c': {'d': 2.5}}]
+
+
+def test_view_object_keys(element):
+    view = element.native_view[2]
+    assert len(view) == 2
+    assert sorted(view) == ['b', 'c']
+    assert 'b' in view
+    assert 'x' not in view
+    with pytest.raises(KeyError):
+        view['x']
+
+
+def test_view_object_duplicate_keys():
+    doc = Namespace().element({'a': 1}).refracted
+    doc['content'].append(doc['content'][0])
+    view = Namespace().from_refract(doc).native_view
+    assert len(view) == 1
+    assert list(view) == ['a']
+
+
+def test_view_member():
+    member = MemberElement(('k', [1]), namespace=Namespace())
+    assert member.native_view == {'key': 'k', 'value': [1]}
+
+
+def test_view_reflects_changes(element):
+    view = element.native_view
+    element.append('new')
+    element[2]['b'] = 'changed'
+    assert view[-1] == 'new'
+    assert view[2]['b'] == 'changed'
+
+
+def test_view_read_only(element):
+    with pytest.raises(TypeError):
+        element.native_view[0] = 2
+
+
+def test_view_custom_native_value():
+    class Custom(ArrayElement):
+        __slots__ = ()
+
+        @property
+        def native_value(self):
+            return 'custom'
+
+    element = ArrayElement([Custom([])], namespace=Namespace())
+    assert element.native_view[0] == 'custom'